@@ -0,0 +1,106 @@
+"""
+Frame-budgeted view animation for WordSpace.
+
+Arrow keys and the mouse wheel no longer move the view themselves: they add to
+a pending pan offset and a pending zoom factor. A frame callback on the Tk loop
+applies an eased fraction of what is pending at most once per frame interval
+and redraws once, so the redraw cost per frame is fixed however fast the OS
+auto-repeat or the wheel fires, and navigation glides instead of jumping.
+"""
+import logging
+import math
+import time
+from typing import TYPE_CHECKING, Optional
+
+from instrumentation import instrumented
+from settings import ANIMATION
+
+if TYPE_CHECKING:
+    from wordspace import WordSpace
+
+logger = logging.getLogger(__name__)
+
+
+class ViewAnimator:
+    """Coalesces pan and zoom requests and plays them back at a capped frame rate."""
+
+    def __init__(self, space: 'WordSpace'):
+        self.space = space
+        self.frame_ms = ANIMATION['FRAME_MS']
+        self.easing = ANIMATION['EASING']
+        self.pan_snap = ANIMATION['PAN_SNAP_PX']
+        self.zoom_snap = ANIMATION['ZOOM_SNAP']
+
+        # Pending motion: device pixels, and the log of the zoom factor about a pivot
+        self._pan_x = 0.0
+        self._pan_y = 0.0
+        self._log_zoom = 0.0
+        self._pivot = (0.0, 0.0)
+        self._after_id: Optional[str] = None
+        self._last_frame = 0.0
+
+    @property
+    def active(self) -> bool:
+        return self._after_id is not None
+
+    @property
+    def pending_pan(self) -> tuple:
+        """Device pan requested but not applied yet."""
+        return self._pan_x, self._pan_y
+
+    def pan(self, dx: float, dy: float) -> None:
+        self._pan_x += dx
+        self._pan_y += dy
+        self._schedule()
+
+    def zoom(self, factor: float, pivot_x: float, pivot_y: float) -> None:
+        """Zoom by factor about the pivot; the latest pivot is used for what is pending."""
+        self._log_zoom += math.log(factor)
+        self._pivot = (pivot_x, pivot_y)
+        self._schedule()
+
+    def cancel(self) -> None:
+        """Drop pending motion, e.g. when the view is reset."""
+        self._pan_x = self._pan_y = self._log_zoom = 0.0
+        if self._after_id is not None:
+            self.space.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self) -> None:
+        """Run the next frame one frame interval after the previous one."""
+        if self._after_id is None:
+            since_last_ms = (time.perf_counter() - self._last_frame) * 1000
+            self._after_id = self.space.after(max(1, round(self.frame_ms - since_last_ms)), self._frame)
+
+    def _ease(self, pending: float, snap: float) -> float:
+        """The part of the pending motion to apply in this frame."""
+        return pending if abs(pending) <= snap else pending * self.easing
+
+    @instrumented('view_frame')
+    def _frame(self) -> None:
+        self._last_frame = time.perf_counter()
+        self._after_id = None
+        model = self.space.model
+
+        step_x = self._ease(self._pan_x, self.pan_snap)
+        step_y = self._ease(self._pan_y, self.pan_snap)
+        if step_x or step_y:
+            model.pan(step_x, step_y)
+            self._pan_x -= step_x
+            self._pan_y -= step_y
+
+        zoomed = False
+        if self._log_zoom:
+            step = self._ease(self._log_zoom, self.zoom_snap)
+            zoomed = model.zoom_about(*self._pivot, math.exp(step))
+            # At the scale limit the rest of the zoom can never be applied
+            self._log_zoom = self._log_zoom - step if zoomed else 0.0
+
+        if step_x or step_y or zoomed:
+            logger.debug("View frame: pan (%.1f, %.1f), scale %.3f", step_x, step_y, model.scale_factor)
+            if zoomed:
+                self.space.update_zoom_label()
+            self.space.update_all_positions()
+
+        if self._pan_x or self._pan_y or self._log_zoom:
+            self._schedule()
@@ -0,0 +1,374 @@
+"""
+Headless arrangement model.
+
+Holds the logical word positions and the view transform (scale and offset) of a
+word space, with all the geometry that WordSpace and DraggableWord used to compute
+on the Tk canvas: pivot zoom, panning, clamping, bounds and logical <-> device
+conversion. It has no Tk dependency, so it can be driven directly by tests,
+benchmarks, replay and simulation; the Tk classes only render its state.
+"""
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.spatial import cKDTree
+
+from settings import DRAGGABLE_WORD, UNTANGLE, WORDSPACE
+
+
+class ArrangementModel:
+    """
+    Word positions in logical space plus the logical -> device transform.
+
+    device = offset + logical * scale_factor
+    """
+
+    def __init__(
+        self,
+        width: int = WORDSPACE['CANVAS']['DEFAULT_WIDTH'],
+        height: int = WORDSPACE['CANVAS']['DEFAULT_HEIGHT'],
+        min_scale: float = WORDSPACE['ZOOM']['MIN_SCALE'],
+        max_scale: float = WORDSPACE['ZOOM']['MAX_SCALE'],
+        capacity: int = 32
+    ):
+        """
+        Args:
+            width: Device (canvas) width in pixels
+            height: Device (canvas) height in pixels
+            min_scale: Lowest allowed scale factor
+            max_scale: Highest allowed scale factor
+            capacity: Initial number of word slots, grows as needed
+        """
+        self.width = width
+        self.height = height
+        self.min_scale = min_scale
+        self.max_scale = max_scale
+
+        # View transform
+        self.scale_factor = min_scale
+        self.offset_x = width / 2
+        self.offset_y = height / 2
+
+        # Word storage, one slot per word in insertion order
+        self.words: List[str] = []
+        self._xs = np.empty(capacity, dtype=np.float64)
+        self._ys = np.empty(capacity, dtype=np.float64)
+        self._widths = np.empty(capacity, dtype=np.float64)
+        self._heights = np.empty(capacity, dtype=np.float64)
+        self._highlighted = np.zeros(capacity, dtype=bool)
+
+    # ------------------------------------------------------------------ storage
+
+    def __len__(self) -> int:
+        return len(self.words)
+
+    @property
+    def xs(self) -> np.ndarray:
+        """Logical x coordinates (a view, valid until the next add/remove)."""
+        return self._xs[:len(self.words)]
+
+    @property
+    def ys(self) -> np.ndarray:
+        """Logical y coordinates (a view, valid until the next add/remove)."""
+        return self._ys[:len(self.words)]
+
+    @property
+    def widths(self) -> np.ndarray:
+        return self._widths[:len(self.words)]
+
+    @property
+    def heights(self) -> np.ndarray:
+        return self._heights[:len(self.words)]
+
+    @property
+    def highlighted(self) -> np.ndarray:
+        return self._highlighted[:len(self.words)]
+
+    def _grow(self) -> None:
+        capacity = max(2 * self._xs.shape[0], 1)
+        for name in ('_xs', '_ys', '_widths', '_heights', '_highlighted'):
+            old = getattr(self, name)
+            new = np.zeros(capacity, dtype=old.dtype)
+            new[:old.shape[0]] = old
+            setattr(self, name, new)
+
+    def add_word(
+        self,
+        word: str,
+        logical_x: float,
+        logical_y: float,
+        width: float = DRAGGABLE_WORD['SIZE']['DEFAULT_WIDTH'],
+        height: float = DRAGGABLE_WORD['SIZE']['DEFAULT_HEIGHT']
+    ) -> int:
+        """Append a word and return its index."""
+        index = len(self.words)
+        if index == self._xs.shape[0]:
+            self._grow()
+        self._xs[index] = logical_x
+        self._ys[index] = logical_y
+        self._widths[index] = width
+        self._heights[index] = height
+        self._highlighted[index] = False
+        self.words.append(word)
+        return index
+
+    def remove_word(self, index: int) -> None:
+        """Remove a word; the indices of the following words shift down by one."""
+        n = len(self.words)
+        for name in ('_xs', '_ys', '_widths', '_heights', '_highlighted'):
+            array = getattr(self, name)
+            array[index:n - 1] = array[index + 1:n]
+        del self.words[index]
+
+    def clear(self) -> None:
+        """Remove all words, keeping the current view."""
+        self.words.clear()
+
+    def move(self, index: int, logical_x: float, logical_y: float) -> None:
+        """Place a word at the given logical coordinates."""
+        self._xs[index] = logical_x
+        self._ys[index] = logical_y
+
+    def translate(self, indices: np.ndarray, dx, dy) -> None:
+        """Shift words by a logical offset (a scalar or one value per word)."""
+        self._xs[indices] += dx
+        self._ys[indices] += dy
+
+    def set_highlight(self, index: int, value: bool) -> None:
+        self._highlighted[index] = value
+
+    def toggle_highlight(self, index: int) -> bool:
+        """Flip the highlight flag of a word and return the new state."""
+        value = not self._highlighted[index]
+        self._highlighted[index] = value
+        return value
+
+    # ---------------------------------------------------------------- transform
+
+    def to_device(self, logical_x: float, logical_y: float) -> Tuple[float, float]:
+        return (self.offset_x + logical_x * self.scale_factor,
+                self.offset_y + logical_y * self.scale_factor)
+
+    def to_logical(self, device_x: float, device_y: float) -> Tuple[float, float]:
+        return ((device_x - self.offset_x) / self.scale_factor,
+                (device_y - self.offset_y) / self.scale_factor)
+
+    def device_center(self, index: int) -> Tuple[float, float]:
+        return self.to_device(self._xs[index], self._ys[index])
+
+    def device_centers(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Device centers of all words at once."""
+        return (self.offset_x + self.xs * self.scale_factor,
+                self.offset_y + self.ys * self.scale_factor)
+
+    def drag_to(self, index: int, device_x0: float, device_y0: float) -> Tuple[float, float]:
+        """
+        Move a word so its bounding box starts at the given device corner.
+
+        The box is kept inside the device area; logical coordinates follow.
+
+        Returns:
+            The new device center of the word.
+        """
+        w = self._widths[index]
+        h = self._heights[index]
+        x0 = max(0.0, min(device_x0, self.width - w))
+        y0 = max(0.0, min(device_y0, self.height - h))
+        center_x = x0 + w / 2
+        center_y = y0 + h / 2
+        self._xs[index] = (center_x - self.offset_x) / self.scale_factor
+        self._ys[index] = (center_y - self.offset_y) / self.scale_factor
+        return center_x, center_y
+
+    def indices_in_rect(self, x0: float, y0: float, x1: float, y1: float) -> np.ndarray:
+        """Indices of the words whose device box overlaps a device rectangle."""
+        left, right = min(x0, x1), max(x0, x1)
+        top, bottom = min(y0, y1), max(y0, y1)
+        centers_x, centers_y = self.device_centers()
+        half_w = self.widths / 2
+        half_h = self.heights / 2
+        overlaps = ((centers_x + half_w >= left) & (centers_x - half_w <= right) &
+                    (centers_y + half_h >= top) & (centers_y - half_h <= bottom))
+        return np.flatnonzero(overlaps)
+
+    def drag_group(self, indices: np.ndarray, dx: float, dy: float) -> Tuple[float, float]:
+        """
+        Move several words by a device delta.
+
+        The delta is limited so that no box leaves the device area; boxes that
+        are already partly outside may stay there but cannot move further out.
+
+        Returns:
+            The device delta actually applied.
+        """
+        if not len(indices):
+            return 0.0, 0.0
+        sf = self.scale_factor
+        centers_x = self.offset_x + self._xs[indices] * sf
+        centers_y = self.offset_y + self._ys[indices] * sf
+        half_w = self._widths[indices] / 2
+        half_h = self._heights[indices] / 2
+
+        low_x = min(float((half_w - centers_x).max()), 0.0)
+        high_x = max(float((self.width - half_w - centers_x).min()), 0.0)
+        low_y = min(float((half_h - centers_y).max()), 0.0)
+        high_y = max(float((self.height - half_h - centers_y).min()), 0.0)
+        dx = float(min(max(dx, low_x), high_x))
+        dy = float(min(max(dy, low_y), high_y))
+
+        self._xs[indices] += dx / sf
+        self._ys[indices] += dy / sf
+        return dx, dy
+
+    def untangle(self, iterations: int = UNTANGLE['ITERATIONS'], gap: float = UNTANGLE['GAP']) -> np.ndarray:
+        """
+        Push overlapping words apart, as little as needed.
+
+        Every word is treated as an ellipse of its on-screen size at the current
+        scale. Each iteration finds the overlapping pairs with a k-d tree and moves
+        both words of a pair a little over half the remaining overlap along the line
+        between their centers, so words that do not overlap stay put and directions
+        between words are kept. As with drag_group, no word is pushed out of the
+        device area, so when more words are shown than fit some overlap remains;
+        overlapping_pairs() tells how much.
+
+        Returns:
+            Indices of the words that moved.
+        """
+        n = len(self.words)
+        if n < 2:
+            return np.zeros(0, dtype=np.intp)
+        xs, ys = self.xs, self.ys
+        start_x, start_y = xs.copy(), ys.copy()
+        sf = self.scale_factor
+        # Semi-axes in logical units, with half the gap on each side
+        semi_w = self.widths / (2 * sf) + gap / 2
+        semi_h = self.heights / (2 * sf) + gap / 2
+        # Centers that keep the boxes on the device area; words already outside may stay there
+        low_x = np.minimum((self.widths / 2 - self.offset_x) / sf, start_x)
+        high_x = np.maximum((self.width - self.widths / 2 - self.offset_x) / sf, start_x)
+        low_y = np.minimum((self.heights / 2 - self.offset_y) / sf, start_y)
+        high_y = np.maximum((self.height - self.heights / 2 - self.offset_y) / sf, start_y)
+
+        for _ in range(iterations):
+            i, j = _overlapping_pairs(xs, ys, semi_w, semi_h)
+            if not i.size:
+                break
+            pair_dx, pair_dy = xs[j] - xs[i], ys[j] - ys[i]
+            pair_rx, pair_ry = semi_w[i] + semi_w[j], semi_h[i] + semi_h[j]
+            distance = np.sqrt((pair_dx / pair_rx) ** 2 + (pair_dy / pair_ry) ** 2)
+            # Words on the same spot are split along x, in index order
+            coincident = distance == 0
+            pair_dx[coincident] = pair_rx[coincident] * 1e-6
+            distance[coincident] = 1e-6
+            # Half of the stretch that brings the pair to distance 1 would be enough for
+            # a lone pair; a bit more settles crowds, where pushes partly cancel out
+            push = 0.6 * (1 / distance - 1)
+            push_x = pair_dx * push
+            push_y = pair_dy * push
+            new_x = np.clip(xs + np.bincount(j, push_x, n) - np.bincount(i, push_x, n), low_x, high_x)
+            new_y = np.clip(ys + np.bincount(j, push_y, n) - np.bincount(i, push_y, n), low_y, high_y)
+            step = max(np.abs(new_x - xs).max(), np.abs(new_y - ys).max())
+            xs[:], ys[:] = new_x, new_y
+            # Jammed against each other or the edges: more iterations will not help
+            if step < 0.01:
+                break
+
+        return np.flatnonzero((xs != start_x) | (ys != start_y))
+
+    def overlapping_pairs(self, gap: float = 0.0) -> Tuple[np.ndarray, np.ndarray]:
+        """Index pairs (i < j) of the words whose ellipses, grown by gap, overlap."""
+        if len(self.words) < 2:
+            return np.zeros(0, dtype=np.intp), np.zeros(0, dtype=np.intp)
+        semi_w = self.widths / (2 * self.scale_factor) + gap / 2
+        semi_h = self.heights / (2 * self.scale_factor) + gap / 2
+        return _overlapping_pairs(self.xs, self.ys, semi_w, semi_h)
+
+    # -------------------------------------------------------------------- view
+
+    def zoom_about(self, pivot_x: float, pivot_y: float, factor: float) -> bool:
+        """
+        Scale the view by factor, keeping the logical point under the pivot fixed.
+
+        Returns:
+            True if the scale changed (it is clamped to [min_scale, max_scale]).
+        """
+        logical_px = (pivot_x - self.offset_x) / self.scale_factor
+        logical_py = (pivot_y - self.offset_y) / self.scale_factor
+
+        new_scale = max(self.min_scale, min(self.max_scale, self.scale_factor * factor))
+        if new_scale == self.scale_factor:
+            return False
+
+        self.scale_factor = new_scale
+        self.offset_x = pivot_x - logical_px * new_scale
+        self.offset_y = pivot_y - logical_py * new_scale
+        return True
+
+    def zoom_percentage(self, max_percentage: int = WORDSPACE['ZOOM']['MAX_ZOOM_PERCENTAGE']) -> int:
+        """Scale normalized to 0..max_percentage over [min_scale, max_scale]."""
+        normalized = (self.scale_factor - self.min_scale) / (self.max_scale - self.min_scale)
+        return int(normalized * max_percentage)
+
+    def pan(self, dx: float, dy: float) -> None:
+        self.offset_x += dx
+        self.offset_y += dy
+
+    def logical_bounds(self) -> Optional[Dict[str, float]]:
+        """Bounding box of the word ovals at the current scale, None when there are no words."""
+        if not self.words:
+            return None
+        half_w = self.widths / (2 * self.scale_factor)
+        half_h = self.heights / (2 * self.scale_factor)
+        return {
+            'min_x': float((self.xs - half_w).min()),
+            'max_x': float((self.xs + half_w).max()),
+            'min_y': float((self.ys - half_h).min()),
+            'max_y': float((self.ys + half_h).max())
+        }
+
+    def clamp_offset(self, safety_margin: float = WORDSPACE['CANVAS']['MARGINS']['SAFETY_MARGIN']) -> None:
+        """Constrain the offset so that the words stay within the device area."""
+        if not self.words:
+            return
+        sf = self.scale_factor
+        half_w = self.widths / (2 * sf)
+        half_h = self.heights / (2 * sf)
+
+        allowed_min_x = float((self.xs - half_w).min()) - safety_margin
+        allowed_max_x = float((self.xs + half_w).max()) + safety_margin
+        allowed_min_y = float((self.ys - half_h).min()) - safety_margin
+        allowed_max_y = float((self.ys + half_h).max()) + safety_margin
+
+        min_offset_x = self.width - allowed_max_x * sf
+        max_offset_x = -allowed_min_x * sf
+        min_offset_y = self.height - allowed_max_y * sf
+        max_offset_y = -allowed_min_y * sf
+
+        self.offset_x = min(max(self.offset_x, min_offset_x), max_offset_x)
+        self.offset_y = min(max(self.offset_y, min_offset_y), max_offset_y)
+
+    def reset_pov(self) -> None:
+        """Back to 1:1 scale, centered on the words (or on the origin if empty)."""
+        self.scale_factor = 1.0
+        bounds = self.logical_bounds()
+        if bounds is None:
+            self.offset_x = self.width / 2
+            self.offset_y = self.height / 2
+            return
+        center_x = (bounds['min_x'] + bounds['max_x']) / 2
+        center_y = (bounds['min_y'] + bounds['max_y']) / 2
+        self.offset_x = self.width / 2 - center_x * self.scale_factor
+        self.offset_y = self.height / 2 - center_y * self.scale_factor
+
+
+def _overlapping_pairs(xs: np.ndarray, ys: np.ndarray, semi_w: np.ndarray,
+                       semi_h: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Index pairs (i < j) whose ellipses, with the given semi-axes, overlap."""
+    # Scaled by the largest reach, every overlapping pair is within distance 1, so
+    # the tree returns a superset of them without comparing all pairs
+    reach_x, reach_y = 2 * semi_w.max(), 2 * semi_h.max()
+    candidates = cKDTree(np.column_stack((xs / reach_x, ys / reach_y))).query_pairs(1.0, output_type='ndarray')
+    i, j = candidates[:, 0], candidates[:, 1]
+    inside = (((xs[j] - xs[i]) / (semi_w[i] + semi_w[j])) ** 2 +
+              ((ys[j] - ys[i]) / (semi_h[i] + semi_h[j])) ** 2) < 1
+    return i[inside], j[inside]
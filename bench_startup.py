@@ -0,0 +1,91 @@
+"""
+Startup benchmark: time-to-interactive of the entry window.
+
+Launches `main.py --profile-startup --exit-after-paint` several times, reports
+the median and worst run, and appends the result to a CSV history so startup
+time can be tracked across releases and lab PCs.
+
+Usage:
+    python bench_startup.py [--runs 10] [--history startup_benchmark.csv]
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from settings import STARTUP_PROFILE
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def run_once() -> dict:
+    """Start the application once and return its startup profile."""
+    with tempfile.TemporaryDirectory() as tmp:
+        output = os.path.join(tmp, 'profile.json')
+        start = time.perf_counter()
+        subprocess.run(
+            [sys.executable, os.path.join(HERE, 'main.py'),
+             '--profile-startup', '--exit-after-paint', '--profile-output', output],
+            check=True, stdout=subprocess.DEVNULL, cwd=HERE
+        )
+        wall_ms = (time.perf_counter() - start) * 1000
+        with open(output) as f:
+            profile = json.load(f)
+    profile['wall_ms'] = wall_ms
+    return profile
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=HERE,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return ''
+
+
+def append_history(filepath: str, row: dict) -> None:
+    exists = os.path.exists(filepath)
+    with open(filepath, 'a', newline='') as f:
+        writer = csv.DictWriter(f, fieldnames=list(row))
+        if not exists:
+            writer.writeheader()
+        writer.writerow(row)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark entry-window startup time")
+    parser.add_argument('--runs', type=int, default=STARTUP_PROFILE['BENCHMARK_RUNS'])
+    parser.add_argument('--history', default=os.path.join(HERE, STARTUP_PROFILE['HISTORY_FILE']))
+    args = parser.parse_args()
+
+    profiles = [run_once() for _ in range(args.runs)]
+    tti = [p['time_to_interactive_ms'] for p in profiles]
+    wall = [p['wall_ms'] for p in profiles]
+    eager = sorted({m for p in profiles for m in p['deferred_modules_loaded']})
+
+    row = {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'host': platform.node(),
+        'python': platform.python_version(),
+        'revision': git_revision(),
+        'runs': args.runs,
+        'tti_median_ms': round(statistics.median(tti), 1),
+        'tti_max_ms': round(max(tti), 1),
+        'wall_median_ms': round(statistics.median(wall), 1),
+        'modules_loaded': profiles[-1]['modules_loaded'],
+        'eager_deferred_modules': ' '.join(eager)
+    }
+    append_history(args.history, row)
+
+    print(f"time-to-interactive: median {row['tti_median_ms']} ms, max {row['tti_max_ms']} ms "
+          f"(process wall median {row['wall_median_ms']} ms, {args.runs} runs)")
+    if eager:
+        print(f"WARNING modules imported before first paint: {row['eager_deferred_modules']}")
+    print(f"Appended to {args.history}")
@@ -0,0 +1,334 @@
+"""
+Scripted "bot participant" for end-to-end load testing.
+
+Drives EntryWindow -> MainWindow with Tk's event_generate: stack clicks, drags,
+wheel zooms and arrow-key pans, through every trial of a full session including
+all persistence. Runs N sessions back-to-back and reports throughput, event
+handling latency percentiles and the output files produced.
+
+Usage:
+    python bot_participant.py --wordlist wordlist.csv --sessions 5 [--xvfb]
+
+Dialogs are answered automatically while the bot runs, so no human is needed.
+"""
+import argparse
+import contextlib
+import json
+import os
+import random
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+from tkinter import messagebox
+from typing import Dict, List, Optional
+
+from settings import BOT_PARTICIPANT, PATHS
+
+
+def percentiles(samples: List[float], points=(50, 90, 99)) -> Dict[str, float]:
+    """Nearest-rank percentiles of a list of samples."""
+    if not samples:
+        return {f"p{p}": 0.0 for p in points}
+    ordered = sorted(samples)
+    last = len(ordered) - 1
+    return {f"p{p}": ordered[min(last, round(p / 100 * last))] for p in points}
+
+
+@contextlib.contextmanager
+def auto_dismiss_dialogs():
+    """Answer every tkinter messagebox positively while the bot is running."""
+    names = ('showinfo', 'showwarning', 'showerror', 'askyesno', 'askokcancel')
+    originals = {name: getattr(messagebox, name) for name in names}
+    dialogs = []
+
+    def make_stub(name):
+        def stub(title=None, message=None, **options):
+            dialogs.append((name, title, message))
+            return True
+        return stub
+
+    for name in names:
+        setattr(messagebox, name, make_stub(name))
+    try:
+        yield dialogs
+    finally:
+        for name, original in originals.items():
+            setattr(messagebox, name, original)
+
+
+@contextlib.contextmanager
+def virtual_display(display=BOT_PARTICIPANT['XVFB']['DISPLAY'], screen=BOT_PARTICIPANT['XVFB']['SCREEN']):
+    """Run an Xvfb server for the duration of the block."""
+    process = subprocess.Popen(['Xvfb', display, '-screen', '0', screen, '-nolisten', 'tcp'],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    previous = os.environ.get('DISPLAY')
+    os.environ['DISPLAY'] = display
+    time.sleep(0.5)  # Give the server time to accept connections
+    try:
+        yield display
+    finally:
+        process.terminate()
+        process.wait()
+        if previous is None:
+            os.environ.pop('DISPLAY', None)
+        else:
+            os.environ['DISPLAY'] = previous
+
+
+class BotParticipant:
+    """Plays one or more complete sessions through the real GUI."""
+
+    def __init__(
+        self,
+        seed: Optional[int] = None,
+        drags_per_word: int = BOT_PARTICIPANT['DRAGS_PER_WORD'],
+        motion_steps: int = BOT_PARTICIPANT['MOTION_STEPS'],
+        event_delay_ms: int = BOT_PARTICIPANT['EVENT_DELAY_MS'],
+        delay_jitter_ms: int = BOT_PARTICIPANT['DELAY_JITTER_MS'],
+        zoom_probability: float = BOT_PARTICIPANT['ZOOM_PROBABILITY'],
+        pan_probability: float = BOT_PARTICIPANT['PAN_PROBABILITY']
+    ):
+        self.rng = random.Random(seed)
+        self.drags_per_word = drags_per_word
+        self.motion_steps = motion_steps
+        self.event_delay_ms = event_delay_ms
+        self.delay_jitter_ms = delay_jitter_ms
+        self.zoom_probability = zoom_probability
+        self.pan_probability = pan_probability
+
+        # Per event kind: time inside the handler and time until redrawn
+        self.handler_ms: Dict[str, List[float]] = {}
+        self.render_ms: Dict[str, List[float]] = {}
+
+    # ------------------------------------------------------------ event helpers
+
+    def _fire(self, widget, sequence: str, kind: str, **kw) -> None:
+        """Generate one event and record how long it took to handle and redraw."""
+        start = time.perf_counter()
+        widget.event_generate(sequence, **kw)
+        handled = time.perf_counter()
+        widget.update_idletasks()
+        rendered = time.perf_counter()
+        self.handler_ms.setdefault(kind, []).append((handled - start) * 1000)
+        self.render_ms.setdefault(kind, []).append((rendered - start) * 1000)
+
+    def _invoke(self, button, kind: str) -> None:
+        """Press a button and record how long its command took."""
+        start = time.perf_counter()
+        button.invoke()
+        self.handler_ms.setdefault(kind, []).append((time.perf_counter() - start) * 1000)
+
+    def _delay(self) -> int:
+        jitter = self.rng.randint(0, self.delay_jitter_ms) if self.delay_jitter_ms else 0
+        return self.event_delay_ms + jitter
+
+    def _drag(self, word_space, dw):
+        """Press on a word, move it along a straight path and release it."""
+        canvas = word_space.canvas
+        start_x, start_y = (int(v) for v in word_space.model.device_center(dw.index))
+        width, height = word_space.model.width, word_space.model.height
+        if not (0 <= start_x < width and 0 <= start_y < height):
+            # Word is out of view, recenter like a participant would
+            self._invoke(word_space.main_window.reset_pov_btn, 'recenter')
+            start_x, start_y = (int(v) for v in word_space.model.device_center(dw.index))
+
+        target_x = self.rng.randint(0, width - 1)
+        target_y = self.rng.randint(0, height - 1)
+
+        self._fire(canvas, '<Motion>', 'motion', x=start_x, y=start_y)
+        self._fire(canvas, '<ButtonPress-1>', 'press', x=start_x, y=start_y)
+        yield
+        for step in range(1, self.motion_steps + 1):
+            x = start_x + (target_x - start_x) * step // self.motion_steps
+            y = start_y + (target_y - start_y) * step // self.motion_steps
+            self._fire(canvas, '<B1-Motion>', 'drag_move', x=x, y=y)
+            yield
+        self._fire(canvas, '<ButtonRelease-1>', 'release', x=target_x, y=target_y)
+        yield
+
+    def _session_actions(self, main):
+        """Generator performing one full session, yielding between events."""
+        word_space = main.word_space
+        canvas = word_space.canvas
+        arrows = ('<Left>', '<Right>', '<Up>', '<Down>')
+
+        while True:
+            finished = main.trial_manager.get_trial_number() >= main.trial_manager.max_trials
+            while len(main.word_stack):
+                # Always click the top row; the stack relabels its rows as words leave
+                self._fire(main.word_stack.rows[0], '<ButtonRelease-1>', 'stack_click', x=2, y=2)
+                yield
+                dw = word_space.draggables[-1]
+                for _ in range(self.drags_per_word):
+                    yield from self._drag(word_space, dw)
+
+                if self.rng.random() < self.zoom_probability:
+                    x = self.rng.randint(1, word_space.model.width - 1)
+                    y = self.rng.randint(1, word_space.model.height - 1)
+                    self._fire(canvas, '<Motion>', 'motion', x=x, y=y)
+                    delta = self.rng.choice((120, -120))
+                    self._fire(canvas, '<MouseWheel>', 'wheel_zoom', x=x, y=y, delta=delta)
+                    yield
+                if self.rng.random() < self.pan_probability:
+                    main.focus_force()
+                    self._fire(main, self.rng.choice(arrows), 'arrow_pan')
+                    yield
+
+            self._invoke(main.end_trial_btn, 'end_trial')
+            if finished:
+                return
+            yield
+
+    # ---------------------------------------------------------------- sessions
+
+    def run_session(self, wordlist_path: str, participant_id: str) -> dict:
+        """Run one session from the setup form to the last trial."""
+        import tkinter as tk
+        from entry_window import EntryWindow
+
+        root = tk.Tk()
+        root.withdraw()
+        entry = EntryWindow(root)
+        entry.participant_id.set(participant_id)
+        entry.experimenter_name.set('bot')
+        entry.notes.set('synthetic load test')
+        entry.wordlist_path.set(wordlist_path)
+        entry.verify_data()
+        if not entry.data_verified:
+            root.destroy()
+            raise RuntimeError(f"Setup validation failed for {participant_id}")
+
+        events_before = sum(len(v) for v in self.render_ms.values())
+        errors = []
+
+        def drive(actions=None):
+            main = entry.main_window
+            if main is None:
+                entry.after(10, drive)  # Main window not created yet
+                return
+            if actions is None:
+                main.update()  # Map the window so the canvas has its real size
+                actions = self._session_actions(main)
+            try:
+                next(actions)
+            except StopIteration:
+                return
+            except Exception as e:
+                errors.append(repr(e))
+                if main.winfo_exists():
+                    main.destroy()
+                return
+            main.after(self._delay(), drive, actions)
+
+        start = time.perf_counter()
+        entry.after(0, drive)
+        entry.start_experiment()  # Blocks until the main window is closed
+        duration = time.perf_counter() - start
+        with contextlib.suppress(tk.TclError):
+            root.destroy()
+
+        participant_dir = os.path.join(PATHS['DATA_DIRECTORY'], participant_id)
+        files = sorted(
+            os.path.join(dirpath, name)
+            for dirpath, _, names in os.walk(participant_dir) for name in names
+        )
+        events = sum(len(v) for v in self.render_ms.values()) - events_before
+        return {
+            'participant_id': participant_id,
+            'duration_s': duration,
+            'events': events,
+            'events_per_s': events / duration if duration else 0.0,
+            'errors': errors,
+            'output_files': {path: os.path.getsize(path) for path in files}
+        }
+
+    def run(self, wordlist_path: str, sessions: int,
+            first_id: int = BOT_PARTICIPANT['PARTICIPANT_ID_START']) -> dict:
+        """Run several sessions back-to-back and summarize them."""
+        wordlist_path = os.path.abspath(wordlist_path)
+        reports = []
+        start = time.perf_counter()
+        with auto_dismiss_dialogs() as dialogs:
+            for n in range(sessions):
+                reports.append(self.run_session(wordlist_path, f"P{first_id + n}"))
+        total = time.perf_counter() - start
+
+        all_events = sum(r['events'] for r in reports)
+        return {
+            'sessions': len(reports),
+            'duration_s': total,
+            'sessions_per_hour': len(reports) / total * 3600 if total else 0.0,
+            'events': all_events,
+            'events_per_s': all_events / total if total else 0.0,
+            'handler_ms': {kind: percentiles(v) for kind, v in sorted(self.handler_ms.items())},
+            'render_ms': {kind: percentiles(v) for kind, v in sorted(self.render_ms.items())},
+            'dialogs': len(dialogs),
+            'session_reports': reports
+        }
+
+
+def print_report(report: dict) -> None:
+    print(f"{report['sessions']} session(s) in {report['duration_s']:.1f}s "
+          f"({report['sessions_per_hour']:.1f}/h, {report['events_per_s']:.0f} events/s)")
+    print(f"{'event':<14}{'handler p50/p90/p99 ms':>28}{'render p50/p90/p99 ms':>28}")
+    for kind, handler in report['handler_ms'].items():
+        render = report['render_ms'].get(kind, percentiles([]))
+        print(f"{kind:<14}"
+              f"{handler['p50']:>10.2f}{handler['p90']:>9.2f}{handler['p99']:>9.2f}"
+              f"{render['p50']:>10.2f}{render['p90']:>9.2f}{render['p99']:>9.2f}")
+    for session in report['session_reports']:
+        size = sum(session['output_files'].values())
+        status = f"{len(session['errors'])} error(s)" if session['errors'] else "ok"
+        print(f"{session['participant_id']}: {session['duration_s']:.1f}s, "
+              f"{len(session['output_files'])} files ({size} bytes), {status}")
+        for path in session['output_files']:
+            print(f"    {path}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run synthetic participants through the full GUI")
+    parser.add_argument('--wordlist', default='wordlist.csv')
+    parser.add_argument('--sessions', type=int, default=BOT_PARTICIPANT['SESSIONS'])
+    parser.add_argument('--drags-per-word', type=int, default=BOT_PARTICIPANT['DRAGS_PER_WORD'])
+    parser.add_argument('--motion-steps', type=int, default=BOT_PARTICIPANT['MOTION_STEPS'])
+    parser.add_argument('--delay-ms', type=int, default=BOT_PARTICIPANT['EVENT_DELAY_MS'])
+    parser.add_argument('--jitter-ms', type=int, default=BOT_PARTICIPANT['DELAY_JITTER_MS'])
+    parser.add_argument('--zoom-probability', type=float, default=BOT_PARTICIPANT['ZOOM_PROBABILITY'])
+    parser.add_argument('--pan-probability', type=float, default=BOT_PARTICIPANT['PAN_PROBABILITY'])
+    parser.add_argument('--seed', type=int, default=None)
+    parser.add_argument('--workdir', default=None,
+                        help="Directory receiving the data/ folder (default: a new temporary directory)")
+    parser.add_argument('--keep', action='store_true', help="Keep the temporary working directory")
+    parser.add_argument('--xvfb', action='store_true', help="Start an Xvfb server for the run")
+    parser.add_argument('--report', default=None, help="Also write the report as JSON to this file")
+    args = parser.parse_args()
+
+    wordlist = os.path.abspath(args.wordlist)
+    workdir = args.workdir or tempfile.mkdtemp(prefix='semgui_bot_')
+    os.makedirs(workdir, exist_ok=True)
+    os.chdir(workdir)
+
+    bot = BotParticipant(
+        seed=args.seed,
+        drags_per_word=args.drags_per_word,
+        motion_steps=args.motion_steps,
+        event_delay_ms=args.delay_ms,
+        delay_jitter_ms=args.jitter_ms,
+        zoom_probability=args.zoom_probability,
+        pan_probability=args.pan_probability
+    )
+    display = virtual_display() if args.xvfb else contextlib.nullcontext()
+    with display:
+        report = bot.run(wordlist, args.sessions)
+
+    print_report(report)
+    if args.report:
+        with open(args.report, 'w', encoding='utf-8') as f:
+            json.dump(report, f, indent=2)
+    if args.workdir is None and not args.keep:
+        shutil.rmtree(workdir, ignore_errors=True)
+    else:
+        print(f"Session data kept in {workdir}")
+    sys.exit(1 if any(r['errors'] for r in report['session_reports']) else 0)
@@ -0,0 +1,66 @@
+"""
+Content-addressed on-disk cache for derived analysis data
+"""
+import hashlib
+import os
+from typing import Optional
+
+import numpy as np
+
+
+def digest(*parts) -> str:
+    """Return a stable SHA-256 hex digest of strings, bytes and arrays."""
+    h = hashlib.sha256()
+    for part in parts:
+        if isinstance(part, np.ndarray):
+            part = np.ascontiguousarray(part)
+            h.update(str((part.dtype.str, part.shape)).encode())
+            h.update(part.tobytes())
+        elif isinstance(part, bytes):
+            h.update(part)
+        else:
+            h.update(repr(part).encode('utf-8'))
+        h.update(b'\x00')  # Separator so ('ab', 'c') != ('a', 'bc')
+    return h.hexdigest()
+
+
+def file_digest(filepath: str, chunk_size: int = 1 << 16) -> str:
+    """Return the SHA-256 hex digest of a file's content."""
+    h = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for chunk in iter(lambda: f.read(chunk_size), b''):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+class ArrayCache:
+    """Stores NumPy arrays as .npy files named after their input digest."""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        self.hits = 0
+        self.misses = 0
+        os.makedirs(directory, exist_ok=True)
+
+    def path_for(self, key: str) -> str:
+        # Two-level fan-out keeps directories small for large cohorts
+        return os.path.join(self.directory, key[:2], f"{key}.npy")
+
+    def get(self, key: str) -> Optional[np.ndarray]:
+        path = self.path_for(key)
+        try:
+            array = np.load(path, allow_pickle=False)
+        except (FileNotFoundError, ValueError, OSError):
+            self.misses += 1
+            return None
+        self.hits += 1
+        return array
+
+    def put(self, key: str, array: np.ndarray) -> None:
+        path = self.path_for(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'wb') as f:
+            np.save(f, array, allow_pickle=False)
+        # Atomic rename so concurrent readers never see a partial file
+        os.replace(tmp_path, path)
@@ -0,0 +1,180 @@
+"""
+Hierarchical clustering of participant arrangements.
+
+Runs agglomerative clustering over the final coordinates of every trial and over
+the group RDM (representational dissimilarity matrix) of each trial, caching the
+linkage matrices on disk so repeated runs only recompute changed sessions.
+
+Usage:
+    python clustering.py [--data-dir data] [--output dendrograms.json]
+"""
+import argparse
+import json
+import logging
+import os
+from typing import Dict, List, Optional, Tuple
+
+import numpy as np
+from scipy.cluster.hierarchy import dendrogram, linkage
+from scipy.spatial.distance import pdist, squareform
+
+from cache import ArrayCache, digest
+from settings import CLUSTERING, TRIAL_MANAGER
+from trial_manager import find_results_files, load_trial_results
+
+logger = logging.getLogger(__name__)
+
+# Methods that are valid on a precomputed (non-Euclidean) condensed matrix
+SUPPORTED_METHODS = ('single', 'complete', 'average', 'weighted')
+
+
+def trial_arrangements(rows: List[dict]) -> Dict[int, Tuple[List[str], np.ndarray]]:
+    """Group result rows by trial into (sorted words, n x 2 coordinate array)."""
+    by_trial: Dict[int, Dict[str, Tuple[float, float]]] = {}
+    for row in rows:
+        by_trial.setdefault(row['trial_number'], {})[row['word']] = (row['x_coord'], row['y_coord'])
+
+    arrangements = {}
+    for trial, positions in by_trial.items():
+        words = sorted(positions)
+        coords = np.array([positions[w] for w in words], dtype=np.float64)
+        arrangements[trial] = (words, coords)
+    return arrangements
+
+
+def arrangement_rdm(coords: np.ndarray, metric: str = CLUSTERING['METRIC'],
+                    normalize: bool = CLUSTERING['NORMALIZE_RDM']) -> np.ndarray:
+    """Condensed pairwise distance vector of one arrangement."""
+    rdm = pdist(coords, metric=metric)
+    if normalize and rdm.size and rdm.max() > 0:
+        # Participants use different portions of the canvas, only relative distances matter
+        rdm = rdm / rdm.max()
+    return rdm
+
+
+def group_rdm(arrangements: List[Tuple[List[str], np.ndarray]],
+              metric: str = CLUSTERING['METRIC'],
+              normalize: bool = CLUSTERING['NORMALIZE_RDM']) -> Tuple[List[str], np.ndarray]:
+    """
+    Average the RDMs of several participants for the same trial.
+
+    Words missing from an arrangement are ignored for that participant only.
+
+    Returns:
+        The union of words (sorted) and the condensed mean dissimilarity vector.
+    """
+    labels = sorted({word for words, _ in arrangements for word in words})
+    index = {word: i for i, word in enumerate(labels)}
+    n = len(labels)
+
+    stacked = np.full((len(arrangements), n, n), np.nan)
+    for k, (words, coords) in enumerate(arrangements):
+        idx = np.fromiter((index[w] for w in words), dtype=np.intp, count=len(words))
+        stacked[k][np.ix_(idx, idx)] = squareform(arrangement_rdm(coords, metric, normalize))
+
+    with np.errstate(invalid='ignore'):
+        counts = np.sum(~np.isnan(stacked), axis=0)
+        mean = np.where(counts > 0, np.nansum(stacked, axis=0) / np.maximum(counts, 1), np.nan)
+
+    # Pairs nobody placed together are treated as maximally dissimilar
+    if np.isnan(mean).any():
+        mean[np.isnan(mean)] = np.nanmax(mean) if not np.isnan(mean).all() else 1.0
+    np.fill_diagonal(mean, 0.0)
+    return labels, squareform(mean, checks=False)
+
+
+def cached_linkage(condensed: np.ndarray, cache: Optional[ArrayCache],
+                   method: str = CLUSTERING['METHOD']) -> np.ndarray:
+    """Compute (or load from cache) the linkage matrix of a condensed distance vector."""
+    if method not in SUPPORTED_METHODS:
+        raise ValueError(f"Unsupported linkage method '{method}', expected one of {SUPPORTED_METHODS}")
+
+    key = digest('linkage', method, condensed)
+    if cache is not None:
+        cached = cache.get(key)
+        if cached is not None:
+            return cached
+
+    z = linkage(condensed, method=method)
+    if cache is not None:
+        cache.put(key, z)
+    return z
+
+
+def dendrogram_data(z: np.ndarray, labels: List[str]) -> dict:
+    """Return everything needed to draw a dendrogram without recomputing it."""
+    tree = dendrogram(z, labels=labels, no_plot=True)
+    return {
+        'labels': labels,
+        'linkage': z.tolist(),
+        'icoord': tree['icoord'],
+        'dcoord': tree['dcoord'],
+        'leaves': tree['leaves'],
+        'ivl': tree['ivl']
+    }
+
+
+def cluster_cohort(data_dir: str = TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'],
+                   cache_dir: str = CLUSTERING['PATHS']['CACHE_DIRECTORY'],
+                   method: str = CLUSTERING['METHOD']) -> dict:
+    """
+    Cluster every participant's trials and the group RDM of each trial.
+
+    Args:
+        data_dir: Folder containing one sub-folder per participant
+        cache_dir: Folder for cached linkage matrices
+        method: Agglomerative linkage method
+
+    Returns:
+        Dendrogram data keyed by participant and trial, plus the group trees.
+    """
+    cache = ArrayCache(cache_dir)
+    participants: Dict[str, dict] = {}
+    per_trial: Dict[int, List[Tuple[List[str], np.ndarray]]] = {}
+
+    for participant_id, filepath in find_results_files(data_dir).items():
+        participant_trees = {}
+        for trial, (words, coords) in sorted(trial_arrangements(load_trial_results(filepath)).items()):
+            per_trial.setdefault(trial, []).append((words, coords))
+            if len(words) < 2:
+                continue
+            z = cached_linkage(arrangement_rdm(coords), cache, method)
+            participant_trees[str(trial)] = dendrogram_data(z, words)
+        participants[participant_id] = participant_trees
+
+    group = {}
+    for trial, arrangements in sorted(per_trial.items()):
+        labels, condensed = group_rdm(arrangements)
+        if len(labels) < 2:
+            continue
+        z = cached_linkage(condensed, cache, method)
+        group[str(trial)] = dict(dendrogram_data(z, labels), n_participants=len(arrangements))
+
+    logger.info("Clustering done: %d cached, %d computed", cache.hits, cache.misses)
+    return {'method': method, 'participants': participants, 'group': group}
+
+
+def export_cohort_dendrograms(output_path: str, **kwargs) -> str:
+    """Run cluster_cohort and write the result as a single JSON document."""
+    result = cluster_cohort(**kwargs)
+    output_dir = os.path.dirname(output_path)
+    if output_dir:
+        os.makedirs(output_dir, exist_ok=True)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        json.dump(result, f)
+    return output_path
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Cluster participant arrangements")
+    parser.add_argument('--data-dir', default=TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'])
+    parser.add_argument('--cache-dir', default=CLUSTERING['PATHS']['CACHE_DIRECTORY'])
+    parser.add_argument('--method', default=CLUSTERING['METHOD'], choices=SUPPORTED_METHODS)
+    parser.add_argument('--output', default=os.path.join(
+        TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'], CLUSTERING['PATHS']['OUTPUT_FILENAME']))
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    path = export_cohort_dendrograms(args.output, data_dir=args.data_dir,
+                                     cache_dir=args.cache_dir, method=args.method)
+    print(f"Dendrogram data written to {path}")
@@ -0,0 +1,405 @@
+"""
+Multi-station lab collector.
+
+An asyncio server that receives trial results and session-log updates from the
+testing stations and batch-writes them into one central SQLite database. The
+protocol is newline-delimited JSON over TCP:
+
+    station -> collector   {"id": "...", "station": "S01", "type": "trial" | "session", "payload": {...}}
+    collector -> station   {"ack": "<id>"}  or  {"ack": "<id>", "error": "..."}
+
+A message is acknowledged only after the transaction containing it committed.
+Messages that can never be committed (missing payload keys, wrong payload shape)
+are acknowledged with an error; stations move those to spool/rejected/.
+Stations write every message to a local spool directory first and delete it on
+ack, so they survive collector restarts, network drops and their own crashes by
+resending; writes are idempotent (trials replace, sessions upsert).
+
+Usage:
+    python collector.py [--host 0.0.0.0] [--port 8765] [--database collector/semgui.sqlite3]
+"""
+import argparse
+import asyncio
+import collections
+import contextlib
+import json
+import logging
+import os
+import re
+import socket
+import threading
+import time
+from typing import Deque, Dict, List, Optional
+
+from settings import COLLECTOR
+from storage import SQLiteStore
+
+logger = logging.getLogger(__name__)
+
+MESSAGE_TYPES = ('trial', 'session')
+# Payload keys without which a message can never be committed
+REQUIRED_KEYS = {
+    'trial': ('participant_id', 'trial_number', 'rows'),
+    'session': ('participant_id',)
+}
+ROW_KEYS = frozenset(('trial_number', 'word', 'x_coord', 'y_coord', 'highlighted'))
+# Stations write the id first, so it can be read from the start of an oversized message
+LEADING_ID = re.compile(rb'\{\s*"id"\s*:\s*"([^"\\]+)"')
+
+
+def validate_message(message) -> None:
+    """Raise ValueError unless the message can be acked and committed."""
+    if not isinstance(message, dict):
+        raise ValueError("message is not an object")
+    if not isinstance(message.get('id'), str) or not message['id']:
+        raise ValueError("missing message id")
+    if message.get('type') not in MESSAGE_TYPES:
+        raise ValueError(f"unknown message type {message.get('type')!r}")
+    payload = message.get('payload')
+    if not isinstance(payload, dict):
+        raise ValueError("payload is not an object")
+    missing = [key for key in REQUIRED_KEYS[message['type']] if key not in payload]
+    if missing:
+        raise ValueError(f"{message['type']} payload lacks {', '.join(missing)}")
+    if message['type'] == 'trial':
+        rows = payload['rows']
+        if not isinstance(rows, list) or not all(isinstance(row, dict) and ROW_KEYS <= row.keys() for row in rows):
+            raise ValueError(f"trial rows must be objects with {', '.join(sorted(ROW_KEYS))}")
+
+
+class MessageTooLarge(ValueError):
+    """A message line longer than the stream limit; it has been skipped whole."""
+
+    def __init__(self, head: bytes, limit: int):
+        super().__init__(f"message is longer than {limit} bytes")
+        match = LEADING_ID.match(head)
+        self.message_id = match.group(1).decode('utf-8', 'replace') if match else None
+
+
+async def read_line(reader: asyncio.StreamReader, limit: int) -> bytes:
+    """Like reader.readline(), but a line over the limit is skipped and raises MessageTooLarge."""
+    try:
+        return await reader.readuntil(b'\n')
+    except asyncio.IncompleteReadError as e:
+        return e.partial
+    except asyncio.LimitOverrunError as e:
+        head = await reader.readexactly(e.consumed)
+    # Drop the rest of the line so the next message is read from its start
+    while True:
+        try:
+            await reader.readuntil(b'\n')
+            break
+        except asyncio.LimitOverrunError as e:
+            await reader.readexactly(e.consumed)
+    raise MessageTooLarge(head[:1024], limit)
+
+
+# ---------------------------------------------------------------------- server
+
+class CollectorServer:
+    """Receives station messages and commits them to the store in batches."""
+
+    def __init__(self, store: SQLiteStore, host: str = COLLECTOR['HOST'], port: int = COLLECTOR['PORT'],
+                 batch_size: int = COLLECTOR['BATCH_SIZE'], batch_interval_ms: int = COLLECTOR['BATCH_INTERVAL_MS'],
+                 max_message_bytes: int = COLLECTOR['MAX_MESSAGE_BYTES']):
+        self.store = store
+        self.host = host
+        self.port = port
+        self.batch_size = batch_size
+        self.batch_interval = batch_interval_ms / 1000
+        self.max_message_bytes = max_message_bytes
+        self.stations = set()
+        self.messages_committed = 0
+        self._connections = set()
+        self._queue: Optional[asyncio.Queue] = None
+        self._server: Optional[asyncio.base_events.Server] = None
+        self._writer_task: Optional[asyncio.Task] = None
+
+    async def start(self) -> None:
+        self._queue = asyncio.Queue()
+        self._writer_task = asyncio.create_task(self._write_batches())
+        # The default 64 KiB line limit is smaller than a long trial
+        self._server = await asyncio.start_server(self._handle_station, self.host, self.port,
+                                                  limit=self.max_message_bytes)
+        # Port 0 picks a free port, report the real one
+        self.port = self._server.sockets[0].getsockname()[1]
+        logger.info("Collector listening on %s:%d", self.host, self.port)
+
+    async def stop(self) -> None:
+        """Stop accepting stations, then commit whatever is already queued."""
+        if self._server is not None:
+            self._server.close()
+            # Stations reconnect later and resend anything that was not acked
+            for writer in list(self._connections):
+                writer.close()
+            await self._server.wait_closed()
+        if self._writer_task is not None:
+            await self._queue.join()
+            self._writer_task.cancel()
+
+    async def serve_forever(self) -> None:
+        await self.start()
+        async with self._server:
+            await self._server.serve_forever()
+
+    async def _handle_station(self, reader: asyncio.StreamReader, writer: asyncio.StreamWriter) -> None:
+        peer = writer.get_extra_info('peername')
+        station = None
+        self._connections.add(writer)
+        try:
+            while True:
+                message = None
+                try:
+                    line = await read_line(reader, self.max_message_bytes)
+                    if not line:
+                        break
+                    message = json.loads(line)
+                    validate_message(message)
+                except ValueError as e:
+                    logger.error("Rejecting malformed message from %s: %s", peer, e)
+                    # Resending can never fix it: reject it so the station stops retrying
+                    if isinstance(e, MessageTooLarge):
+                        message_id = e.message_id
+                    else:
+                        message_id = message.get('id') if isinstance(message, dict) else None
+                    if isinstance(message_id, str):
+                        writer.write(json.dumps({'ack': message_id, 'error': str(e)}).encode() + b'\n')
+                    continue
+                if station is None:
+                    station = message.get('station')
+                    self.stations.add(station)
+                    logger.info("Station %s connected from %s", station, peer)
+                await self._queue.put((message, writer))
+        except (ConnectionError, asyncio.IncompleteReadError):
+            pass
+        finally:
+            logger.info("Station %s disconnected", station or peer)
+            self._connections.discard(writer)
+            writer.close()
+
+    async def _write_batches(self) -> None:
+        while True:
+            batch = [await self._queue.get()]
+            # Messages that arrived during the previous commit join this one for free,
+            # waiting for more is optional (BATCH_INTERVAL_MS)
+            deadline = time.monotonic() + self.batch_interval
+            while len(batch) < self.batch_size:
+                if not self._queue.empty():
+                    batch.append(self._queue.get_nowait())
+                    continue
+                timeout = deadline - time.monotonic()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            messages = [message for message, _ in batch]
+            try:
+                try:
+                    await asyncio.to_thread(self._commit, messages)
+                    failed = set()
+                except Exception:
+                    # Commit one by one so a single bad message cannot hold back the others
+                    logger.exception("Failed to commit a batch of %d messages, retrying one by one", len(batch))
+                    failed = await asyncio.to_thread(self._commit_each, messages)
+                self.messages_committed += len(batch) - len(failed)
+                for i, (message, writer) in enumerate(batch):
+                    if i not in failed and not writer.is_closing():
+                        writer.write(json.dumps({'ack': message['id']}).encode() + b'\n')
+                # Not acked: those stations resend after reconnecting
+                for i in failed:
+                    batch[i][1].close()
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _commit(self, messages: List[dict]) -> None:
+        sessions = [m['payload'] for m in messages if m['type'] == 'session']
+        trials = [
+            (m['payload']['participant_id'], m['payload']['trial_number'], m['payload']['rows'])
+            for m in messages if m['type'] == 'trial'
+        ]
+        self.store.save_batch(sessions, trials)
+
+    def _commit_each(self, messages: List[dict]) -> set:
+        """Commit messages in separate transactions; returns the indices that failed."""
+        failed = set()
+        for i, message in enumerate(messages):
+            try:
+                self._commit([message])
+            except Exception:
+                logger.exception("Failed to commit message %s from %s", message['id'], message.get('station'))
+                failed.add(i)
+        return failed
+
+
+# ---------------------------------------------------------------------- client
+
+class CollectorClient:
+    """
+    Station side of the protocol.
+
+    send() only writes the message to the spool directory and returns; a daemon
+    thread delivers spooled messages in order, reconnecting with backoff.
+    """
+
+    def __init__(self, station_id: Optional[str] = COLLECTOR['STATION_ID'], host: str = COLLECTOR['HOST'],
+                 port: int = COLLECTOR['PORT'], spool_dir: str = COLLECTOR['SPOOL_DIRECTORY']):
+        self.station_id = station_id or socket.gethostname()
+        self.host = host
+        self.port = port
+        self.spool_dir = spool_dir
+        self.ack_latencies_ms: List[float] = []
+        self._sent_ns: Dict[str, int] = {}
+        os.makedirs(spool_dir, exist_ok=True)
+
+        self._seq = 0
+        self._cond = threading.Condition()
+        self._closing = False
+        self._closed = threading.Event()
+        # Messages left over from a previous run are resent first
+        self._pending: Deque[str] = collections.deque(
+            sorted(name for name in os.listdir(spool_dir) if name.endswith('.json'))
+        )
+        self._thread = threading.Thread(target=self._run, name='collector-client', daemon=True)
+        self._thread.start()
+
+    def send(self, kind: str, payload: dict) -> str:
+        """Spool a message for delivery and return its id."""
+        if kind not in MESSAGE_TYPES:
+            raise ValueError(f"Unknown message type {kind!r}")
+        with self._cond:
+            self._seq += 1
+            message_id = f"{time.time_ns():020d}-{self._seq:06d}-{self.station_id}"
+            message = {'id': message_id, 'station': self.station_id, 'type': kind, 'payload': payload}
+            path = os.path.join(self.spool_dir, f"{message_id}.json")
+            with open(f"{path}.tmp", 'w') as f:
+                json.dump(message, f)
+            os.replace(f"{path}.tmp", path)
+            self._pending.append(f"{message_id}.json")
+            self._sent_ns[message_id] = time.perf_counter_ns()
+            self._cond.notify()
+        return message_id
+
+    def pending(self) -> int:
+        with self._cond:
+            return len(self._pending)
+
+    def flush(self, timeout: float = COLLECTOR['FLUSH_TIMEOUT_S']) -> bool:
+        """Wait until every spooled message is acknowledged."""
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while self._pending:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                self._cond.wait(remaining)
+        return True
+
+    def close(self, timeout: float = COLLECTOR['FLUSH_TIMEOUT_S']) -> bool:
+        """Try to deliver the spool, then stop. Undelivered messages stay on disk."""
+        delivered = self.flush(timeout)
+        with self._cond:
+            self._closing = True
+            self._cond.notify_all()
+        self._closed.set()
+        return delivered
+
+    def close_in_background(self, timeout: float = COLLECTOR['FLUSH_TIMEOUT_S']) -> threading.Thread:
+        """close() on a separate thread, so a GUI never waits for an unreachable collector.
+
+        The thread is not a daemon: the process keeps delivering for up to timeout
+        after the window is gone, and anything left is resent on the next start.
+        """
+        thread = threading.Thread(target=self.close, args=(timeout,), name='collector-close')
+        thread.start()
+        return thread
+
+    def _run(self) -> None:
+        backoff = COLLECTOR['RECONNECT_BACKOFF_S'][0]
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+            try:
+                with socket.create_connection((self.host, self.port), timeout=COLLECTOR['SOCKET_TIMEOUT_S']) as sock:
+                    backoff = COLLECTOR['RECONNECT_BACKOFF_S'][0]
+                    self._deliver(sock)
+            except OSError as e:
+                logger.debug("Collector unreachable (%s), retrying in %.1fs", e, backoff)
+                # Not the condition: new messages must not cut the backoff short
+                if self._closed.wait(backoff):
+                    return
+                backoff = min(backoff * 2, COLLECTOR['RECONNECT_BACKOFF_S'][1])
+
+    def _deliver(self, sock: socket.socket) -> None:
+        """Send spooled messages over one connection until it fails or we close."""
+        stream = sock.makefile('rb')
+        while True:
+            with self._cond:
+                while not self._pending and not self._closing:
+                    self._cond.wait()
+                if self._closing:
+                    return
+                window = list(self._pending)[:COLLECTOR['WINDOW']]
+
+            # Pipeline a window of messages, then collect their acks
+            payload = bytearray()
+            for name in window:
+                with open(os.path.join(self.spool_dir, name), 'rb') as f:
+                    payload += f.read().rstrip(b'\n') + b'\n'
+            sock.sendall(payload)
+
+            outstanding = {name[:-len('.json')] for name in window}
+            while outstanding:
+                line = stream.readline()
+                if not line:
+                    raise ConnectionResetError("collector closed the connection")
+                try:
+                    reply = json.loads(line)
+                    message_id = reply['ack']
+                    if message_id not in outstanding:
+                        raise ValueError(f"ack for unknown message {message_id!r}")
+                except (ValueError, KeyError, TypeError) as e:
+                    # Start over on a new connection; whatever was not acked is resent
+                    raise ConnectionResetError(f"malformed reply from the collector: {e}") from e
+                outstanding.discard(message_id)
+                spooled = os.path.join(self.spool_dir, f"{message_id}.json")
+                if 'error' in reply:
+                    # Rejected for good: keep it aside for inspection instead of resending it
+                    logger.error("Collector rejected message %s: %s", message_id, reply['error'])
+                    os.makedirs(os.path.join(self.spool_dir, 'rejected'), exist_ok=True)
+                    with contextlib.suppress(FileNotFoundError):
+                        os.replace(spooled, os.path.join(self.spool_dir, 'rejected', f"{message_id}.json"))
+                else:
+                    with contextlib.suppress(FileNotFoundError):
+                        os.remove(spooled)
+                with self._cond:
+                    # Only messages spooled by this process have a meaningful send time
+                    sent_ns = self._sent_ns.pop(message_id, None)
+                    if sent_ns is not None:
+                        self.ack_latencies_ms.append((time.perf_counter_ns() - sent_ns) / 1e6)
+                    try:
+                        self._pending.remove(f"{message_id}.json")
+                    except ValueError:
+                        pass
+                    self._cond.notify_all()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Central collector for lab stations")
+    parser.add_argument('--host', default='0.0.0.0', help="Use 0.0.0.0 to accept stations on the LAN")
+    parser.add_argument('--port', type=int, default=COLLECTOR['PORT'])
+    parser.add_argument('--database', default=COLLECTOR['DATABASE_PATH'])
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = CollectorServer(SQLiteStore(args.database), args.host, args.port)
+    try:
+        asyncio.run(server.serve_forever())
+    except KeyboardInterrupt:
+        pass
@@ -0,0 +1,149 @@
+"""
+Load test for the lab collector.
+
+Runs a collector in a background thread and simulates many stations, each
+sending a full session (session log plus one message per trial) through its own
+spooling client. Halfway through, the collector is stopped and restarted to
+check that stations spool and resend without losing or duplicating trials.
+
+Usage:
+    python collector_loadtest.py [--stations 40] [--trials 11] [--words 17]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import tempfile
+import threading
+import time
+
+from bot_participant import percentiles
+from collector import CollectorClient, CollectorServer
+from storage import SQLiteStore
+
+
+class CollectorThread:
+    """A CollectorServer on its own event loop, startable and stoppable from tests."""
+
+    def __init__(self, database: str):
+        self.database = database
+        self.port = 0
+        self.committed = 0
+        self.server = None
+        self._loop = None
+        self._thread = None
+
+    def start(self) -> None:
+        ready = threading.Event()
+
+        def run():
+            self._loop = asyncio.new_event_loop()
+            self.server = CollectorServer(SQLiteStore(self.database), '127.0.0.1', self.port)
+            self._loop.run_until_complete(self.server.start())
+            # Keep the same port across restarts so stations reconnect to it
+            self.port = self.server.port
+            ready.set()
+            self._loop.run_forever()
+            self._loop.close()
+
+        self._thread = threading.Thread(target=run, name='collector', daemon=True)
+        self._thread.start()
+        ready.wait()
+
+    def stop(self) -> None:
+        asyncio.run_coroutine_threadsafe(self.server.stop(), self._loop).result()
+        self._loop.call_soon_threadsafe(self._loop.stop)
+        self._thread.join()
+        self.server.store.close()
+        self.committed += self.server.messages_committed
+
+
+def run_station(index: int, port: int, spool_root: str, trials: int, n_words: int,
+                halfway: threading.Barrier, clients: list) -> None:
+    station = f"S{index:02d}"
+    client = CollectorClient(station, '127.0.0.1', port, os.path.join(spool_root, station))
+    clients.append(client)
+    participant_id = f"LT{index:03d}"
+    words = [f"word{i}" for i in range(n_words)]
+    session = {'participant_id': participant_id, 'experimenter': 'loadtest', 'start_time': time.ctime(),
+               'current_trial': 1, 'completed_trials': [], 'interrupted': False, 'end_time': None}
+    client.send('session', dict(session))
+
+    for trial in range(1, trials + 1):
+        if trial == trials // 2 + 1:
+            halfway.wait()
+        rows = [{'trial_number': trial, 'word': word, 'x_coord': random.uniform(-500, 500),
+                 'y_coord': random.uniform(-500, 500), 'highlighted': random.random() < 0.2}
+                for word in words]
+        client.send('trial', {'participant_id': participant_id, 'trial_number': trial, 'rows': rows})
+        session['completed_trials'].append(trial)
+        session['current_trial'] = trial + 1
+        client.send('session', dict(session))
+        time.sleep(random.uniform(0, 0.02))
+
+    session['end_time'] = time.ctime()
+    client.send('session', dict(session))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress the collector with simulated stations")
+    parser.add_argument('--stations', type=int, default=40)
+    parser.add_argument('--trials', type=int, default=11)
+    parser.add_argument('--words', type=int, default=17)
+    parser.add_argument('--outage-s', type=float, default=1.0, help="How long the collector is down mid-run")
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='collector_loadtest_')
+    database = os.path.join(workdir, 'collector.sqlite3')
+    collector = CollectorThread(database)
+    collector.start()
+
+    clients = []
+    halfway = threading.Barrier(args.stations + 1)
+    start = time.perf_counter()
+    stations = [
+        threading.Thread(target=run_station, args=(i, collector.port, workdir, args.trials, args.words,
+                                                   halfway, clients))
+        for i in range(args.stations)
+    ]
+    for thread in stations:
+        thread.start()
+
+    # Take the collector down while every station is mid-session
+    halfway.wait()
+    collector.stop()
+    time.sleep(args.outage_s)
+    spooled = sum(client.pending() for client in clients)
+    collector.start()
+
+    for thread in stations:
+        thread.join()
+    delivered = all(client.flush(timeout=60) for client in clients)
+    elapsed = time.perf_counter() - start
+    for client in clients:
+        client.close(timeout=0)
+    collector.stop()
+
+    store = SQLiteStore(database)
+    n_sessions = store.query("SELECT COUNT(*) FROM sessions")[0][0]
+    n_finished = store.query("SELECT COUNT(*) FROM sessions WHERE end_time IS NOT NULL")[0][0]
+    n_trials = store.query("SELECT COUNT(*) FROM trials")[0][0]
+    n_coordinates = store.query("SELECT COUNT(*) FROM coordinates")[0][0]
+    store.close()
+
+    expected_messages = args.stations * (2 * args.trials + 2)
+    latencies = [ms for client in clients for ms in client.ack_latencies_ms]
+    stats = percentiles(latencies, (50, 95, 99))
+    print(f"{args.stations} stations, {expected_messages} messages in {elapsed:.2f} s "
+          f"({expected_messages / elapsed:.0f} msg/s, {collector.committed} committed incl. resends)")
+    print(f"Spooled during the {args.outage_s:.1f} s outage: {spooled} messages")
+    print("Ack latency ms: " + ', '.join(f"{name} {value:.1f}" for name, value in stats.items()))
+    print(f"Database: {n_sessions} sessions ({n_finished} finished), {n_trials} trials, {n_coordinates} coordinates")
+
+    ok = (delivered and n_sessions == n_finished == args.stations
+          and n_trials == args.stations * args.trials
+          and n_coordinates == args.stations * args.trials * args.words)
+    print("PASS" if ok else "FAIL: data missing or duplicated")
+    shutil.rmtree(workdir, ignore_errors=True)
+    raise SystemExit(0 if ok else 1)
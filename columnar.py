@@ -0,0 +1,146 @@
+"""
+Columnar binary export of trial results.
+
+Writes trial_number, word, x, y and highlighted as typed columns: Parquet when
+pyarrow is installed, otherwise a compressed NumPy .npz archive in which the
+word (and participant) strings are dictionary-encoded as integer codes plus a
+vocabulary. Files are written per trial next to the results CSV, and a cohort
+archive can be built from all participants at once.
+
+Usage:
+    python columnar.py [--data-dir data] [--output data/cohort]
+"""
+import argparse
+import os
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from settings import COLUMNAR, TRIAL_MANAGER
+from trial_manager import find_results_files, load_trial_results
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:
+    pa = None
+    pq = None
+
+
+def extension() -> str:
+    """File extension of the format in use ('parquet' or 'npz')."""
+    return 'parquet' if pa is not None and COLUMNAR['PREFER_PARQUET'] else 'npz'
+
+
+def encode(values: Sequence[str]):
+    """Dictionary-encode strings into (int32 codes, vocabulary array)."""
+    vocabulary, codes = np.unique(np.asarray(values, dtype=str), return_inverse=True)
+    return codes.astype(np.int32), vocabulary
+
+
+def to_columns(rows: List[dict], participant_id: Optional[str] = None) -> Dict[str, np.ndarray]:
+    """Convert result rows into typed columns."""
+    columns = {
+        'trial_number': np.fromiter((r['trial_number'] for r in rows), dtype=np.int16, count=len(rows)),
+        'x': np.fromiter((r['x_coord'] for r in rows), dtype=np.float64, count=len(rows)),
+        'y': np.fromiter((r['y_coord'] for r in rows), dtype=np.float64, count=len(rows)),
+        'highlighted': np.fromiter((bool(r['highlighted']) for r in rows), dtype=bool, count=len(rows))
+    }
+    columns['word_code'], columns['word_vocabulary'] = encode([r['word'] for r in rows])
+    if participant_id is not None:
+        columns['participant_code'] = np.zeros(len(rows), dtype=np.int32)
+        columns['participant_vocabulary'] = np.array([participant_id])
+    return columns
+
+
+def concat_columns(parts: List[Dict[str, np.ndarray]]) -> Dict[str, np.ndarray]:
+    """Concatenate column sets, re-coding their dictionaries into shared vocabularies."""
+    result = {name: np.concatenate([p[name] for p in parts]) for name in ('trial_number', 'x', 'y', 'highlighted')}
+    for key in ('word', 'participant'):
+        if not all(f'{key}_code' in p for p in parts):
+            continue
+        vocabulary = np.unique(np.concatenate([p[f'{key}_vocabulary'] for p in parts]))
+        # Map each part's local codes to positions in the shared vocabulary, vectorized
+        result[f'{key}_code'] = np.concatenate([
+            np.searchsorted(vocabulary, p[f'{key}_vocabulary']).astype(np.int32)[p[f'{key}_code']]
+            for p in parts
+        ])
+        result[f'{key}_vocabulary'] = vocabulary
+    return result
+
+
+def write_columns(columns: Dict[str, np.ndarray], path_without_ext: str) -> str:
+    """Write columns to <path>.parquet or <path>.npz and return the file name."""
+    directory = os.path.dirname(path_without_ext)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    filepath = f"{path_without_ext}.{extension()}"
+
+    if extension() == 'parquet':
+        arrays = {
+            'trial_number': pa.array(columns['trial_number']),
+            'word': pa.DictionaryArray.from_arrays(columns['word_code'], pa.array(columns['word_vocabulary'].tolist())),
+            'x': pa.array(columns['x']),
+            'y': pa.array(columns['y']),
+            'highlighted': pa.array(columns['highlighted'])
+        }
+        if 'participant_code' in columns:
+            arrays['participant_id'] = pa.DictionaryArray.from_arrays(
+                columns['participant_code'], pa.array(columns['participant_vocabulary'].tolist()))
+        pq.write_table(pa.table(arrays), filepath)
+    else:
+        np.savez_compressed(filepath, **columns)
+    return filepath
+
+
+def load_columns(filepath: str) -> Dict[str, np.ndarray]:
+    """Load a columnar file written by write_columns as NumPy columns."""
+    if filepath.endswith('.parquet'):
+        if pq is None:
+            raise ImportError("pyarrow is required to read Parquet files")
+        table = pq.read_table(filepath)
+        columns = {name: table.column(name).to_numpy() for name in ('trial_number', 'x', 'y', 'highlighted')}
+        for key, column in (('word', 'word'), ('participant', 'participant_id')):
+            if column in table.column_names:
+                chunk = table.column(column).combine_chunks()
+                columns[f'{key}_code'] = chunk.indices.to_numpy()
+                columns[f'{key}_vocabulary'] = np.array(chunk.dictionary.to_pylist())
+        return columns
+    with np.load(filepath, allow_pickle=False) as archive:
+        return {name: archive[name] for name in archive.files}
+
+
+def decode(columns: Dict[str, np.ndarray], key: str = 'word') -> np.ndarray:
+    """Materialize a dictionary-encoded string column."""
+    return columns[f'{key}_vocabulary'][columns[f'{key}_code']]
+
+
+def write_trial(participant_dir: str, trial_number: int, rows: List[dict]) -> str:
+    """Write one trial's rows next to the participant's other files."""
+    name = COLUMNAR['TRIAL_FILENAME_TEMPLATE'].format(trial=trial_number)
+    return write_columns(to_columns(rows), os.path.join(participant_dir, name))
+
+
+def build_cohort_archive(data_dir: str = TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'],
+                         output: str = os.path.join(TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'],
+                                                    COLUMNAR['COHORT_FILENAME'])) -> Optional[str]:
+    """Aggregate every participant's latest results into one columnar archive."""
+    parts = [
+        to_columns(load_trial_results(path), participant_id)
+        for participant_id, path in find_results_files(data_dir).items()
+    ]
+    parts = [p for p in parts if p['x'].size]
+    if not parts:
+        return None
+    return write_columns(concat_columns(parts), output)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build the columnar cohort archive")
+    parser.add_argument('--data-dir', default=TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'])
+    parser.add_argument('--output', default=None, help="Output path without extension")
+    args = parser.parse_args()
+
+    output = args.output or os.path.join(args.data_dir, COLUMNAR['COHORT_FILENAME'])
+    path = build_cohort_archive(args.data_dir, output)
+    print(f"Cohort archive written to {path}" if path else "No results found")
@@ -0,0 +1,201 @@
+"""
+Experiment configuration profiles.
+
+A profile is a TOML or JSON file that overrides the experiment-relevant defaults
+of settings.py (trial counts, jitter, canvas size, zoom and word placement).
+It is validated once and compiled into frozen, slotted dataclasses; modules read
+the values they need when they are constructed instead of walking nested dicts
+on every event. Each session log records the profile name and a hash of the
+resolved values, so results can always be traced to the exact configuration.
+
+Example profile (profiles/example.toml):
+
+    name = "pilot"
+
+    [experiment]
+    main_trials = 4
+
+    [zoom]
+    factor = 1.2
+"""
+import dataclasses
+import hashlib
+import json
+import os
+import tomllib
+from dataclasses import dataclass, field
+from typing import Optional
+
+from settings import CONFIG, DRAGGABLE_WORD, EXPERIMENT, WORDSPACE
+
+
+class ConfigError(ValueError):
+    """A profile file that cannot be used."""
+
+
+@dataclass(frozen=True, slots=True)
+class ExperimentConfig:
+    training_trials: int = EXPERIMENT['TRAINING']['TRIALS']
+    main_trials: int = EXPERIMENT['MAIN']['TRIALS']
+    training_words: int = EXPERIMENT['TRAINING']['WORDS_PER_TRIAL']
+    main_words: int = EXPERIMENT['MAIN']['WORDS_PER_TRIAL']
+    jitter_x: float = EXPERIMENT['WORD_JITTER']['RANGE_X']
+    jitter_y: float = EXPERIMENT['WORD_JITTER']['RANGE_Y']
+
+    def __post_init__(self):
+        _check(self.training_trials >= 0 and self.main_trials >= 0, "trial counts cannot be negative")
+        _check(self.total_trials > 0, "at least one trial is required")
+        _check(self.jitter_x >= 0 and self.jitter_y >= 0, "jitter ranges cannot be negative")
+
+    @property
+    def total_trials(self) -> int:
+        return self.training_trials + self.main_trials
+
+
+@dataclass(frozen=True, slots=True)
+class CanvasConfig:
+    width: int = WORDSPACE['CANVAS']['DEFAULT_WIDTH']
+    height: int = WORDSPACE['CANVAS']['DEFAULT_HEIGHT']
+    safety_margin: float = WORDSPACE['CANVAS']['MARGINS']['SAFETY_MARGIN']
+
+    def __post_init__(self):
+        _check(self.width > 0 and self.height > 0, "canvas size must be positive")
+
+
+@dataclass(frozen=True, slots=True)
+class ZoomConfig:
+    min_scale: float = WORDSPACE['ZOOM']['MIN_SCALE']
+    max_scale: float = WORDSPACE['ZOOM']['MAX_SCALE']
+    factor: float = WORDSPACE['ZOOM']['ZOOM_FACTOR']
+    max_percentage: int = WORDSPACE['ZOOM']['MAX_ZOOM_PERCENTAGE']
+
+    def __post_init__(self):
+        _check(0 < self.min_scale <= self.max_scale, "zoom needs 0 < min_scale <= max_scale")
+        _check(self.factor > 1, "zoom factor must be greater than 1")
+
+
+@dataclass(frozen=True, slots=True)
+class PlacementConfig:
+    x_offset: float = WORDSPACE['WORD_PLACEMENT']['INITIAL_X_OFFSET']
+    x_spacing: float = WORDSPACE['WORD_PLACEMENT']['INITIAL_X_SPACING']
+    y_position: float = WORDSPACE['WORD_PLACEMENT']['INITIAL_Y_POSITION']
+
+
+@dataclass(frozen=True, slots=True)
+class WordConfig:
+    width: int = DRAGGABLE_WORD['SIZE']['DEFAULT_WIDTH']
+    height: int = DRAGGABLE_WORD['SIZE']['DEFAULT_HEIGHT']
+
+    def __post_init__(self):
+        _check(self.width > 0 and self.height > 0, "word size must be positive")
+
+
+SECTIONS = {
+    'experiment': ExperimentConfig,
+    'canvas': CanvasConfig,
+    'zoom': ZoomConfig,
+    'placement': PlacementConfig,
+    'word': WordConfig
+}
+
+
+@dataclass(frozen=True, slots=True)
+class Profile:
+    name: str = 'default'
+    experiment: ExperimentConfig = field(default_factory=ExperimentConfig)
+    canvas: CanvasConfig = field(default_factory=CanvasConfig)
+    zoom: ZoomConfig = field(default_factory=ZoomConfig)
+    placement: PlacementConfig = field(default_factory=PlacementConfig)
+    word: WordConfig = field(default_factory=WordConfig)
+    source: Optional[str] = None
+
+    def values(self) -> dict:
+        """The resolved settings, without name and source, with canonical types."""
+        return {
+            section: {f.name: f.type(getattr(getattr(self, section), f.name))
+                      for f in dataclasses.fields(SECTIONS[section])}
+            for section in SECTIONS
+        }
+
+    @property
+    def hash(self) -> str:
+        canonical = json.dumps(self.values(), sort_keys=True, separators=(',', ':'))
+        return hashlib.sha256(canonical.encode()).hexdigest()[:16]
+
+
+def _check(condition: bool, message: str) -> None:
+    if not condition:
+        raise ConfigError(message)
+
+
+def _build_section(cls, name: str, values) -> object:
+    if not isinstance(values, dict):
+        raise ConfigError(f"[{name}] must be a table")
+    fields = {f.name: f for f in dataclasses.fields(cls)}
+    unknown = set(values) - set(fields)
+    if unknown:
+        raise ConfigError(f"Unknown keys in [{name}]: {', '.join(sorted(unknown))}")
+
+    converted = {}
+    for key, value in values.items():
+        expected = fields[key].type
+        if isinstance(value, bool) or not isinstance(value, (int, float)):
+            raise ConfigError(f"{name}.{key} must be a number, got {value!r}")
+        if expected is int and not float(value).is_integer():
+            raise ConfigError(f"{name}.{key} must be an integer, got {value!r}")
+        converted[key] = expected(value)
+    return cls(**converted)
+
+
+def build_profile(data: dict, source: Optional[str] = None) -> Profile:
+    """Validate a parsed profile document and compile it."""
+    data = dict(data)
+    name = data.pop('name', os.path.splitext(os.path.basename(source))[0] if source else 'default')
+    unknown = set(data) - set(SECTIONS)
+    if unknown:
+        raise ConfigError(f"Unknown sections: {', '.join(sorted(unknown))}")
+    sections = {key: _build_section(cls, key, data.get(key, {})) for key, cls in SECTIONS.items()}
+    return Profile(name=str(name), source=source, **sections)
+
+
+def resolve_path(name_or_path: str) -> str:
+    """A file path, or a profile name looked up in the profiles directory."""
+    if os.path.exists(name_or_path):
+        return name_or_path
+    for extension in ('.toml', '.json'):
+        candidate = os.path.join(CONFIG['PROFILE_DIRECTORY'], name_or_path + extension)
+        if os.path.exists(candidate):
+            return candidate
+    raise ConfigError(f"Profile not found: {name_or_path}")
+
+
+def load_profile(name_or_path: str) -> Profile:
+    """Read, validate and compile a TOML or JSON profile."""
+    path = resolve_path(name_or_path)
+    try:
+        with open(path, 'rb') as f:
+            data = json.load(f) if path.endswith('.json') else tomllib.load(f)
+    except (tomllib.TOMLDecodeError, ValueError) as e:
+        raise ConfigError(f"{path}: {e}") from e
+    try:
+        return build_profile(data, path)
+    except ConfigError as e:
+        raise ConfigError(f"{path}: {e}") from e
+
+
+_active: Optional[Profile] = None
+
+
+def get_profile() -> Profile:
+    """The profile of this process: set by use_profile, else from the environment, else the defaults."""
+    global _active
+    if _active is None:
+        name = os.environ.get(CONFIG['ENV_VAR'])
+        _active = load_profile(name) if name else Profile()
+    return _active
+
+
+def use_profile(profile: Profile) -> Profile:
+    global _active
+    _active = profile
+    return profile
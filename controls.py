@@ -1,19 +1,26 @@
 import tkinter as tk
 from tkinter import messagebox
 from wordspace import WordSpace
-from draggable import DraggableWord
-from stackword import StackWord
+from stackword import VirtualWordStack
 from trial_manager import TrialManager
+import os
 import random
-from settings import GUI, VISUAL, EXPERIMENT, TEXT
+import time
+import logging
+import instrumentation
+import logging_setup
+from instrumentation import LatencyRecorder
+from timing import EventLoopLagMonitor, SessionTimer, load_previous_runs, write_timing_report
+from config import get_profile
+from settings import GUI, VISUAL, TEXT, PATHS, INSTRUMENTATION, TIMING, COLLECTOR, FEED, HISTORY, UNTANGLE, SOAK, PROFILER
+
+logger = logging.getLogger(__name__)
 
 class MainWindow(tk.Tk):
     # Class-level constants for configuration
     WINDOW_WIDTH = GUI['WINDOW_WIDTH']
     WINDOW_HEIGHT = GUI['WINDOW_HEIGHT']
     LEFT_PANEL_WIDTH = GUI['LEFT_PANEL_WIDTH']
-    JITTER_RANGE_X = EXPERIMENT['WORD_JITTER']['RANGE_X']
-    JITTER_RANGE_Y = EXPERIMENT['WORD_JITTER']['RANGE_Y']
 
     def __init__(self, participant_id=None, experimenter=None, words=None, 
              start_trial=1, recovery_mode=False, session_data=None):
@@ -28,11 +35,34 @@ class MainWindow(tk.Tk):
         self.recovery_mode = recovery_mode
         self.session_data = session_data
 
+        # Experiment configuration of the active profile
+        self.profile = get_profile()
+        self.jitter_range_x = self.profile.experiment.jitter_x
+        self.jitter_range_y = self.profile.experiment.jitter_y
+
+        # Latency instrumentation, recorded for the whole session
+        self.latency = None
+        if INSTRUMENTATION['ENABLED']:
+            self.latency = LatencyRecorder(self, participant_id)
+            if participant_id:
+                # A resumed session adds to the statistics of its earlier runs
+                self.latency.load(os.path.join(PATHS['DATA_DIRECTORY'], str(participant_id),
+                                               INSTRUMENTATION['OUTPUT_FILENAME']))
+            instrumentation.install(self.latency)
+
+        # Interface profiler, created by the hidden profiling hotkey
+        self.profiler = None
+
         # Configuration methods
         self._configure_window()
         self._setup_trial_manager()
+        self._setup_logging()
         self._create_layout()
         self._bind_keyboard_events()
+        self._setup_timing()
+        self._setup_collector()
+        self._setup_feed()
+        self._setup_soak()
 
     def _configure_window(self):
         """Set up window properties"""
@@ -44,11 +74,8 @@ class MainWindow(tk.Tk):
         if not self.words_list:
             raise ValueError("No words provided")
         
-        total_trials = (EXPERIMENT['TRAINING']['TRIALS'] + 
-                       EXPERIMENT['MAIN']['TRIALS'])
-                            
         self.trial_manager = TrialManager(
-            max_trials=total_trials,
+            max_trials=self.profile.experiment.total_trials,
             participant_id=self.participant_id
         )
         self._words_list = list(self.words_list[self.start_trial - 1])
@@ -82,6 +109,11 @@ class MainWindow(tk.Tk):
         )
         self.highlight_btn.pack(side=tk.LEFT, padx=GUI['PADDING'])
 
+        # Experimenter option: button to spread overlapping words
+        if UNTANGLE['ENABLED']:
+            self.untangle_btn = tk.Button(top_frame, text=TEXT['BUTTONS']['UNTANGLE'], command=self.untangle)
+            self.untangle_btn.pack(side=tk.LEFT, padx=GUI['PADDING'])
+
         # Content area container
         content_frame = tk.Frame(main_container)
         content_frame.pack(side=tk.TOP, fill=tk.BOTH, expand=True)
@@ -98,9 +130,9 @@ class MainWindow(tk.Tk):
                               bg=VISUAL['COLORS']['PANEL_BG'])
         panel_title.pack(pady=GUI['PADDING']*2)
 
-        # Create word stack frame inside left panel
-        self.word_stack_frame = tk.Frame(self.left_panel, bg=VISUAL['COLORS']['PANEL_BG'])
-        self.word_stack_frame.pack(fill=tk.BOTH, expand=True, padx=GUI['PADDING'], pady=GUI['PADDING'])
+        # Scrollable, filterable word stack inside left panel
+        self.word_stack = VirtualWordStack(self.left_panel, self.add_word_to_canvas, bg=VISUAL['COLORS']['PANEL_BG'])
+        self.word_stack.pack(fill=tk.BOTH, expand=True, padx=GUI['PADDING'], pady=GUI['PADDING'])
 
         # Canvas area container
         canvas_container = tk.Frame(content_frame)
@@ -110,17 +142,118 @@ class MainWindow(tk.Tk):
         self.word_space = WordSpace(canvas_container, words=[])
         self.word_space.pack(fill=tk.BOTH, expand=True)
 
+        # Undoing a word placed from the stack puts it back there, redoing takes it out again
+        self.word_space.add_word_listener('undo_add', lambda dw: self.return_word_to_stack(dw.word))
+        self.word_space.add_word_listener('redo_add', lambda dw: self.take_word_from_stack(dw.word))
+
         # Initialize word stack
         self.populate_word_stack()
 
+    def _setup_logging(self):
+        """Tag log records with the session and write them next to log.json"""
+        logging_setup.set_context(participant=self.participant_id, trial=self.trial_manager.get_trial_number())
+        if self.participant_id:
+            logging_setup.start_session_file(os.path.join(PATHS['DATA_DIRECTORY'], str(self.participant_id)))
+
+    def _setup_timing(self):
+        """Start monotonic trial timing and the event-loop lag probe"""
+        self.timer = None
+        self.lag_monitor = None
+        if not TIMING['ENABLED']:
+            return
+        previous_runs = []
+        if self.participant_id:
+            # A resumed session adds to the report of its earlier runs
+            previous_runs = load_previous_runs(os.path.join(
+                PATHS['DATA_DIRECTORY'], str(self.participant_id), TIMING['OUTPUT_FILENAME']))
+        self.timer = SessionTimer(self.participant_id, previous_runs)
+        self.lag_monitor = EventLoopLagMonitor(self)
+        self.word_space.add_word_listener('press', lambda dw: self.timer.word_touched(dw.word))
+        self.timer.trial_started(self.trial_manager.get_trial_number())
+        self.lag_monitor.start()
+
+    def _setup_collector(self):
+        """Connect to the lab collector, which receives a copy of every trial"""
+        self.collector = None
+        if COLLECTOR['ENABLED']:
+            from collector import CollectorClient
+            self.collector = CollectorClient()
+
+    def _setup_feed(self):
+        """Publish the session to shared memory for the experimenter dashboard"""
+        self.feed = None
+        if not FEED['ENABLED']:
+            return
+        from shm_feed import FeedWriter, feed_sizes
+        capacity, names_bytes = feed_sizes(self.words_list or [])
+        try:
+            self.feed = FeedWriter.create(self.participant_id or '', capacity=capacity, names_bytes=names_bytes)
+        except (OSError, RuntimeError) as e:
+            logger.warning("Dashboard feed disabled: %s", e)
+            return
+        self._publish_feed()
+
+    def _publish_feed(self):
+        """Publish on a timer so the drag and zoom handlers never pay for the dashboard"""
+        if self.feed is None:
+            return
+        canvas = self.word_space.canvas
+        self.feed.publish(self.word_space.model, self.trial_manager.get_trial_number(),
+                          self.trial_manager.max_trials, self.stack_words,
+                          (canvas.winfo_width(), canvas.winfo_height()))
+        self.after(FEED['PUBLISH_MS'], self._publish_feed)
+
+    def _setup_soak(self):
+        """Start per-trial memory and Tk object profiling for long lab days"""
+        self.soak = None
+        if SOAK['ENABLED']:
+            from soak import SoakProfiler, load_previous_runs
+            previous_runs = []
+            if self.participant_id:
+                # A resumed session adds to the report of its earlier runs
+                previous_runs = load_previous_runs(os.path.join(
+                    PATHS['DATA_DIRECTORY'], str(self.participant_id), SOAK['OUTPUT_FILENAME']))
+            self.soak = SoakProfiler(self, self.participant_id, previous_runs=previous_runs)
+
+    def destroy(self):
+        """Release the feed and write pending measurements, profiles and logs however the window is closed"""
+        if getattr(self, 'feed', None) is not None:
+            self.feed.close()
+            self.feed = None
+        if getattr(self, 'word_space', None) is not None and self.word_space.text_metrics is not None:
+            self.word_space.text_metrics.save()
+        if getattr(self, 'profiler', None) is not None and self.profiler.running:
+            self.profiler.stop(self.trial_manager.get_trial_number())
+        logging_setup.stop_session_file()
+        super().destroy()
+
     def _bind_keyboard_events(self):
         """Bind keyboard navigation events"""
         self.bind("<Left>", self.on_left_arrow)
         self.bind("<Right>", self.on_right_arrow)
         self.bind("<Up>", self.on_up_arrow)
         self.bind("<Down>", self.on_down_arrow)
+        if HISTORY['ENABLED']:
+            for sequence in HISTORY['UNDO_KEYS']:
+                self.bind(sequence, lambda event: self.word_space.undo())
+            for sequence in HISTORY['REDO_KEYS']:
+                self.bind(sequence, lambda event: self.word_space.redo())
+        if PROFILER['ENABLED']:
+            self.bind(PROFILER['KEY'], self.toggle_profiler)
         self.focus_set()
 
+    def toggle_profiler(self, event=None):
+        """Start or stop profiling the interface (experimenter hotkey)"""
+        if self.profiler is None:
+            from profiler import UIProfiler
+            self.profiler = UIProfiler(self.participant_id)
+        path = self.profiler.toggle(self.trial_manager.get_trial_number())
+        if path:
+            logger.info("Profiling stopped, written to %s", path)
+        else:
+            logger.info("Profiling started")
+        self.bell()
+
     def update_title(self):
         """Update window title with current trial number"""
         current_trial = min(self.trial_manager.get_trial_number(), self.trial_manager.max_trials)
@@ -129,9 +262,7 @@ class MainWindow(tk.Tk):
     def reset_for_next_trial(self):
         """Reset everything for the next trial"""
         # Clear all draggable words
-        for word in self.word_space.draggables:
-            word.remove_from_canvas()
-        self.word_space.draggables.clear()
+        self.word_space.clear_words()
         
         # Reset zoom and position
         self.word_space.reset_pov()
@@ -139,11 +270,11 @@ class MainWindow(tk.Tk):
         # Get words for the current trial from words_list
         self._words_list = self.words_list[self.trial_manager.get_trial_number() - 1]
         
-        # Clear and repopulate word stack
-        for widget in self.word_stack_frame.winfo_children():
-            widget.destroy()
+        # Repopulate word stack
         self.populate_word_stack()
 
+        self._export_soak()
+
     def create_word_at_center(self, word):
         """Compute center coordinates and create draggable word"""
         canvas_width = self.word_space.canvas.winfo_width()
@@ -154,33 +285,33 @@ class MainWindow(tk.Tk):
         base_logical_y = (canvas_height / 2 - self.word_space.offset_y) / self.word_space.scale_factor
 
         # Add jitter to the position
-        jitter_x = random.uniform(-self.JITTER_RANGE_X/2, self.JITTER_RANGE_X/2)
-        jitter_y = random.uniform(-self.JITTER_RANGE_Y/2, self.JITTER_RANGE_Y/2)
+        jitter_x = random.uniform(-self.jitter_range_x/2, self.jitter_range_x/2)
+        jitter_y = random.uniform(-self.jitter_range_y/2, self.jitter_range_y/2)
 
         # Apply jitter to logical coordinates
         logical_x = base_logical_x + jitter_x
         logical_y = base_logical_y + jitter_y
 
         # Create the draggable word
-        new_word_obj = DraggableWord(self.word_space, logical_x, logical_y, word)
-        self.word_space.draggables.append(new_word_obj)
+        dw = self.word_space.create_word(logical_x, logical_y, word)
+        self.word_space.record_add(dw)
 
         # Update everything
         self.word_space.update_all_positions()
 
     def on_left_arrow(self, event):
         # Move the offset rightwards (positive x) so the scene appears to shift left.
-        self.word_space.pan_offset(dx=GUI['ARROW_PAN_DISTANCE'], dy=0)
+        self.word_space.request_pan(dx=GUI['ARROW_PAN_DISTANCE'], dy=0)
 
     def on_right_arrow(self, event):
-        self.word_space.pan_offset(dx=-GUI['ARROW_PAN_DISTANCE'], dy=0)
+        self.word_space.request_pan(dx=-GUI['ARROW_PAN_DISTANCE'], dy=0)
 
     def on_up_arrow(self, event):
         # Move the offset downwards (positive y) so the scene appears to shift up.
-        self.word_space.pan_offset(dx=0, dy=GUI['ARROW_PAN_DISTANCE'])
+        self.word_space.request_pan(dx=0, dy=GUI['ARROW_PAN_DISTANCE'])
 
     def on_down_arrow(self, event):
-        self.word_space.pan_offset(dx=0, dy=-GUI['ARROW_PAN_DISTANCE'])
+        self.word_space.request_pan(dx=0, dy=-GUI['ARROW_PAN_DISTANCE'])
 
     def add_next_word(self):
         """Generate word lists at the left side"""
@@ -194,12 +325,26 @@ class MainWindow(tk.Tk):
 
     def add_word_to_canvas(self, word):
         """Add a word from the stack to the canvas"""
+        if self.timer is not None:
+            self.timer.stack_clicked(word)
         self.create_word_at_center(word)
 
+    @property
+    def stack_words(self):
+        """Words still in the stack, in order"""
+        return self.word_stack.words
+
+    def return_word_to_stack(self, word):
+        """Put a word back at the bottom of the stack"""
+        self.word_stack.append(word)
+
+    def take_word_from_stack(self, word):
+        """Remove a word from the stack without placing it"""
+        self.word_stack.remove(word)
+
     def populate_word_stack(self):
         """Add all words to the sidebar stack and clear the word list"""
-        for word in self._words_list[:]:  # Create a copy to iterate
-            StackWord(self.word_stack_frame, word, self.add_word_to_canvas)
+        self.word_stack.set_words(self._words_list)
         
         # Clear the words list after populating
         self._words_list.clear()
@@ -209,38 +354,116 @@ class MainWindow(tk.Tk):
         words = self.word_space.get_draggable_words()
         
         # Check if all words from the stack are used
-        if self.word_stack_frame.winfo_children():
+        if len(self.word_stack):
             messagebox.showwarning("Insufficient Words", 
                                 TEXT['MESSAGES']['INSUFFICIENT_WORDS'])
             return
 
+        ended_ns = time.perf_counter_ns()
         try:
-            # Save trial data (also handles final save if last trial)
-            self.trial_manager.save_trial_data(words)
-            
-            # Update session log if we have session data
-            if self.session_data:
-                from session_manager import update_session_log
-                update_session_log(self.session_data, completed_trial=self.trial_manager.current_trial)
-            
+            with instrumentation.measure('end_trial'):
+                # Save trial data (also handles final save if last trial)
+                self.trial_manager.save_trial_data(words)
+
+                # Only a saved trial is over; after a failed save the participant retries it
+                if self.timer is not None:
+                    self.timer.trial_ended(self.lag_monitor.take_trial(), ended_ns)
+
+                # Selections and group moves of the trial, when there were any; the journal
+                # only starts over once they are saved, so a retried save still has them
+                events = self.word_space.journal
+                if events and self.participant_id:
+                    self.trial_manager.save_trial_events(events)
+                self.word_space.take_journal()
+
+                # Update session log if we have session data
+                if self.session_data:
+                    from session_manager import update_session_log
+                    update_session_log(self.session_data, completed_trial=self.trial_manager.current_trial)
+
+                self._send_to_collector()
+
+            logger.info("Trial %d saved", self.trial_manager.current_trial)
+
+            self._export_latency()
+            self._export_timing()
+            if self.profiler is not None:
+                self.profiler.trial_ended(self.trial_manager.current_trial,
+                                          last=self.trial_manager.current_trial >= self.trial_manager.max_trials)
+
             # Advance to next trial
             continue_experiment, message = self.trial_manager.advance_trial()
             
             if continue_experiment:
                 messagebox.showinfo(TEXT['MESSAGES']['TRIAL_COMPLETED'], message)
+                logging_setup.set_context(trial=self.trial_manager.get_trial_number())
                 self.update_title()
-                self.reset_for_next_trial()
+                with instrumentation.measure('trial_reset'):
+                    self.reset_for_next_trial()
+                if self.timer is not None:
+                    self.timer.trial_started(self.trial_manager.get_trial_number())
             else:
                 messagebox.showinfo(TEXT['MESSAGES']['EXPERIMENT_COMPLETED'], message)
+                if self.lag_monitor is not None:
+                    self.lag_monitor.stop()
+                if self.soak is not None:
+                    self.soak.stop()
+                if self.collector is not None:
+                    self.collector.close_in_background()
                 self.destroy()
                 
         except Exception as e:
+            logger.exception("Could not end trial %d", self.trial_manager.current_trial)
             messagebox.showerror("Error", f"An unexpected error occurred: {str(e)}")
 
+    def _send_to_collector(self):
+        """Spool the trial and session log for the collector, delivered in the background"""
+        if self.collector is None or not self.participant_id:
+            return
+        self.collector.send('trial', {
+            'participant_id': str(self.participant_id),
+            'trial_number': self.trial_manager.current_trial,
+            'rows': self.trial_manager.last_trial_results
+        })
+        if self.session_data:
+            self.collector.send('session', self.session_data)
+
+    def _export_latency(self):
+        """Close the trial's latency histograms and write them next to log.json"""
+        if self.latency is None or not self.participant_id:
+            return
+        self.latency.end_trial(self.trial_manager.current_trial)
+        participant_dir = os.path.join(PATHS['DATA_DIRECTORY'], str(self.participant_id))
+        os.makedirs(participant_dir, exist_ok=True)
+        self.latency.export(os.path.join(participant_dir, INSTRUMENTATION['OUTPUT_FILENAME']))
+
+    def _export_timing(self):
+        """Write the monotonic timestamps and timing-quality report next to log.json"""
+        if self.timer is None or not self.participant_id:
+            return
+        participant_dir = os.path.join(PATHS['DATA_DIRECTORY'], str(self.participant_id))
+        os.makedirs(participant_dir, exist_ok=True)
+        write_timing_report(os.path.join(participant_dir, TIMING['OUTPUT_FILENAME']),
+                            self.timer, self.lag_monitor)
+
+    def _export_soak(self):
+        """Compare memory and Tk objects with the last trial and write the growth next to log.json"""
+        if self.soak is None:
+            return
+        self.soak.checkpoint(self.trial_manager.get_trial_number())
+        if not self.participant_id:
+            return
+        participant_dir = os.path.join(PATHS['DATA_DIRECTORY'], str(self.participant_id))
+        self.soak.export(os.path.join(participant_dir, SOAK['OUTPUT_FILENAME']))
+
     def reset_pov(self):
         """Reset zoom/POV level in the wordspace"""
         self.word_space.reset_pov()
     
+    def untangle(self):
+        """Spread overlapping words in the wordspace"""
+        self.word_space.untangle()
+
     def toggle_highlight_mode(self):
         """Toggle highlight mode for word selection"""
         self.word_space.toggle_highlight_mode()
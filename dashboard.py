@@ -0,0 +1,136 @@
+"""
+Experimenter dashboard.
+
+Shows every session running on this machine: participant, current trial, the
+words still in the stack and a live miniature of the canvas with the
+participant's current viewport. Reads the shared-memory feed published by
+MainWindow (see shm_feed.py), so it never touches the session's files and the
+participant's window does no extra work for it besides the periodic publish.
+
+Usage:
+    python dashboard.py
+"""
+import time
+import tkinter as tk
+from typing import Dict
+
+from settings import DASHBOARD
+from shm_feed import FeedReader, attach_all
+
+
+class SessionPanel(tk.Frame):
+    """Status text, stack words and canvas miniature of one session."""
+
+    def __init__(self, master, reader: FeedReader):
+        super().__init__(master, bd=1, relief=tk.GROOVE, padx=6, pady=6)
+        self.reader = reader
+        width, height = DASHBOARD['MINIATURE_SIZE']
+
+        self.title = tk.Label(self, text=f"Participant {reader.participant_id}",
+                              font=DASHBOARD['FONTS']['TITLE'], anchor='w')
+        self.title.pack(fill=tk.X)
+        self.status = tk.Label(self, font=DASHBOARD['FONTS']['BODY'], anchor='w', justify=tk.LEFT)
+        self.status.pack(fill=tk.X)
+        self.stack = tk.Label(self, font=DASHBOARD['FONTS']['BODY'], anchor='w', justify=tk.LEFT,
+                              wraplength=width)
+        self.stack.pack(fill=tk.X)
+        self.miniature = tk.Canvas(self, width=width, height=height, bg=DASHBOARD['COLORS']['BACKGROUND'],
+                                   highlightthickness=0)
+        self.miniature.pack(pady=(4, 0))
+
+    def refresh(self) -> None:
+        state = self.reader.read()
+        if state is None:
+            return
+        age = time.time() - state['time']
+        self.status.config(
+            text=f"Trial {state['trial']} of {state['max_trials']} - {state['n_total']} words placed, "
+                 f"{state['n_stack']} in stack - updated {age:.1f} s ago"
+                 + (" - feed truncated, not all words shown" if state['truncated'] else ''),
+            fg='black' if self.reader.alive else DASHBOARD['COLORS']['STALE']
+        )
+        self.stack.config(text="Stack: " + (', '.join(state['stack']) or '(empty)'))
+        self._draw_miniature(state)
+
+    def _draw_miniature(self, state: dict) -> None:
+        canvas = self.miniature
+        canvas.delete('all')
+        width, height = DASHBOARD['MINIATURE_SIZE']
+        padding = DASHBOARD['MINIATURE_PADDING']
+        colors = DASHBOARD['COLORS']
+
+        # Participant's viewport in logical coordinates
+        scale = state['scale'] or 1.0
+        view_x0 = -state['offset_x'] / scale
+        view_y0 = -state['offset_y'] / scale
+        view_x1 = view_x0 + state['view_width'] / scale
+        view_y1 = view_y0 + state['view_height'] / scale
+
+        # Fit the words and the viewport into the miniature, keeping the aspect ratio
+        xs, ys = state['x'], state['y']
+        min_x = min(view_x0, xs.min()) if xs.size else view_x0
+        max_x = max(view_x1, xs.max()) if xs.size else view_x1
+        min_y = min(view_y0, ys.min()) if ys.size else view_y0
+        max_y = max(view_y1, ys.max()) if ys.size else view_y1
+        fit = min((width - 2 * padding) / max(max_x - min_x, 1e-9),
+                  (height - 2 * padding) / max(max_y - min_y, 1e-9))
+        origin_x = padding + ((width - 2 * padding) - (max_x - min_x) * fit) / 2 - min_x * fit
+        origin_y = padding + ((height - 2 * padding) - (max_y - min_y) * fit) / 2 - min_y * fit
+
+        canvas.create_rectangle(origin_x + view_x0 * fit, origin_y + view_y0 * fit,
+                                origin_x + view_x1 * fit, origin_y + view_y1 * fit,
+                                outline=colors['VIEWPORT'], dash=(3, 2))
+        dots_x = origin_x + xs * fit
+        dots_y = origin_y + ys * fit
+        for word, x, y, highlighted in zip(state['words'], dots_x, dots_y, state['highlighted']):
+            color = colors['HIGHLIGHT'] if highlighted else colors['WORD']
+            canvas.create_oval(x - 3, y - 3, x + 3, y + 3, fill=color, outline='')
+            canvas.create_text(x, y - 4, text=word, anchor='s', fill=color, font=DASHBOARD['FONTS']['WORD'])
+
+
+class Dashboard(tk.Tk):
+    def __init__(self):
+        super().__init__()
+        self.title("semGUI Dashboard")
+        self.readers: Dict[int, FeedReader] = {}
+        self.panels: Dict[int, SessionPanel] = {}
+        self._ticks = 0
+
+        self.empty_label = tk.Label(self, text="No running sessions", font=DASHBOARD['FONTS']['TITLE'],
+                                    padx=40, pady=40)
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self._scan()
+        self._tick()
+
+    def _scan(self) -> None:
+        """Pick up new sessions and drop the ones that ended"""
+        self.readers = attach_all(self.readers)
+        for slot in set(self.panels) - set(self.readers):
+            self.panels.pop(slot).destroy()
+        for slot in sorted(set(self.readers) - set(self.panels)):
+            self.panels[slot] = SessionPanel(self, self.readers[slot])
+
+        for i, slot in enumerate(sorted(self.panels)):
+            self.panels[slot].grid(row=i // DASHBOARD['COLUMNS'], column=i % DASHBOARD['COLUMNS'],
+                                   padx=6, pady=6, sticky='nsew')
+        if self.panels:
+            self.empty_label.grid_forget()
+        else:
+            self.empty_label.grid(row=0, column=0)
+
+    def _tick(self) -> None:
+        self._ticks += 1
+        if self._ticks % DASHBOARD['SCAN_EVERY'] == 0:
+            self._scan()
+        for panel in self.panels.values():
+            panel.refresh()
+        self.after(DASHBOARD['REFRESH_MS'], self._tick)
+
+    def close(self) -> None:
+        for reader in self.readers.values():
+            reader.close()
+        self.destroy()
+
+
+if __name__ == "__main__":
+    Dashboard().mainloop()
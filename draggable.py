@@ -1,12 +1,20 @@
+import logging
 import tkinter as tk
-from typing import TYPE_CHECKING, Optional
+from typing import TYPE_CHECKING, Optional, Tuple
+import numpy as np
+from history import Highlight, Move
 from settings import DRAGGABLE_WORD, CANVAS_INTERACTION
+from instrumentation import instrumented
 
 
 
 if TYPE_CHECKING:       # Use TYPE_CHECKING to avoid circular imports
     from wordspace import WordSpace
 
+logger = logging.getLogger(__name__)
+
+SHIFT_MASK = 0x0001  # Shift bit of a Tk event's state
+
 class DraggableWord:
     """Represents a draggable word item on a canvas, displayed as a circle with text."""
 
@@ -43,18 +51,16 @@ class DraggableWord:
         """
         self.parent_space = parent_space
         self.canvas = parent_space.canvas
+        self.model = parent_space.model
         self.word = word
-        self.width = width
-        self.height = height
-        self.is_highlighted = False
 
-        # Store logical center (unscaled)
-        self.logical_x = logical_x
-        self.logical_y = logical_y
+        # Logical center (unscaled), size and highlight state live in the model
+        self.index = self.model.add_word(word, logical_x, logical_y, width, height)
 
         # Drag state tracking
         self._drag_start_x: Optional[float] = None
         self._drag_start_y: Optional[float] = None
+        self._drag_origin: Optional[Tuple[float, float]] = None
 
         # Create canvas elements
         self._create_canvas_elements()
@@ -62,6 +68,38 @@ class DraggableWord:
         # Initial position update
         self.update_canvas_position()
 
+    @property
+    def logical_x(self) -> float:
+        return float(self.model.xs[self.index])
+
+    @logical_x.setter
+    def logical_x(self, value: float) -> None:
+        self.model.xs[self.index] = value
+
+    @property
+    def logical_y(self) -> float:
+        return float(self.model.ys[self.index])
+
+    @logical_y.setter
+    def logical_y(self, value: float) -> None:
+        self.model.ys[self.index] = value
+
+    @property
+    def width(self) -> float:
+        return float(self.model.widths[self.index])
+
+    @property
+    def height(self) -> float:
+        return float(self.model.heights[self.index])
+
+    @property
+    def is_highlighted(self) -> bool:
+        return bool(self.model.highlighted[self.index])
+
+    @is_highlighted.setter
+    def is_highlighted(self, value: bool) -> None:
+        self.model.set_highlight(self.index, value)
+
     def _create_canvas_elements(self) -> None:
         """Create the circle with text (word obj) in the canvas."""
         # Create the oval shape
@@ -82,36 +120,41 @@ class DraggableWord:
             tags=self.TAG  # Add a tag for easier binding
         )
 
-        # Set up event bindings
+        # Set up event bindings, keeping the Tcl command of each callback
+        self._bindings = []
         for item_id in (self.oval_id, self.text_id):
             # Drag bindings
-            self.canvas.tag_bind(item_id, "<ButtonPress-1>", self._on_click)
-            self.canvas.tag_bind(item_id, "<B1-Motion>", self._on_drag_move)
-            self.canvas.tag_bind(item_id, "<ButtonRelease-1>", self._on_drag_end)
+            for sequence, callback in (("<ButtonPress-1>", self._on_click),
+                                       ("<B1-Motion>", self._on_drag_move),
+                                       ("<ButtonRelease-1>", self._on_drag_end)):
+                self._bindings.append((item_id, sequence, self.canvas.tag_bind(item_id, sequence, callback)))
 
     def remove_from_canvas(self) -> None:
         """Remove this word."""
+        # Deleting an item keeps its callbacks registered (and this word alive) until unbound
+        for item_id, sequence, funcid in self._bindings:
+            self.canvas.tag_unbind(item_id, sequence, funcid)
+        self._bindings.clear()
         self.canvas.delete(self.oval_id)
         self.canvas.delete(self.text_id)
 
-    def update_canvas_position(self) -> None:
-        """Recompute device coordinates from logical coordinates, applying scale factor and offset."""
-        sf = self.parent_space.scale_factor
-        ox = self.parent_space.offset_x
-        oy = self.parent_space.offset_y
+    def update_canvas_position(self, center_x: Optional[float] = None, center_y: Optional[float] = None) -> None:
+        """
+        Move the canvas items to the word's device position.
 
-        # Device center
-        center_x = ox + (self.logical_x * sf)
-        center_y = oy + (self.logical_y * sf)
+        Args:
+            center_x, center_y: Precomputed device center, computed from the
+                model's logical coordinates, scale factor and offset if omitted
+        """
+        if center_x is None or center_y is None:
+            center_x, center_y = self.model.device_center(self.index)
 
         # Compute bounding box coordinates
-        x0 = center_x - self.width/2
-        y0 = center_y - self.height/2
-        x1 = center_x + self.width/2
-        y1 = center_y + self.height/2
+        half_w = self.width / 2
+        half_h = self.height / 2
 
         # Update oval and text positions
-        self.canvas.coords(self.oval_id, x0, y0, x1, y1)
+        self.canvas.coords(self.oval_id, center_x - half_w, center_y - half_h, center_x + half_w, center_y + half_h)
         self.canvas.coords(self.text_id, center_x, center_y)
 
     def _on_drag_start(self, event: tk.Event) -> None:
@@ -122,9 +165,10 @@ class DraggableWord:
             event: Tkinter event containing mouse coordinates
         """
         # Current device coords of the oval
-        x0, y0, _, _ = self.canvas.coords(self.oval_id)
-        self._drag_start_x = event.x - x0
-        self._drag_start_y = event.y - y0
+        center_x, center_y = self.model.device_center(self.index)
+        self._drag_start_x = event.x - (center_x - self.width / 2)
+        self._drag_start_y = event.y - (center_y - self.height / 2)
+        self._drag_origin = (self.logical_x, self.logical_y)
 
     def _on_drag_end(self, event: tk.Event) -> None:
         """
@@ -134,21 +178,37 @@ class DraggableWord:
         Args:
             event: Tkinter event containing final mouse coordinates
         """
+        if self.parent_space.group_dragging:
+            self.parent_space.end_group_drag()
+        elif self._drag_origin is not None:
+            dx = self.logical_x - self._drag_origin[0]
+            dy = self.logical_y - self._drag_origin[1]
+            if dx or dy:
+                self.parent_space.history.push(Move(np.array([self.index]), dx, dy))
+                self.parent_space.words_changed([self.index])
+        self._drag_origin = None
         self._drag_start_x = None
         self._drag_start_y = None
 
     def _on_click(self, event: tk.Event) -> None:
             """Handle clicks based on current mode"""
-            if self.parent_space.highlight_mode:
+            space = self.parent_space
+            space.notify_word_event('press', self)
+            if space.highlight_mode:
                 self._highlight_word()
+                space.history.push(Highlight(self.index))
+                space.words_changed([self.index])
+            elif event.state & SHIFT_MASK:
+                space.toggle_selection(self)
+            elif self in space.selected and len(space.selected) > 1:
+                space.start_group_drag(event)
             else:
+                space.clear_selection()
                 self._on_drag_start(event)
 
     def _highlight_word(self) -> None:
         """Toggle highlight state of word and store the state"""
-        self.is_highlighted = not self.is_highlighted
-        
-        if self.is_highlighted:
+        if self.model.toggle_highlight(self.index):
             # Apply highlight
             self.canvas.itemconfig(
                 self.oval_id,
@@ -164,6 +224,10 @@ class DraggableWord:
             )
 
 
+    def toggle_highlight(self) -> None:
+        """Toggle the highlight outside of a click, for undo and redo"""
+        self._highlight_word()
+
     def reset_highlight(self) -> None:
         """Reset highlight state"""
         if hasattr(self, '_original_outline'):
@@ -184,42 +248,20 @@ class DraggableWord:
                 width=self.HIGHLIGHT_WIDTH
             )
 
+    @instrumented('drag_move')
     def _on_drag_move(self, event: tk.Event) -> None:
         """Handle drag motion, disabled in highlight mode"""
+        if self.parent_space.group_dragging:
+            self.parent_space.drag_group(event)
+            return
         if self.parent_space.highlight_mode or self._drag_start_x is None:
             return  # Do nothing if in highlight mode or not dragging
             
-        # Get scale factor and offsets
-        sf = self.parent_space.scale_factor
-        ox = self.parent_space.offset_x
-        oy = self.parent_space.offset_y
-
-        # Get canvas dimensions
-        c_width = int(self.canvas.cget("width"))
-        c_height = int(self.canvas.cget("height"))
-
-        # Compute new position
-        new_x0 = event.x - self._drag_start_x
-        new_y0 = event.y - self._drag_start_y
-        
-        # Calculate new right edge position
-        new_x1 = new_x0 + self.width
-        new_y1 = new_y0 + self.height
-
-        # Boundary checks
-        new_x0 = max(0, min(new_x0, c_width - self.width))
-        new_y0 = max(0, min(new_y0, c_height - self.height))
-        new_x1 = new_x0 + self.width
-        new_y1 = new_y0 + self.height
+        # Clamp to the canvas and update logical coordinates in the model
+        center_x, center_y = self.model.drag_to(
+            self.index, event.x - self._drag_start_x, event.y - self._drag_start_y
+        )
 
         # Apply new coordinates
-        self.canvas.coords(self.oval_id, new_x0, new_y0, new_x1, new_y1)
-
-        # Update text position
-        center_x = (new_x0 + new_x1) / 2
-        center_y = (new_y0 + new_y1) / 2
-        self.canvas.coords(self.text_id, center_x, center_y)
-
-        # Update logical coordinates
-        self.logical_x = (center_x - ox) / sf
-        self.logical_y = (center_y - oy) / sf
+        self.update_canvas_position(center_x, center_y)
+        logger.debug("Drag %s to (%.1f, %.1f)", self.word, center_x, center_y)
@@ -1,13 +1,16 @@
+import logging
 import tkinter as tk
 from tkinter import ttk, filedialog, messagebox
 import os
 import json
 import datetime
-from settings import PATHS, ENTRY_WINDOW, ENTRY_WINDOW_VISUAL, MESSAGES
+from settings import PATHS, ENTRY_WINDOW, ENTRY_WINDOW_VISUAL, MESSAGES, REGISTRY
 from validators import validate_participant_id
-from session_manager import create_session_log, load_session, create_participant_folder, validate_csv
-from controls import MainWindow
-from settings import EXPERIMENT
+from session_manager import create_session_log, load_session, create_participant_folder, validate_csv, read_wordlist, check_wordlist
+from participant_registry import ParticipantRegistry
+from config import get_profile
+
+logger = logging.getLogger(__name__)
 
 class EntryWindow(tk.Toplevel):
     def __init__(self, master):
@@ -29,8 +32,17 @@ class EntryWindow(tk.Toplevel):
         
         # Add validation state tracking
         self.data_verified = False
+
+        # Main experiment window, set once the experiment starts
+        self.main_window = None
+
+        # Index of existing participants, built in the background
+        self.registry = ParticipantRegistry()
+        self.registry.start()
+        self._shown_interrupted = None
         
         self.create_widgets()
+        self._poll_registry()
         
         # Add trace to all input variables to handle changes
         self.participant_id.trace_add("write", self.on_input_change)
@@ -50,8 +62,8 @@ class EntryWindow(tk.Toplevel):
         
         # ID
         ttk.Label(main_frame, text="Participant ID").grid(row=1, column=0, sticky=tk.W, pady=ENTRY_WINDOW['ELEMENT_PADDING'])
-        id_entry = ttk.Entry(main_frame, textvariable=self.participant_id)
-        id_entry.grid(row=1, column=1, sticky=tk.EW, pady=ENTRY_WINDOW['ELEMENT_PADDING'])
+        self.id_entry = ttk.Combobox(main_frame, textvariable=self.participant_id)
+        self.id_entry.grid(row=1, column=1, sticky=tk.EW, pady=ENTRY_WINDOW['ELEMENT_PADDING'])
         self.id_validation_label = ttk.Label(main_frame, text="")
         self.id_validation_label.grid(row=1, column=2, padx=ENTRY_WINDOW['ELEMENT_PADDING'])
         
@@ -84,12 +96,18 @@ class EntryWindow(tk.Toplevel):
         ttk.Button(main_frame, text="...", command=self.browse_recovery).grid(row=7, column=2, padx=ENTRY_WINDOW['ELEMENT_PADDING'])
         
         
+        # Interrupted sessions found in the data folder
+        ttk.Label(main_frame, text="Interrupted:").grid(row=8, column=0, sticky=tk.W, pady=ENTRY_WINDOW['ELEMENT_PADDING'])
+        self.interrupted_combo = ttk.Combobox(main_frame, state="readonly")
+        self.interrupted_combo.grid(row=8, column=1, sticky=tk.EW, pady=ENTRY_WINDOW['ELEMENT_PADDING'])
+        ttk.Button(main_frame, text="Resume", command=self.resume_selected_session).grid(row=8, column=2, padx=ENTRY_WINDOW['ELEMENT_PADDING'])
+        
         self.recovery_info = ttk.Label(main_frame, text="")
-        self.recovery_info.grid(row=8, column=0, columnspan=3, pady=10)
+        self.recovery_info.grid(row=9, column=0, columnspan=3, pady=10)
         
         
         button_frame = ttk.Frame(main_frame)
-        button_frame.grid(row=9, column=0, columnspan=3, pady=20)
+        button_frame.grid(row=10, column=0, columnspan=3, pady=20)
         
         # Verification and start buttons
         ttk.Button(button_frame, text="Verify Data", command=self.verify_data).pack(side=tk.LEFT, padx=10)
@@ -107,16 +125,51 @@ class EntryWindow(tk.Toplevel):
             self.id_validation_label.config(text="")
             return
             
+        # Suggest existing IDs with the same prefix
+        self.id_entry.config(values=self.registry.complete(participant_id))
+
         if validate_participant_id(participant_id):
             # Check if participant ID already exists
-            participant_dir = os.path.join(PATHS['DATA_DIRECTORY'], participant_id)
-            if os.path.exists(participant_dir):
+            if self._participant_exists(participant_id):
                 self.id_validation_label.config(text="⚠️ ID esistente", foreground=ENTRY_WINDOW_VISUAL['VALIDATION_COLORS']['WARNING'])
             else:
                 self.id_validation_label.config(text="✓", foreground=ENTRY_WINDOW_VISUAL['VALIDATION_COLORS']['SUCCESS'])
         else:
             self.id_validation_label.config(text="❌", foreground=ENTRY_WINDOW_VISUAL['VALIDATION_COLORS']['ERROR'])
     
+    def _participant_exists(self, participant_id):
+        """O(1) lookup in the registry, probing the disk only until it is built"""
+        if self.registry.ready.is_set():
+            return self.registry.exists(participant_id)
+        return os.path.exists(os.path.join(PATHS['DATA_DIRECTORY'], participant_id))
+
+    def _poll_registry(self):
+        """Refresh the interrupted-session list when the registry changes"""
+        if not self.winfo_exists():
+            return
+        if self.registry.ready.is_set():
+            sessions = self.registry.interrupted_sessions()
+            if sessions != self._shown_interrupted:
+                self._shown_interrupted = sessions
+                self.interrupted_combo.config(values=[
+                    f"{s['participant_id']} - trial {s['current_trial']} ({s['completed_trials']} done)"
+                    for s in sessions
+                ])
+                # Re-validate the ID now that exact existence data is available
+                self.on_id_change()
+        self.after(REGISTRY['POLL_MS'], self._poll_registry)
+
+    def resume_selected_session(self):
+        """Load the interrupted session selected in the list"""
+        index = self.interrupted_combo.current()
+        if index < 0 or not self._shown_interrupted:
+            return
+        log_path = self._shown_interrupted[index]['log_path']
+        self.recovery_path.set(log_path)
+        self.try_load_recovery_data(log_path)
+        self.data_verified = False
+        self.start_button.config(state=tk.DISABLED)
+
     def browse_wordlist(self):
         """Apre il file dialog per selezionare il file CSV delle word list"""
         filepath = filedialog.askopenfilename(
@@ -168,13 +221,20 @@ class EntryWindow(tk.Toplevel):
                 else:
                     messagebox.showwarning("File not found", 
                                           f"File '{data['wordlist_file']}' not found.")
+
+                # Resuming under different settings would mix configurations in one session
+                profile = get_profile()
+                if data.get("config_hash", profile.hash) != profile.hash:
+                    messagebox.showwarning("Profile mismatch",
+                                          MESSAGES['VALIDATION']['PROFILE_MISMATCH'].format(
+                                              data.get("config_profile"), profile.name))
                 
                 # Show recovery info
                 completed = len(data["completed_trials"])
                 current = data["current_trial"]
                 
                 self.recovery_info.config(
-                    text=f"Experiment for {data['participant_id']} stopped after trial {completed}/10.\n"
+                    text=f"Experiment for {data['participant_id']} stopped after trial {completed}/{profile.experiment.total_trials}.\n"
                          f"Resume from trial {current}?",
                     foreground="blue"
                 )
@@ -279,6 +339,9 @@ class EntryWindow(tk.Toplevel):
     def start_experiment(self):
         """Start the experiment"""
         try:
+            # Imported here so the setup form does not wait for the main-window stack
+            from controls import MainWindow
+
             # Load wordlist first (for both modes)
             words_list = load_wordlist(self.wordlist_path.get())
             if not words_list:
@@ -291,6 +354,11 @@ class EntryWindow(tk.Toplevel):
                 # Save updated JSON
                 with open(self.recovery_path.get(), 'w') as f:
                     json.dump(self.session_data, f, indent=2)
+
+                from storage import get_store
+                store = get_store()
+                if store is not None:
+                    store.save_session(self.session_data)
                 
                 # Get recovery trial number
                 start_trial = self.session_data["current_trial"]
@@ -310,6 +378,7 @@ class EntryWindow(tk.Toplevel):
                 
                 # Create participant folder
                 create_participant_folder(participant_id)
+                self.registry.add(participant_id)
                 
                 # Create session log
                 session_data = create_session_log(
@@ -330,6 +399,8 @@ class EntryWindow(tk.Toplevel):
                 )
 
             
+            self.main_window = app
+            self.registry.stop()
             self.withdraw()
             app.wait_window()
             self.quit()
@@ -349,48 +420,21 @@ class EntryWindow(tk.Toplevel):
 # Support fuction to load wordlist from CSV
 def load_wordlist(filepath):
     """Load words from CSV file."""
-    import csv
-    training_trials = []
-    main_trials = []
-    
     try:
-        with open(filepath, 'r', encoding='utf-8') as csvfile:
-            # Change delimiter to semicolon
-            reader = csv.reader(csvfile, delimiter=';')
-            next(reader)  # Skip header row
-            
-            # Load all rows
-            all_rows = list(reader)
-            
-            # Debug print
-            print(f"Total rows read: {len(all_rows)}")
-            print("First row content:", all_rows[0] if all_rows else "No rows")
-            
-            # Extract training trials (first 2 rows)
-            for i in range(min(EXPERIMENT['TRAINING']['TRIALS'], len(all_rows))):
-                # Get all columns except first (trial number)
-                trial_words = [word.strip() for word in all_rows[i][1:] if word.strip()]
-                print(f"Training trial {i+1} raw data: {all_rows[i]}")
-                print(f"Training trial {i+1} words: {len(trial_words)} - {trial_words}")
-                if trial_words:  # Only add if row contains words
-                    training_trials.append(trial_words)
-            
-            # Extract main trials (remaining rows)
-            for i, row in enumerate(all_rows[EXPERIMENT['TRAINING']['TRIALS']:]):
-                trial_words = [word.strip() for word in row[1:] if word.strip()]
-                if trial_words:  # Only add if row contains words
-                    main_trials.append(trial_words)
-                    print(f"Main trial {i+1}: {len(trial_words)} words loaded")
-            
-            # Debug print
-            print(f"Training trials loaded: {len(training_trials)}")
-            print(f"Main trials loaded: {len(main_trials)}")
-            
-            if not training_trials and not main_trials:
-                raise ValueError("No valid words found in the CSV file. Please check the file format.")
-            
-            # Combine trials in correct order
-            return training_trials + main_trials
+        trials = read_wordlist(filepath)
+        check_wordlist(trials)
+
+        n_training = get_profile().experiment.training_trials
+        training_trials = trials[:n_training]
+        main_trials = trials[n_training:]
+        for i, trial_words in enumerate(training_trials):
+            logger.debug("Training trial %d words: %d", i + 1, len(trial_words), extra={'words': trial_words})
+        for i, trial_words in enumerate(main_trials):
+            logger.debug("Main trial %d: %d words loaded", i + 1, len(trial_words))
+        logger.info("Wordlist loaded: %d training and %d main trials", len(training_trials), len(main_trials),
+                    extra={'wordlist': filepath})
+
+        return trials
 
     except Exception as e:
         messagebox.showerror("Error Loading Wordlist", 
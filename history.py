@@ -0,0 +1,99 @@
+"""
+Undo/redo history of a WordSpace trial.
+
+Operations are stored as small deltas rather than snapshots of the arrangement:
+a move keeps the indices of the moved words and their logical offset, a
+highlight toggle only the word index and an added word its text and position.
+Undoing or redoing an operation touches only the words it changed. The history
+is capped in operations and in bytes; the oldest operations are dropped first.
+"""
+from collections import deque
+from typing import List, NamedTuple, Optional, Union
+
+import numpy as np
+
+from settings import HISTORY
+
+# Rough per-operation cost of the tuple and its Python objects
+OPERATION_OVERHEAD = 120
+
+
+class Move(NamedTuple):
+    """Words moved by a logical offset (one offset for the group, or one per word)."""
+    indices: np.ndarray
+    dx: Union[float, np.ndarray]
+    dy: Union[float, np.ndarray]
+
+
+class Highlight(NamedTuple):
+    """A word's highlight toggled."""
+    index: int
+
+
+class Add(NamedTuple):
+    """A word placed on the canvas (from the stack)."""
+    index: int
+    word: str
+    logical_x: float
+    logical_y: float
+
+
+Operation = Union[Move, Highlight, Add]
+
+
+def operation_size(op: Operation) -> int:
+    """Approximate memory held by an operation, in bytes."""
+    if isinstance(op, Move):
+        return OPERATION_OVERHEAD + op.indices.nbytes + np.asarray(op.dx).nbytes + np.asarray(op.dy).nbytes
+    if isinstance(op, Add):
+        return OPERATION_OVERHEAD + len(op.word)
+    return OPERATION_OVERHEAD
+
+
+class History:
+    """Undo and redo stacks with a memory cap."""
+
+    def __init__(self, max_operations: int = HISTORY['MAX_OPERATIONS'], max_bytes: int = HISTORY['MAX_BYTES']):
+        self.max_operations = max_operations
+        self.max_bytes = max_bytes
+        self._undo: deque = deque()
+        self._redo: List[Operation] = []
+        self.nbytes = 0
+
+    def __len__(self) -> int:
+        return len(self._undo)
+
+    def push(self, op: Operation) -> None:
+        """Record a new operation; anything that could be redone is discarded."""
+        for undone in self._redo:
+            self.nbytes -= operation_size(undone)
+        self._redo.clear()
+        self._push_undo(op)
+
+    def _push_undo(self, op: Operation) -> None:
+        self._undo.append(op)
+        self.nbytes += operation_size(op)
+        while self._undo and (len(self._undo) > self.max_operations or self.nbytes > self.max_bytes):
+            self.nbytes -= operation_size(self._undo.popleft())
+
+    def undo(self) -> Optional[Operation]:
+        """The operation to revert, moved to the redo stack."""
+        if not self._undo:
+            return None
+        op = self._undo.pop()
+        self._redo.append(op)
+        return op
+
+    def redo(self) -> Optional[Operation]:
+        """The operation to apply again, moved back to the undo stack."""
+        if not self._redo:
+            return None
+        op = self._redo.pop()
+        self.nbytes -= operation_size(op)
+        self._push_undo(op)
+        return op
+
+    def clear(self) -> None:
+        self._undo.clear()
+        self._redo.clear()
+        self.nbytes = 0
@@ -0,0 +1,233 @@
+"""
+Interaction latency instrumentation.
+
+Handlers decorated with @instrumented record how long they run and how long it
+takes until Tk has redrawn afterwards (event-to-render latency), into log-bucketed
+histograms. Recording is off unless a LatencyRecorder is installed, so the
+decorators cost a single global lookup when disabled. A resumed session loads
+the statistics of its earlier runs first, so the export covers the whole session.
+"""
+import bisect
+import datetime
+import functools
+import json
+import logging
+import os
+import time
+from contextlib import contextmanager
+from typing import Dict, List, Optional
+
+from settings import INSTRUMENTATION
+
+logger = logging.getLogger(__name__)
+
+# Bucket upper edges in ms: 1 µs to ~60 s, each bucket 10% wider than the last
+BUCKET_EDGES_MS: List[float] = []
+_edge = 0.001
+while _edge < 60000:
+    BUCKET_EDGES_MS.append(_edge)
+    _edge *= 1.1
+del _edge
+# Bucket keys of the exported histograms, back to bucket indices
+BUCKET_INDEX: Dict[str, int] = {f"{edge:.4g}": i for i, edge in enumerate(BUCKET_EDGES_MS + [float('inf')])}
+
+_recorder: Optional['LatencyRecorder'] = None
+
+
+class LatencyHistogram:
+    """Fixed-memory histogram of durations in milliseconds."""
+
+    __slots__ = ('counts', 'count', 'total', 'max')
+
+    def __init__(self):
+        self.counts = [0] * (len(BUCKET_EDGES_MS) + 1)
+        self.count = 0
+        self.total = 0.0
+        self.max = 0.0
+
+    def record(self, ms: float) -> None:
+        self.counts[bisect.bisect_left(BUCKET_EDGES_MS, ms)] += 1
+        self.count += 1
+        self.total += ms
+        if ms > self.max:
+            self.max = ms
+
+    def percentile(self, p: float) -> float:
+        """Upper edge of the bucket holding the p-th percentile (within 10%)."""
+        if not self.count:
+            return 0.0
+        rank = p / 100 * self.count
+        seen = 0
+        for i, n in enumerate(self.counts):
+            seen += n
+            if seen >= rank and n:
+                return min(BUCKET_EDGES_MS[i], self.max) if i < len(BUCKET_EDGES_MS) else self.max
+        return self.max
+
+    def summary(self) -> dict:
+        return {
+            'count': self.count,
+            'mean_ms': self.total / self.count if self.count else 0.0,
+            'p50_ms': self.percentile(50),
+            'p90_ms': self.percentile(90),
+            'p99_ms': self.percentile(99),
+            'max_ms': self.max
+        }
+
+    def to_dict(self) -> dict:
+        """Summary plus the sparse bucket counts, for later merging across sessions."""
+        data = self.summary()
+        data['buckets'] = {f"{BUCKET_EDGES_MS[i] if i < len(BUCKET_EDGES_MS) else float('inf'):.4g}": n
+                           for i, n in enumerate(self.counts) if n}
+        return data
+
+    @classmethod
+    def from_dict(cls, data: dict) -> 'LatencyHistogram':
+        """Rebuild a histogram written by to_dict."""
+        hist = cls()
+        for key, n in data['buckets'].items():
+            hist.counts[BUCKET_INDEX[key]] += n
+        hist.count = data['count']
+        hist.total = data['mean_ms'] * data['count']
+        hist.max = data['max_ms']
+        return hist
+
+
+class LatencyRecorder:
+    """Collects handler and event-to-render latency for one session."""
+
+    def __init__(self, widget, participant_id=None):
+        """
+        Args:
+            widget: Any Tk widget, used to schedule idle render probes
+            participant_id: Stored in the exported statistics
+        """
+        self.widget = widget
+        self.participant_id = participant_id
+        self.handler: Dict[str, LatencyHistogram] = {}
+        self.render: Dict[str, LatencyHistogram] = {}
+        self.trial_handler: Dict[str, LatencyHistogram] = {}
+        self.trial_render: Dict[str, LatencyHistogram] = {}
+        self.trials: Dict[str, dict] = {}
+        self._pending_renders: List[tuple] = []
+
+    def record_handler(self, name: str, start_ns: int, end_ns: int) -> None:
+        ms = (end_ns - start_ns) / 1e6
+        for table in (self.handler, self.trial_handler):
+            hist = table.get(name)
+            if hist is None:
+                hist = table[name] = LatencyHistogram()
+            hist.record(ms)
+
+    def probe_render(self, name: str, start_ns: int) -> None:
+        """Measure until the next idle point, after Tk's pending redraws ran."""
+        if not self._pending_renders:
+            self.widget.after_idle(self._on_rendered)
+        self._pending_renders.append((name, start_ns))
+
+    def _on_rendered(self) -> None:
+        now = time.perf_counter_ns()
+        pending, self._pending_renders = self._pending_renders, []
+        for name, start_ns in pending:
+            ms = (now - start_ns) / 1e6
+            for table in (self.render, self.trial_render):
+                hist = table.get(name)
+                if hist is None:
+                    hist = table[name] = LatencyHistogram()
+                hist.record(ms)
+
+    def end_trial(self, trial_number: int) -> None:
+        """Close the per-trial histograms and keep their summaries."""
+        self.trials[str(trial_number)] = {
+            'handler': {name: h.summary() for name, h in self.trial_handler.items()},
+            'render': {name: h.summary() for name, h in self.trial_render.items()}
+        }
+        self.trial_handler = {}
+        self.trial_render = {}
+
+    def is_too_slow(self, threshold_ms: float = INSTRUMENTATION['SLOW_RENDER_P99_MS']) -> bool:
+        """True if any interaction's p99 event-to-render latency exceeds the threshold."""
+        return any(h.percentile(99) > threshold_ms for h in self.render.values())
+
+    def overlay_text(self) -> str:
+        parts = []
+        for name in INSTRUMENTATION['OVERLAY']['HANDLERS']:
+            hist = self.render.get(name) or self.handler.get(name)
+            if hist is not None and hist.count:
+                parts.append(f"{name} p50 {hist.percentile(50):.1f} / p99 {hist.percentile(99):.1f} ms")
+        return "  |  ".join(parts)
+
+    def load(self, filepath: str) -> None:
+        """Continue from the statistics an earlier run of the session exported to filepath."""
+        try:
+            with open(filepath) as f:
+                data = json.load(f)
+            handler = {name: LatencyHistogram.from_dict(h) for name, h in data['handler'].items()}
+            render = {name: LatencyHistogram.from_dict(h) for name, h in data['render'].items()}
+            trials = data['trials']
+        except FileNotFoundError:
+            return
+        except (OSError, ValueError, KeyError, TypeError) as e:
+            logger.warning("Cannot read the earlier latency statistics %s, starting over: %s", filepath, e)
+            return
+        self.handler, self.render = handler, render
+        self.trials = {**trials, **self.trials}
+
+    def export(self, filepath: str) -> None:
+        """Write the session statistics as JSON."""
+        data = {
+            'participant_id': self.participant_id,
+            'updated': datetime.datetime.now().isoformat(),
+            'too_slow': self.is_too_slow(),
+            'slow_render_p99_threshold_ms': INSTRUMENTATION['SLOW_RENDER_P99_MS'],
+            'handler': {name: h.to_dict() for name, h in self.handler.items()},
+            'render': {name: h.to_dict() for name, h in self.render.items()},
+            'trials': self.trials
+        }
+        tmp_path = f"{filepath}.tmp"
+        with open(tmp_path, 'w') as f:
+            json.dump(data, f, indent=2)
+        os.replace(tmp_path, filepath)
+
+
+def install(recorder: Optional[LatencyRecorder]) -> None:
+    """Make recorder the destination of all instrumented handlers (None disables)."""
+    global _recorder
+    _recorder = recorder
+
+
+def active() -> Optional[LatencyRecorder]:
+    return _recorder
+
+
+def instrumented(name: str, render: bool = True):
+    """Decorator recording the duration (and redraw latency) of a handler."""
+    def decorator(func):
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            recorder = _recorder
+            if recorder is None:
+                return func(*args, **kwargs)
+            start = time.perf_counter_ns()
+            try:
+                return func(*args, **kwargs)
+            finally:
+                recorder.record_handler(name, start, time.perf_counter_ns())
+                if render:
+                    recorder.probe_render(name, start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def measure(name: str):
+    """Record the duration of a block under name, without a render probe."""
+    recorder = _recorder
+    if recorder is None:
+        yield
+        return
+    start = time.perf_counter_ns()
+    try:
+        yield
+    finally:
+        recorder.record_handler(name, start, time.perf_counter_ns())
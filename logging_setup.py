@@ -0,0 +1,198 @@
+"""
+Non-blocking, structured logging for the experiment.
+
+The Tk thread only puts log records on a queue (QueueHandler); a QueueListener
+thread formats them and writes them to the console and, once a participant is
+known, to a JSON-lines file in the participant folder. Each record carries the
+current context (participant, trial) and any `extra` fields as JSON keys.
+High-frequency records of the drag, zoom and view-frame handlers are rate
+limited per message on the Tk thread before they are even queued, so verbose
+diagnostics can stay on during real sessions. Tracebacks are formatted when the
+record is queued and kept apart from the message, as the `exception` key.
+
+    logging_setup.setup_logging()
+    logging_setup.set_context(participant='P001', trial=1)
+    logging_setup.start_session_file('data/P001')
+"""
+import atexit
+import copy
+import datetime
+import json
+import logging
+import logging.handlers
+import os
+import queue
+import time
+from typing import Dict, List, Optional, Tuple
+
+from settings import LOGGING
+
+# Attributes every LogRecord has; anything else came in through `extra`
+STANDARD_ATTRIBUTES = frozenset(vars(logging.LogRecord('', 0, '', 0, '', None, None))) | {'message', 'asctime'}
+
+_context: Dict[str, object] = {}
+_listener: Optional[logging.handlers.QueueListener] = None
+_queue_handler: Optional[logging.handlers.QueueHandler] = None
+_console_handler: Optional[logging.Handler] = None
+_session_handler: Optional[logging.Handler] = None
+
+
+def set_context(**fields) -> None:
+    """Fields added to every following record; None removes a field."""
+    for key, value in fields.items():
+        if value is None:
+            _context.pop(key, None)
+        else:
+            _context[key] = value
+
+
+class ContextFilter(logging.Filter):
+    """Stamps records with the context at the time they are logged."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        for key, value in _context.items():
+            if not hasattr(record, key):
+                setattr(record, key, value)
+        return True
+
+
+class RateLimitFilter(logging.Filter):
+    """
+    Lets at most `per_second` records of the same message through per second.
+
+    Only records of the given loggers (the event handlers) are limited. They are
+    keyed by logger and unformatted message, so a handler that logs the same
+    template on every motion event is throttled as one stream. The next record
+    let through reports how many were dropped in `suppressed`. Records above
+    `max_level` are never dropped.
+    """
+
+    def __init__(self, per_second: int = LOGGING['RATE_LIMIT']['PER_SECOND'],
+                 max_level: str = LOGGING['RATE_LIMIT']['MAX_LEVEL'],
+                 loggers=tuple(LOGGING['RATE_LIMIT']['LOGGERS'])):
+        super().__init__()
+        self.per_second = per_second
+        self.max_level = logging.getLevelName(max_level)
+        self.loggers = frozenset(loggers)
+        # key -> [window start, records let through, records dropped]
+        self._windows: Dict[Tuple[str, str], List] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if record.levelno > self.max_level or record.name not in self.loggers:
+            return True
+        now = time.monotonic()
+        key = (record.name, str(record.msg))
+        window = self._windows.get(key)
+        if window is None or now - window[0] >= 1.0:
+            suppressed = window[2] if window is not None else 0
+            self._windows[key] = [now, 1, 0]
+            if suppressed:
+                record.suppressed = suppressed
+            return True
+        if window[1] < self.per_second:
+            window[1] += 1
+            return True
+        window[2] += 1
+        return False
+
+
+class JsonLineFormatter(logging.Formatter):
+    """One JSON object per record: time, level, logger, message, context and extra fields."""
+
+    def format(self, record: logging.LogRecord) -> str:
+        entry = {
+            'time': datetime.datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage()
+        }
+        for key, value in vars(record).items():
+            if key not in STANDARD_ATTRIBUTES and not key.startswith('_'):
+                entry[key] = value
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            entry['exception'] = record.exc_text
+        if record.stack_info:
+            entry['stack'] = record.stack_info
+        return json.dumps(entry, ensure_ascii=False, default=str)
+
+
+class StructuredQueueHandler(logging.handlers.QueueHandler):
+    """QueueHandler that keeps the traceback out of the message."""
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        # The stock prepare folds the formatted traceback into msg and drops exc_info;
+        # format it here, while the traceback is still alive, and keep it as exc_text
+        record = copy.copy(record)
+        record.message = record.getMessage()
+        if record.exc_info and not record.exc_text:
+            record.exc_text = logging.Formatter().formatException(record.exc_info)
+        record.msg = record.message
+        record.args = None
+        record.exc_info = None
+        return record
+
+
+def _start_listener() -> None:
+    """(Re)start the listener thread with the current output handlers."""
+    global _listener
+    if _listener is not None:
+        # Stopping drains the queue, so nothing logged so far is lost
+        _listener.stop()
+    handlers = [h for h in (_console_handler, _session_handler) if h is not None]
+    _listener = logging.handlers.QueueListener(_queue_handler.queue, *handlers, respect_handler_level=True)
+    _listener.start()
+
+
+def setup_logging(level: str = LOGGING['LEVEL']) -> None:
+    """Route the root logger through the queue; safe to call more than once."""
+    global _queue_handler, _console_handler
+    if _queue_handler is not None:
+        return
+    _console_handler = logging.StreamHandler()
+    _console_handler.setFormatter(logging.Formatter(LOGGING['CONSOLE_FORMAT']))
+
+    _queue_handler = StructuredQueueHandler(queue.SimpleQueue())
+    _queue_handler.addFilter(RateLimitFilter())
+    _queue_handler.addFilter(ContextFilter())
+
+    root = logging.getLogger()
+    root.setLevel(level)
+    root.addHandler(_queue_handler)
+    _start_listener()
+    atexit.register(shutdown)
+
+
+def start_session_file(directory: str) -> str:
+    """Also write JSON lines to the session file in directory; returns its path."""
+    global _session_handler
+    if _queue_handler is None:
+        setup_logging()
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, LOGGING['SESSION_FILENAME'])
+    stop_session_file()
+    _session_handler = logging.FileHandler(path, encoding='utf-8')
+    _session_handler.setFormatter(JsonLineFormatter())
+    _start_listener()
+    return path
+
+
+def stop_session_file() -> None:
+    """Close the session file; the console keeps logging."""
+    global _session_handler
+    if _session_handler is None:
+        return
+    handler, _session_handler = _session_handler, None
+    _start_listener()
+    handler.close()
+
+
+def shutdown() -> None:
+    """Write out everything still queued and close the files."""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+    if _session_handler is not None:
+        _session_handler.close()
@@ -1,25 +1,82 @@
 #!/usr/bin/env python3
 #       ================   entry point for the application   ===================
 #       Run this file to start the GUI
+#       python main.py --profile-startup   reports import and first-paint time
+#       python main.py --config pilot      runs with profiles/pilot.toml
+#       python main.py --soak              writes per-trial memory growth to soak.json
+
+import time
+_PROCESS_START = time.perf_counter()
+
+import argparse
+import logging
 
 import tkinter as tk
+_TK_IMPORTED = time.perf_counter()
+
+import logging_setup
+from config import ConfigError, load_profile, use_profile
 from entry_window import EntryWindow
-import logging
+from settings import SOAK
+_ENTRY_IMPORTED = time.perf_counter()
 
 
-logging.basicConfig(level=logging.INFO, 
-                   format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+logging_setup.setup_logging()
 logger = logging.getLogger(__name__)
 
+
+def parse_args():
+    parser = argparse.ArgumentParser(description="semGUI experiment interface")
+    parser.add_argument('--config', default=None,
+                        help="Configuration profile: a name in profiles/ or a TOML/JSON file")
+    parser.add_argument('--profile-startup', action='store_true',
+                        help="Report import and first-paint time of the setup window")
+    parser.add_argument('--profile-output', default=None,
+                        help="Also write the startup profile as JSON to this file")
+    parser.add_argument('--exit-after-paint', action='store_true',
+                        help="Quit as soon as the setup window is drawn (for benchmarks)")
+    parser.add_argument('--soak', action='store_true',
+                        help="Record memory and Tk object growth at every trial (SOAK in settings.py)")
+    args = parser.parse_args()
+    if args.config:
+        try:
+            use_profile(load_profile(args.config))
+        except ConfigError as e:
+            parser.error(str(e))
+    if args.soak:
+        SOAK['ENABLED'] = True
+    return args
+
+
 if __name__ == "__main__":
+    args = parse_args()
+    profile = None
+    if args.profile_startup:
+        from startup_profile import StartupProfile, on_first_paint
+        profile = StartupProfile(_PROCESS_START)
+        profile.marks['import_tkinter'] = (_TK_IMPORTED - _PROCESS_START) * 1000
+        profile.marks['import_entry_window'] = (_ENTRY_IMPORTED - _PROCESS_START) * 1000
+
     root = tk.Tk()
     root.withdraw()
-    
+
     try:
         entry_app = EntryWindow(root)
+        if profile is not None:
+            profile.mark('entry_window_built')
+
+            def report_first_paint():
+                profile.mark('first_paint')
+                profile.print_report()
+                if args.profile_output:
+                    profile.save(args.profile_output)
+                if args.exit_after_paint:
+                    root.quit()
+
+            on_first_paint(entry_app, report_first_paint)
         root.mainloop()
     except Exception as e:
         logger.exception("Unexpected error")
         tk.messagebox.showerror("Error", f"Something went wrong:\n{e}")
     finally:
-        root.destroy()
\ No newline at end of file
+        root.destroy()
@@ -0,0 +1,172 @@
+"""
+Minimap overview for WordSpace.
+
+Shows every word as a dot on one small PhotoImage, plus a rectangle for the
+part of the space that is currently visible. Clicking or dragging on it centres
+the view on that point. Dots are counted per pixel, so when words move only
+their counts change and only the pixels they touched are sent to Tk again; the
+whole image is rebuilt only when words are added or removed or leave the mapped
+area. The viewport rectangle is redrawn at most every THROTTLE_MS while panning
+and zooming.
+"""
+import tkinter as tk
+from typing import TYPE_CHECKING, Iterable, Optional, Tuple
+
+import numpy as np
+
+from settings import MINIMAP
+
+if TYPE_CHECKING:
+    from wordspace import WordSpace
+
+BACKGROUND, WORD, HIGHLIGHT = 0, 1, 2
+
+
+class Minimap(tk.Canvas):
+    """Downsampled drawing of all word positions with the current viewport."""
+
+    def __init__(self, space: 'WordSpace'):
+        self.map_width, self.map_height = MINIMAP['SIZE']
+        colors = MINIMAP['COLORS']
+        super().__init__(space, width=self.map_width, height=self.map_height, bg=colors['BACKGROUND'],
+                         highlightthickness=1, highlightbackground=colors['BORDER'], cursor='hand2')
+        self.space = space
+        self.model = space.model
+        self.dot = MINIMAP['DOT_SIZE']
+        self._palette = np.array([colors['BACKGROUND'], colors['WORD'], colors['HIGHLIGHT']])
+
+        self.image = tk.PhotoImage(width=self.map_width, height=self.map_height)
+        self.create_image(0, 0, image=self.image, anchor='nw')
+        self.viewport_id = self.create_rectangle(0, 0, 0, 0, outline=colors['VIEWPORT'])
+
+        # Dots per pixel for plain and highlighted words, and each word's pixel and kind
+        self._counts = np.zeros((2, self.map_height, self.map_width), dtype=np.int32)
+        self._px = np.zeros(0, dtype=np.intp)
+        self._py = np.zeros(0, dtype=np.intp)
+        self._kind = np.zeros(0, dtype=np.intp)
+
+        # Logical -> minimap transform: pixel = origin + logical * fit
+        self._fit = 1.0
+        self._origin = (0.0, 0.0)
+
+        self._rebuild_after: Optional[str] = None
+        self._viewport_after: Optional[str] = None
+
+        self.bind("<Button-1>", self._on_click)
+        self.bind("<B1-Motion>", self._on_click)
+
+    # ---------------------------------------------------------------- updates
+
+    def invalidate(self) -> None:
+        """Rebuild the whole image once the current event is handled."""
+        if self._rebuild_after is None:
+            self._rebuild_after = self.after_idle(self.rebuild)
+
+    def view_changed(self) -> None:
+        """Redraw the viewport rectangle, at most once per THROTTLE_MS."""
+        if self._viewport_after is None:
+            self._viewport_after = self.after(MINIMAP['THROTTLE_MS'], self._draw_viewport)
+
+    def update_words(self, indices: Iterable[int]) -> None:
+        """Move the dots of words whose position or highlight changed."""
+        if self._rebuild_after is not None:
+            return
+        indices = np.fromiter(indices, dtype=np.intp)
+        if len(self._px) != len(self.model) or not indices.size:
+            self.invalidate()
+            return
+        px, py, inside = self._to_pixels(self.model.xs[indices], self.model.ys[indices])
+        if not inside.all():
+            # A word left the mapped area: refit everything
+            self.invalidate()
+            return
+        kind = self.model.highlighted[indices].astype(np.intp)
+
+        old_px, old_py = self._px[indices], self._py[indices]
+        np.subtract.at(self._counts, (self._kind[indices], old_py, old_px), 1)
+        np.add.at(self._counts, (kind, py, px), 1)
+        self._px[indices], self._py[indices], self._kind[indices] = px, py, kind
+
+        # Send only the pixels around the old and new dots
+        all_x = np.concatenate([old_px, px])
+        all_y = np.concatenate([old_py, py])
+        self._put(int(all_x.min()), int(all_y.min()),
+                  int(all_x.max()) + self.dot, int(all_y.max()) + self.dot)
+
+    def rebuild(self) -> None:
+        """Refit the mapped area to the words and redraw every dot."""
+        self._rebuild_after = None
+        model = self.model
+        xs, ys = model.xs, model.ys
+        if len(model):
+            center_x = (float(xs.min()) + float(xs.max())) / 2
+            center_y = (float(ys.min()) + float(ys.max())) / 2
+            span_x = float(xs.max() - xs.min())
+            span_y = float(ys.max() - ys.min())
+        else:
+            center_x = center_y = span_x = span_y = 0.0
+
+        # At least the area the canvas shows when fully zoomed out
+        margin = 1 + 2 * MINIMAP['MARGIN']
+        span_x = max(span_x * margin, model.width / model.min_scale)
+        span_y = max(span_y * margin, model.height / model.min_scale)
+        self._fit = min((self.map_width - self.dot) / span_x, (self.map_height - self.dot) / span_y)
+        self._origin = ((self.map_width - self.dot) / 2 - center_x * self._fit,
+                        (self.map_height - self.dot) / 2 - center_y * self._fit)
+
+        self._px, self._py, _ = self._to_pixels(xs, ys)
+        self._kind = model.highlighted.astype(np.intp)
+        self._counts[:] = 0
+        np.add.at(self._counts, (self._kind, self._py, self._px), 1)
+        self._put(0, 0, self.map_width, self.map_height)
+        self._draw_viewport()
+
+    # ---------------------------------------------------------------- drawing
+
+    def _to_pixels(self, xs: np.ndarray, ys: np.ndarray) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Top-left pixel of each word's dot, clipped, and whether it was inside."""
+        px = np.floor(self._origin[0] + xs * self._fit).astype(np.intp)
+        py = np.floor(self._origin[1] + ys * self._fit).astype(np.intp)
+        max_x = self.map_width - self.dot
+        max_y = self.map_height - self.dot
+        inside = (px >= 0) & (px <= max_x) & (py >= 0) & (py <= max_y)
+        return np.clip(px, 0, max_x), np.clip(py, 0, max_y), inside
+
+    def _put(self, x0: int, y0: int, x1: int, y1: int) -> None:
+        """Recolor a region of the image from the dot counts."""
+        x1 = min(x1, self.map_width)
+        y1 = min(y1, self.map_height)
+        # Dots cover dot x dot pixels down-right of their pixel, so look that far up-left
+        sx0 = max(x0 - self.dot + 1, 0)
+        sy0 = max(y0 - self.dot + 1, 0)
+        plain = self._counts[0, sy0:y1, sx0:x1] > 0
+        highlighted = self._counts[1, sy0:y1, sx0:x1] > 0
+        height, width = plain.shape
+        covered_plain = np.zeros_like(plain)
+        covered_highlighted = np.zeros_like(highlighted)
+        for dy in range(self.dot):
+            for dx in range(self.dot):
+                covered_plain[dy:, dx:] |= plain[:height - dy, :width - dx]
+                covered_highlighted[dy:, dx:] |= highlighted[:height - dy, :width - dx]
+        kinds = np.where(covered_highlighted, HIGHLIGHT, np.where(covered_plain, WORD, BACKGROUND))
+        colors = self._palette[kinds[y0 - sy0:, x0 - sx0:]]
+        data = ' '.join('{' + ' '.join(row) + '}' for row in colors.tolist())
+        self.image.put(data, to=(x0, y0))
+
+    def _draw_viewport(self) -> None:
+        self._viewport_after = None
+        model = self.model
+        canvas = self.space.canvas
+        x0, y0 = model.to_logical(0, 0)
+        x1, y1 = model.to_logical(canvas.winfo_width(), canvas.winfo_height())
+        origin_x, origin_y = self._origin
+        self.coords(self.viewport_id,
+                    origin_x + x0 * self._fit, origin_y + y0 * self._fit,
+                    origin_x + x1 * self._fit, origin_y + y1 * self._fit)
+
+    # ------------------------------------------------------------- navigation
+
+    def _on_click(self, event: tk.Event) -> None:
+        """Centre the view on the clicked point."""
+        origin_x, origin_y = self._origin
+        self.space.center_on((event.x - origin_x) / self._fit, (event.y - origin_y) / self._fit)
@@ -0,0 +1,134 @@
+"""
+In-memory index of the participant folders in data/.
+
+Built once in a background thread and refreshed incrementally, so the setup form
+can check whether an ID exists, autocomplete IDs and list interrupted sessions
+without touching the (possibly networked) filesystem on every keystroke.
+"""
+import bisect
+import json
+import os
+import threading
+from typing import Dict, List, Optional
+
+from settings import PATHS, REGISTRY
+
+
+class ParticipantRegistry:
+    """Thread-safe index of participant IDs and their session state."""
+
+    def __init__(self, data_dir: str = PATHS['DATA_DIRECTORY'],
+                 refresh_interval: float = REGISTRY['REFRESH_INTERVAL_S']):
+        self.data_dir = data_dir
+        self.refresh_interval = refresh_interval
+        self.ready = threading.Event()
+
+        self._lock = threading.Lock()
+        self._ids: set = set()
+        self._sorted_ids: List[str] = []
+        self._sessions: Dict[str, dict] = {}
+        self._dir_mtimes: Dict[str, int] = {}
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    # ------------------------------------------------------------- background
+
+    def start(self) -> None:
+        """Build the index in a daemon thread and keep it up to date."""
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name='participant-registry', daemon=True)
+            self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
+
+    def _run(self) -> None:
+        self.refresh()
+        self.ready.set()
+        while not self._stop.wait(self.refresh_interval):
+            self.refresh()
+
+    def refresh(self) -> None:
+        """Rescan data/, re-reading only the participant folders whose mtime changed."""
+        with self._lock:
+            known = set(self._ids)
+        folders: Dict[str, int] = {}
+        try:
+            for entry in os.scandir(self.data_dir):
+                try:
+                    if entry.is_dir():
+                        folders[entry.name] = entry.stat().st_mtime_ns
+                except OSError:
+                    continue
+        except FileNotFoundError:
+            pass
+
+        # log.json is replaced, never rewritten in place, so any change to it changes
+        # the folder's mtime; folders with the same mtime still hold the log read last time
+        changed = {}
+        for participant_id, mtime in folders.items():
+            if self._dir_mtimes.get(participant_id) != mtime:
+                log_path = os.path.join(self.data_dir, participant_id, REGISTRY['LOG_FILENAME'])
+                changed[participant_id] = self._read_session(participant_id, log_path)
+
+        with self._lock:
+            # Merge rather than replace: IDs add()ed during the scan were not in known and stay
+            removed = known - folders.keys()
+            ids = (self._ids - removed) | folders.keys()
+            if ids != self._ids:
+                self._ids = ids
+                self._sorted_ids = sorted(ids)
+            for participant_id in removed:
+                self._sessions.pop(participant_id, None)
+            for participant_id, summary in changed.items():
+                if summary is None:
+                    self._sessions.pop(participant_id, None)
+                else:
+                    self._sessions[participant_id] = summary
+            self._dir_mtimes = folders
+
+    @staticmethod
+    def _read_session(participant_id: str, log_path: str) -> Optional[dict]:
+        try:
+            with open(log_path, 'r') as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return {
+            'participant_id': data.get('participant_id', participant_id),
+            'log_path': log_path,
+            'current_trial': data.get('current_trial'),
+            'completed_trials': len(data.get('completed_trials', [])),
+            'start_time': data.get('start_time'),
+            'interrupted': bool(data.get('interrupted')) or data.get('end_time') is None
+        }
+
+    # ----------------------------------------------------------------- queries
+
+    def exists(self, participant_id: str) -> bool:
+        with self._lock:
+            return participant_id in self._ids
+
+    def add(self, participant_id: str) -> None:
+        """Register a folder created by this process without waiting for a rescan."""
+        with self._lock:
+            if participant_id not in self._ids:
+                self._ids.add(participant_id)
+                bisect.insort(self._sorted_ids, participant_id)
+
+    def complete(self, prefix: str, limit: int = REGISTRY['AUTOCOMPLETE_LIMIT']) -> List[str]:
+        """IDs starting with prefix, in sorted order."""
+        with self._lock:
+            start = bisect.bisect_left(self._sorted_ids, prefix)
+            matches = []
+            for participant_id in self._sorted_ids[start:start + limit]:
+                if not participant_id.startswith(prefix):
+                    break
+                matches.append(participant_id)
+            return matches
+
+    def interrupted_sessions(self) -> List[dict]:
+        """Sessions marked interrupted or never finished, most recent first."""
+        with self._lock:
+            sessions = [s for s in self._sessions.values() if s['interrupted']]
+        return sorted(sessions, key=lambda s: s['start_time'] or '', reverse=True)
@@ -0,0 +1,123 @@
+"""
+On-demand profiling of the interface thread.
+
+When a station feels slow, the experimenter presses PROFILER['KEY'] in the
+experiment window to start cProfile on the Tk thread, and presses it again to
+stop. While it runs, a profile is also dumped at the end of every trial, so each
+file covers at most one trial. Files go to data/<participant>/profiles/ and
+their names carry the station, participant and trial:
+
+    <station>_<participant>_trial_NN_<YYYYmmdd-HHMMSS-mmm>_<seq>.prof
+
+`python profiler.py [data]` merges every dump it finds (copied from any
+number of stations) into one report of the hottest functions.
+"""
+import cProfile
+import datetime
+import glob
+import io
+import logging
+import os
+import pstats
+import socket
+from typing import List, Optional
+
+from settings import PATHS, PROFILER
+
+logger = logging.getLogger(__name__)
+
+
+class UIProfiler:
+    """cProfile of the thread that starts it, dumped per trial."""
+
+    def __init__(self, participant_id=None, data_directory: str = PATHS['DATA_DIRECTORY']):
+        self.participant_id = str(participant_id) if participant_id else 'anonymous'
+        base = os.path.join(data_directory, str(participant_id)) if participant_id else data_directory
+        self.directory = os.path.join(base, PROFILER['DIRECTORY'])
+        # The station is the first field of the file name, so it cannot contain '_'
+        self.station = socket.gethostname().replace('_', '-')
+        self._profile: Optional[cProfile.Profile] = None
+        self._dumps = 0
+
+    @property
+    def running(self) -> bool:
+        return self._profile is not None
+
+    def start(self) -> None:
+        if self._profile is None:
+            self._profile = cProfile.Profile()
+            self._profile.enable()
+
+    def stop(self, trial_number: int) -> Optional[str]:
+        """Stop profiling and dump what was recorded; returns the file written."""
+        if self._profile is None:
+            return None
+        profile, self._profile = self._profile, None
+        profile.disable()
+        os.makedirs(self.directory, exist_ok=True)
+        # Milliseconds and a per-session count, so two dumps in one second never collide
+        stamp = datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')[:-3]
+        self._dumps += 1
+        path = os.path.join(self.directory, f"{self.station}_{self.participant_id}_trial_{trial_number:02d}_"
+                                            f"{stamp}_{self._dumps:03d}.prof")
+        profile.dump_stats(path)
+        return path
+
+    def toggle(self, trial_number: int) -> Optional[str]:
+        """Start, or stop and dump; returns the file written when stopping."""
+        if self._profile is None:
+            self.start()
+            return None
+        return self.stop(trial_number)
+
+    def trial_ended(self, trial_number: int, last: bool = False) -> Optional[str]:
+        """Dump the trial that just ended and keep profiling the next one, if there is one."""
+        if self._profile is None:
+            return None
+        path = self.stop(trial_number)
+        if not last:
+            self.start()
+        return path
+
+
+def find_profiles(root: str) -> List[str]:
+    """Every profile dump below root."""
+    return sorted(glob.glob(os.path.join(root, '**', '*.prof'), recursive=True))
+
+
+def aggregate(paths: List[str], sort: str = PROFILER['SORT'], top: int = PROFILER['TOP_FUNCTIONS'],
+              output: Optional[str] = None) -> str:
+    """One hot-function report over all the given dumps."""
+    stats = None
+    for path in paths:
+        try:
+            if stats is None:
+                stats = pstats.Stats(path, stream=io.StringIO())
+            else:
+                stats.add(path)
+        except (OSError, EOFError, TypeError, ValueError) as e:
+            logger.warning("Skipping unreadable profile %s: %s", path, e)
+    if stats is None:
+        return "No profiles found."
+    if output:
+        stats.dump_stats(output)
+
+    stations = sorted({os.path.basename(path).split('_')[0] for path in paths})
+    stream = io.StringIO()
+    stream.write(f"{len(paths)} profiles from {len(stations)} stations: {', '.join(stations)}\n")
+    stats.stream = stream
+    stats.strip_dirs().sort_stats(sort).print_stats(top)
+    return stream.getvalue()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Merge profile dumps into one hot-function report")
+    parser.add_argument('root', nargs='?', default=PATHS['DATA_DIRECTORY'],
+                        help="Directory searched recursively for .prof files")
+    parser.add_argument('--sort', default=PROFILER['SORT'], help="pstats sort key, e.g. cumulative or tottime")
+    parser.add_argument('--top', type=int, default=PROFILER['TOP_FUNCTIONS'], help="Functions to list")
+    parser.add_argument('--output', default=None, help="Also write the merged profile to this file")
+    args = parser.parse_args()
+    print(aggregate(find_profiles(args.root), args.sort, args.top, args.output))
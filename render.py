@@ -0,0 +1,254 @@
+"""
+Headless rendering of final arrangements.
+
+Reads the results CSVs of every participant and draws one figure per trial with
+the same look as DraggableWord on the Tk canvas, as PNG (Pillow) and/or SVG.
+Ovals are sized to their word by the canvas rule (textmetrics.oval_around),
+with the text measured in the Pillow font used for drawing.
+Figures are rendered on a process pool; results files whose content and render
+settings are unchanged since the last run are skipped.
+
+Usage:
+    python render.py [--data-dir data] [--output figures] [--format png svg]
+"""
+import argparse
+import functools
+import json
+import logging
+import os
+from concurrent.futures import ProcessPoolExecutor, as_completed
+from typing import Dict, List, Sequence, Tuple
+from xml.sax.saxutils import escape
+
+from cache import digest, file_digest
+from settings import DRAGGABLE_WORD, RENDER, TEXT_METRICS, TRIAL_MANAGER, WORDSPACE
+from textmetrics import oval_around
+from trial_manager import find_results_files, load_trial_results
+
+logger = logging.getLogger(__name__)
+
+# Smallest oval; with TEXT_METRICS['ENABLED'] longer words get wider ovals
+WORD_WIDTH = DRAGGABLE_WORD['SIZE']['DEFAULT_WIDTH']
+WORD_HEIGHT = DRAGGABLE_WORD['SIZE']['DEFAULT_HEIGHT']
+# Tk font sizes are points, convert to pixels at the usual 96 dpi
+FONT_PIXELS = round(DRAGGABLE_WORD['FONT']['SIZE'] * 96 / 72)
+
+
+def layout_trial(rows: List[dict], width: int = WORDSPACE['CANVAS']['DEFAULT_WIDTH'],
+                 height: int = WORDSPACE['CANVAS']['DEFAULT_HEIGHT'],
+                 margin: int = RENDER['FIT_MARGIN']) -> List[Tuple[str, float, float, bool]]:
+    """
+    Map result rows to device centers, the way reset_pov frames the arrangement.
+
+    The arrangement is centered on the canvas at 100% zoom and only shrunk when it
+    would not fit, so figures match what the participant saw after recentering.
+    """
+    if not rows:
+        return []
+    invert = -1.0 if TRIAL_MANAGER['COORDINATES']['INVERT_Y'] else 1.0
+    xs = [row['x_coord'] for row in rows]
+    ys = [row['y_coord'] * invert for row in rows]
+
+    min_x, max_x, min_y, max_y = min(xs), max(xs), min(ys), max(ys)
+    sizes = [word_size(row['word']) for row in rows]
+    usable_w = max(width - 2 * margin - max(w for w, _ in sizes), 1)
+    usable_h = max(height - 2 * margin - max(h for _, h in sizes), 1)
+    scale = min(1.0, usable_w / max(max_x - min_x, 1e-9), usable_h / max(max_y - min_y, 1e-9))
+
+    center_x = (min_x + max_x) / 2
+    center_y = (min_y + max_y) / 2
+    return [
+        (row['word'], width / 2 + (x - center_x) * scale, height / 2 + (y - center_y) * scale, row['highlighted'])
+        for row, x, y in zip(rows, xs, ys)
+    ]
+
+
+@functools.lru_cache(maxsize=None)
+def _load_font():
+    from PIL import ImageFont
+    for font_file in RENDER['FONT_FILES']:
+        try:
+            return ImageFont.truetype(font_file, FONT_PIXELS)
+        except OSError:
+            continue
+    return ImageFont.load_default()
+
+
+@functools.lru_cache(maxsize=None)
+def word_size(word: str) -> Tuple[int, int]:
+    """Oval width and height of a word, as the canvas sizes it."""
+    if not TEXT_METRICS['ENABLED']:
+        return WORD_WIDTH, WORD_HEIGHT
+    from PIL import ImageFont
+    font = _load_font()
+    if isinstance(font, ImageFont.FreeTypeFont):
+        # Ascent plus descent, like Tk's linespace
+        linespace = sum(font.getmetrics())
+    else:
+        linespace = font.getbbox('Ag')[3]
+    return oval_around(font.getlength(word), linespace, WORD_WIDTH, WORD_HEIGHT)
+
+
+def render_png(placed, filepath: str, width: int, height: int) -> None:
+    """Draw placed words to a PNG with Pillow."""
+    from PIL import Image, ImageDraw, ImageFont
+
+    image = Image.new('RGB', (width, height), WORDSPACE['CANVAS']['BACKGROUND_COLOR'])
+    draw = ImageDraw.Draw(image)
+    font = _load_font()
+    colors = DRAGGABLE_WORD['COLORS']
+    outline = DRAGGABLE_WORD['OUTLINE']
+
+    for word, cx, cy, highlighted in placed:
+        w, h = word_size(word)
+        box = (cx - w / 2, cy - h / 2, cx + w / 2, cy + h / 2)
+        draw.ellipse(
+            box,
+            fill=colors['FILL'],
+            outline=colors['HIGHLIGHT'] if highlighted else colors['OUTLINE'],
+            width=outline['HIGHLIGHT_WIDTH'] if highlighted else outline['DEFAULT_WIDTH']
+        )
+        # Same stacking order as the canvas: each word's text sits right above its oval
+        if isinstance(font, ImageFont.FreeTypeFont):
+            draw.text((cx, cy), word, fill=colors['TEXT'], font=font, anchor='mm')
+        else:
+            # Bitmap fallback fonts do not support anchors
+            left, top, right, bottom = draw.textbbox((0, 0), word, font=font)
+            draw.text((cx - (right - left) / 2, cy - (bottom - top) / 2), word, fill=colors['TEXT'], font=font)
+
+    image.save(filepath)
+
+
+def render_svg(placed, filepath: str, width: int, height: int) -> None:
+    """Write placed words as a standalone SVG document."""
+    colors = DRAGGABLE_WORD['COLORS']
+    outline = DRAGGABLE_WORD['OUTLINE']
+    font = DRAGGABLE_WORD['FONT']
+
+    parts = [
+        f'<svg xmlns="http://www.w3.org/2000/svg" width="{width}" height="{height}" '
+        f'viewBox="0 0 {width} {height}">',
+        f'<rect width="100%" height="100%" fill="{WORDSPACE["CANVAS"]["BACKGROUND_COLOR"]}"/>'
+    ]
+    for word, cx, cy, highlighted in placed:
+        stroke = colors['HIGHLIGHT'] if highlighted else colors['OUTLINE']
+        stroke_width = outline['HIGHLIGHT_WIDTH'] if highlighted else outline['DEFAULT_WIDTH']
+        rx, ry = (size / 2 for size in word_size(word))
+        parts.append(
+            f'<ellipse cx="{cx:.2f}" cy="{cy:.2f}" rx="{rx}" ry="{ry}" fill="{colors["FILL"]}" '
+            f'stroke="{stroke}" stroke-width="{stroke_width}"/>'
+        )
+        parts.append(
+            f'<text x="{cx:.2f}" y="{cy:.2f}" fill="{colors["TEXT"]}" font-family="{font["FAMILY"]}" '
+            f'font-size="{FONT_PIXELS}px" text-anchor="middle" dominant-baseline="central">{escape(word)}</text>'
+        )
+    parts.append('</svg>')
+
+    with open(filepath, 'w', encoding='utf-8') as f:
+        f.write('\n'.join(parts))
+
+
+RENDERERS = {'png': render_png, 'svg': render_svg}
+
+
+def render_results_file(results_path: str, output_dir: str, formats: Sequence[str]) -> List[str]:
+    """Render every trial of one results CSV. Runs inside a worker process."""
+    width = WORDSPACE['CANVAS']['DEFAULT_WIDTH']
+    height = WORDSPACE['CANVAS']['DEFAULT_HEIGHT']
+
+    by_trial: Dict[int, List[dict]] = {}
+    for row in load_trial_results(results_path):
+        by_trial.setdefault(row['trial_number'], []).append(row)
+
+    os.makedirs(output_dir, exist_ok=True)
+    written = []
+    for trial, rows in sorted(by_trial.items()):
+        placed = layout_trial(rows, width, height)
+        for ext in formats:
+            filepath = os.path.join(output_dir, RENDER['PATHS']['FIGURE_TEMPLATE'].format(trial=trial, ext=ext))
+            RENDERERS[ext](placed, filepath, width, height)
+            written.append(filepath)
+    return written
+
+
+def _settings_digest(formats: Sequence[str]) -> str:
+    """Any change to the look must invalidate previously rendered figures."""
+    return digest(DRAGGABLE_WORD, WORDSPACE['CANVAS'], RENDER, TEXT_METRICS, tuple(formats))
+
+
+def render_cohort(data_dir: str = TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'],
+                  output_dir: str = RENDER['PATHS']['OUTPUT_DIRECTORY'],
+                  formats: Sequence[str] = RENDER['FORMATS'],
+                  workers=RENDER['WORKERS'], force: bool = False) -> dict:
+    """
+    Render all participants' arrangements in parallel.
+
+    Args:
+        data_dir: Folder containing one sub-folder per participant
+        output_dir: Figures are written to <output_dir>/<participant>/
+        formats: Image formats to produce ('png', 'svg')
+        workers: Number of worker processes, None for one per CPU
+        force: Re-render even if the source data is unchanged
+
+    Returns:
+        Counts of rendered, skipped and failed results files.
+    """
+    unknown = set(formats) - set(RENDERERS)
+    if unknown:
+        raise ValueError(f"Unsupported figure format(s): {', '.join(sorted(unknown))}")
+
+    os.makedirs(output_dir, exist_ok=True)
+    manifest_path = os.path.join(output_dir, RENDER['PATHS']['MANIFEST_FILENAME'])
+    try:
+        with open(manifest_path, 'r', encoding='utf-8') as f:
+            manifest = json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        manifest = {}
+
+    settings_key = _settings_digest(formats)
+    pending = {}
+    skipped = 0
+    for participant_id, results_path in find_results_files(data_dir).items():
+        key = digest(settings_key, file_digest(results_path))
+        entry = manifest.get(participant_id)
+        if (not force and entry and entry['key'] == key
+                and all(os.path.exists(p) for p in entry['figures'])):
+            skipped += 1
+            continue
+        pending[participant_id] = (results_path, key)
+
+    failed = 0
+    with ProcessPoolExecutor(max_workers=workers) as pool:
+        futures = {
+            pool.submit(render_results_file, path, os.path.join(output_dir, pid), tuple(formats)): (pid, key)
+            for pid, (path, key) in pending.items()
+        }
+        for future in as_completed(futures):
+            participant_id, key = futures[future]
+            try:
+                manifest[participant_id] = {'key': key, 'figures': future.result()}
+            except Exception:
+                failed += 1
+                manifest.pop(participant_id, None)
+                logger.exception("Rendering failed for %s", participant_id)
+
+    tmp_path = f"{manifest_path}.tmp"
+    with open(tmp_path, 'w', encoding='utf-8') as f:
+        json.dump(manifest, f, indent=2)
+    os.replace(tmp_path, manifest_path)
+
+    return {'rendered': len(pending) - failed, 'skipped': skipped, 'failed': failed}
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Render arrangement figures without Tk")
+    parser.add_argument('--data-dir', default=TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'])
+    parser.add_argument('--output', default=RENDER['PATHS']['OUTPUT_DIRECTORY'])
+    parser.add_argument('--format', nargs='+', default=list(RENDER['FORMATS']), choices=sorted(RENDERERS))
+    parser.add_argument('--workers', type=int, default=RENDER['WORKERS'])
+    parser.add_argument('--force', action='store_true', help="Re-render unchanged files too")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    counts = render_cohort(args.data_dir, args.output, args.format, args.workers, args.force)
+    print(f"Rendered {counts['rendered']}, skipped {counts['skipped']}, failed {counts['failed']}")
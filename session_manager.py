@@ -2,7 +2,8 @@ import os
 import json
 import datetime
 import csv
-from settings import EXPERIMENT 
+from config import get_profile
+from storage import get_store
 
 def create_participant_folder(participant_id):
     """Create a folder for the participant if it doesn't exist"""
@@ -22,8 +23,53 @@ def validate_csv(filepath):
     except:
         return False
 
+def read_wordlist(filepath):
+    """Read the trials of a wordlist CSV (trial;word1;word2;...), training trials first.
+
+    Raises ValueError when the file contains no words.
+    """
+    with open(filepath, 'r', encoding='utf-8') as csvfile:
+        reader = csv.reader(csvfile, delimiter=';')
+        next(reader)  # Skip header row
+        all_rows = list(reader)
+
+    trials = []
+    for row in all_rows:
+        # Get all columns except first (trial number)
+        trial_words = [word.strip() for word in row[1:] if word.strip()]
+        if trial_words:  # Only add if row contains words
+            trials.append(trial_words)
+
+    if not trials:
+        raise ValueError("No valid words found in the CSV file. Please check the file format.")
+    return trials
+
+def check_wordlist(trials, experiment=None):
+    """Check a wordlist against the profile's trial and word counts.
+
+    Raises ValueError describing the first mismatch.
+    """
+    experiment = experiment or get_profile().experiment
+    if len(trials) < experiment.total_trials:
+        raise ValueError(f"The wordlist has {len(trials)} trials, {experiment.total_trials} are needed.")
+    for number, trial_words in enumerate(trials[:experiment.total_trials], start=1):
+        training = number <= experiment.training_trials
+        expected = experiment.training_words if training else experiment.main_words
+        if len(trial_words) != expected:
+            kind = "Training" if training else "Main"
+            raise ValueError(f"{kind} trial {number} has {len(trial_words)} words, {expected} are expected.")
+
+def _write_session_log(session_data):
+    """Replace log.json atomically; the new folder mtime tells the participant registry it changed"""
+    log_path = os.path.join("data", session_data["participant_id"], "log.json")
+    tmp_path = f"{log_path}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(session_data, f, indent=2)
+    os.replace(tmp_path, log_path)
+
 def create_session_log(participant_id, experimenter, wordlist_file, notes=""):
     """Create a log file fot the new session"""""
+    profile = get_profile()
     session_data = {
         "participant_id": participant_id,
         "experimenter": experimenter,
@@ -36,13 +82,17 @@ def create_session_log(participant_id, experimenter, wordlist_file, notes=""):
         "completed_trials":[],
         "current_trial": 1,
         "interrupted": False,
-        "notes": notes
+        "notes": notes,
+        "config_profile": profile.name,
+        "config_hash": profile.hash
     }
     
     # Save the session
-    log_path = os.path.join("data", participant_id, "log.json")
-    with open(log_path, 'w') as f:
-        json.dump(session_data, f, indent=2)
+    _write_session_log(session_data)
+
+    store = get_store()
+    if store is not None:
+        store.save_session(session_data)
     
     return session_data
 
@@ -53,8 +103,7 @@ def load_session(filepath):
 
 def update_session_log(session_data, completed_trial=None, interrupted=False):
     """Update the session log with the current state"""
-    total_trials = (EXPERIMENT['TRAINING']['TRIALS'] + 
-                   EXPERIMENT['MAIN']['TRIALS'])
+    total_trials = get_profile().experiment.total_trials
     
     if completed_trial is not None:
         if completed_trial not in session_data["completed_trials"]:
@@ -71,6 +120,8 @@ def update_session_log(session_data, completed_trial=None, interrupted=False):
         session_data["end_time"] = datetime.datetime.now().isoformat()
     
     # Save JSON
-    log_path = os.path.join("data", session_data["participant_id"], "log.json")
-    with open(log_path, 'w') as f:
-        json.dump(session_data, f, indent=2)
\ No newline at end of file
+    _write_session_log(session_data)
+
+    store = get_store()
+    if store is not None:
+        store.save_session(session_data)
\ No newline at end of file
@@ -6,7 +6,12 @@ __all__ = [
     'GUI', 'VISUAL', 'EXPERIMENT', 'TEXT',
     'PATHS', 'ENTRY_WINDOW', 'ENTRY_WINDOW_VISUAL',
     'MESSAGES', 'TRIAL_MANAGER', 'DRAGGABLE_WORD',
-    'CANVAS_INTERACTION', 'WORDSPACE'
+    'CANVAS_INTERACTION', 'WORDSPACE', 'CLUSTERING', 'RENDER',
+    'BOT_PARTICIPANT', 'INSTRUMENTATION',
+    'TIMING', 'STARTUP_PROFILE', 'REGISTRY',
+    'STORAGE', 'COLUMNAR', 'COLLECTOR', 'FEED', 'DASHBOARD',
+    'WEB', 'CONFIG', 'HISTORY', 'ANIMATION', 'MINIMAP',
+    'STACK', 'TEXT_METRICS', 'UNTANGLE', 'SOAK', 'LOGGING', 'PROFILER'
 ]
 
 #  ----------------- controls.py Settings
@@ -54,7 +59,8 @@ TEXT = {
     'BUTTONS': {
         'END_TRIAL': 'FINE PROVA',
         'RECENTER': 'RICENTRA',
-        'HIGHLIGHT': 'EVIDENZIATORE: {}'
+        'HIGHLIGHT': 'EVIDENZIATORE: {}',
+        'UNTANGLE': 'SEPARA'
     },
     'MESSAGES': {
         'NO_MORE_WORDS': 'No more words to add.',
@@ -99,7 +105,8 @@ MESSAGES = {
         'INVALID_CSV': 'The wordlist file is not a valid CSV.',
         'MISSING_EXPERIMENTER': 'Please enter the experimentr\'s name',
         'VALIDATION_SUCCESS': 'All data is valid. Ready to start the experiment.',
-        'RECOVERY_SUCCESS': 'Recovery data valid. Ready to resume from trial {}.'
+        'RECOVERY_SUCCESS': 'Recovery data valid. Ready to resume from trial {}.',
+        'PROFILE_MISMATCH': 'This session was recorded with profile \'{}\' but profile \'{}\' is active.'
     },
     'ERRORS': {
         'LOAD_ERROR': 'Unable to load recovery file:\n{}',
@@ -121,9 +128,13 @@ TRIAL_MANAGER = {
     'TIMESTAMP_FORMAT': '%Y%m%d_%H%M%S',
     'PATHS': {
         'DATA_DIRECTORY': 'data',
-        'RESULTS_FILENAME_TEMPLATE': 'experiment_results_{timestamp}.csv'
+        'RESULTS_FILENAME_TEMPLATE': 'experiment_results_{timestamp}.csv',
+        'EVENTS_FILENAME_TEMPLATE': 'events_trial_{trial:02d}.json'
     },
     'CSV_FIELDS': ['trial_number', 'word', 'x_coord', 'y_coord', 'highlighted'],
+    'BUFFER': {
+        'INITIAL_CAPACITY': 1024  # Rows preallocated for the session's results; grows by doubling
+    },
     'MESSAGES': {
         'COMPLETED': 'All trials completed!',
         'TRIAL_PROGRESS': 'Trial {prev_trial} complete. Starting trial {next_trial}',
@@ -201,6 +212,14 @@ WORDSPACE = {
         'HIGHLIGHT_CURSOR': 'hand2',
         'DEFAULT_CURSOR': '',
     },
+    'SELECTION': {
+        'TAG': 'selected',  # On both items of every selected word, moved together
+        'OVAL_TAG': 'selected_oval',  # Ovals only, recolored with one itemconfig
+        'FILL': 'steelblue',
+        'BAND_OUTLINE': 'blue',
+        'BAND_DASH': (4, 2),
+        'MIN_BAND_SIZE': 3  # Smaller rubber bands count as a click on the background
+    },
     'LABELS': {
         'ZOOM_LABEL': {
             'BACKGROUND': 'white',
@@ -211,3 +230,268 @@ WORDSPACE = {
         }
     }
 }
+
+# ----------------- clustering.py Settings
+CLUSTERING = {
+    'METHOD': 'average',  # Linkage method, must work on precomputed distances
+    'METRIC': 'euclidean',
+    'NORMALIZE_RDM': True,  # Scale each participant RDM to max 1 before averaging
+    'PATHS': {
+        'CACHE_DIRECTORY': '.cache/linkage',
+        'OUTPUT_FILENAME': 'dendrograms.json'
+    }
+}
+
+# ----------------- render.py Settings
+RENDER = {
+    'FORMATS': ('png',),  # Any of 'png', 'svg'
+    'FIT_MARGIN': 40,  # Pixels kept free around the arrangement
+    'FONT_FILES': ('arial.ttf', 'Arial.ttf', 'DejaVuSans.ttf'),  # Tried in order
+    'WORKERS': None,  # None uses one process per CPU
+    'PATHS': {
+        'OUTPUT_DIRECTORY': 'figures',
+        'MANIFEST_FILENAME': 'manifest.json',
+        'FIGURE_TEMPLATE': 'trial_{trial:02d}.{ext}'
+    }
+}
+
+# ----------------- bot_participant.py Settings
+BOT_PARTICIPANT = {
+    'SESSIONS': 1,
+    'DRAGS_PER_WORD': 10,
+    'MOTION_STEPS': 8,  # B1-Motion events per drag
+    'EVENT_DELAY_MS': 0,  # Pause between generated events, 0 = as fast as possible
+    'DELAY_JITTER_MS': 0,  # Random extra pause added to EVENT_DELAY_MS
+    'ZOOM_PROBABILITY': 0.3,  # Chance of a wheel zoom after each word
+    'PAN_PROBABILITY': 0.3,  # Chance of an arrow-key pan after each word
+    'PARTICIPANT_ID_START': 9000,
+    'XVFB': {
+        'DISPLAY': ':99',
+        'SCREEN': '1920x1080x24'
+    }
+}
+
+# ----------------- instrumentation.py Settings
+INSTRUMENTATION = {
+    'ENABLED': True,  # Record handler and event-to-render latency
+    'SLOW_RENDER_P99_MS': 50,  # Stations above this p99 are flagged as too slow
+    'OUTPUT_FILENAME': 'latency.json',  # Written next to log.json
+    'OVERLAY': {
+        'ENABLED': False,  # Show live p50/p99 on the canvas
+        'REFRESH_MS': 500,
+        'HANDLERS': ['drag_move', 'pivot_zoom', 'pan_offset', 'view_frame'],
+        'BACKGROUND': 'white',
+        'FOREGROUND': 'dim gray',
+        'ANCHOR': 'ne',
+        'RELATIVE_X': 1.0,
+        'RELATIVE_Y': 0.0
+    }
+}
+
+# ----------------- timing.py Settings
+TIMING = {
+    'ENABLED': True,
+    'LAG_PROBE_INTERVAL_MS': 50,  # How often the event-loop lag is sampled
+    'MAX_P99_LAG_MS': 20,  # Sessions above either limit are flagged as not acceptable
+    'MAX_LAG_MS': 250,
+    'OUTPUT_FILENAME': 'timing.json'  # Written next to log.json
+}
+
+# ----------------- soak.py Settings
+SOAK = {
+    'ENABLED': False,  # Snapshot memory and Tk objects at every trial reset (also: main.py --soak)
+    'FRAMES': 10,  # Traceback depth kept by tracemalloc
+    'TOP_SITES': 15,  # Allocation sites reported per trial
+    'OUTPUT_FILENAME': 'soak.json'  # Written next to log.json
+}
+
+# ----------------- profiler.py Settings
+PROFILER = {
+    'ENABLED': True,
+    'KEY': '<Control-Alt-p>',  # Hidden: starts/stops profiling in the experiment window
+    'DIRECTORY': 'profiles',  # Inside the participant folder
+    'SORT': 'cumulative',  # Order of the aggregated report
+    'TOP_FUNCTIONS': 30
+}
+
+# ----------------- logging_setup.py Settings
+LOGGING = {
+    'LEVEL': 'INFO',  # DEBUG adds the drag and zoom diagnostics
+    'CONSOLE_FORMAT': '%(asctime)s - %(name)s - %(levelname)s - %(message)s',
+    'SESSION_FILENAME': 'session_log.jsonl',  # JSON lines written next to log.json
+    'RATE_LIMIT': {
+        'PER_SECOND': 5,  # Records of the same message let through per second
+        'MAX_LEVEL': 'INFO',  # Warnings and errors are never dropped
+        'LOGGERS': ['draggable', 'wordspace', 'animation']  # Event-handler modules; others are never limited
+    }
+}
+
+# ----------------- startup_profile.py Settings
+STARTUP_PROFILE = {
+    # Must not be imported before the entry window is shown
+    'DEFERRED_MODULES': ['controls', 'wordspace', 'draggable', 'trial_manager', 'arrangement', 'numpy'],
+    'BENCHMARK_RUNS': 10,
+    'HISTORY_FILE': 'startup_benchmark.csv'
+}
+
+# ----------------- participant_registry.py Settings
+REGISTRY = {
+    'REFRESH_INTERVAL_S': 10,  # Background rescan period of data/
+    'POLL_MS': 200,  # How often the entry window checks for registry updates
+    'AUTOCOMPLETE_LIMIT': 10,
+    'LOG_FILENAME': 'log.json'
+}
+
+# ----------------- storage.py Settings
+STORAGE = {
+    'BACKEND': 'files',  # 'files' (log.json + CSV) or 'sqlite' (database, files kept as exports)
+    'SQLITE_PATH': 'data/semgui.sqlite3',
+    'EXPORT_DIRECTORY': 'db_export'  # storage.py export writes into data/<ID>/db_export by default
+}
+
+# ----------------- columnar.py Settings
+COLUMNAR = {
+    'ENABLED': True,  # Write a columnar file per trial next to the results CSV
+    'PREFER_PARQUET': True,  # Use Parquet if pyarrow is installed, else .npz
+    'TRIAL_FILENAME_TEMPLATE': 'trial_{trial:02d}',
+    'COHORT_FILENAME': 'cohort'
+}
+
+# ----------------- collector.py Settings
+COLLECTOR = {
+    'ENABLED': False,  # Send every trial and session update to the lab collector
+    'HOST': '127.0.0.1',
+    'PORT': 8765,
+    'STATION_ID': None,  # None uses the host name
+    'SPOOL_DIRECTORY': 'collector_spool',  # Unacknowledged messages; kept outside data/ on purpose
+    'DATABASE_PATH': 'collector/semgui.sqlite3',  # Central database, on the collector machine
+    'BATCH_SIZE': 200,  # Messages per transaction at most
+    'BATCH_INTERVAL_MS': 0,  # Extra wait for a batch to fill; queued messages are always batched
+    'WINDOW': 32,  # Messages in flight per station before waiting for acks
+    'MAX_MESSAGE_BYTES': 16 * 1024 * 1024,  # Longest message line accepted; a 600-word trial is about 100 KB
+    'RECONNECT_BACKOFF_S': (0.5, 10.0),  # First and longest delay between reconnect attempts
+    'SOCKET_TIMEOUT_S': 10.0,
+    'FLUSH_TIMEOUT_S': 5.0  # How long closing the app waits for the spool to drain
+}
+
+# ----------------- shm_feed.py Settings
+FEED = {
+    'ENABLED': True,  # Publish the session to shared memory for dashboard.py
+    'PREFIX': 'semgui_feed_',  # Shared-memory block names are PREFIX + slot number
+    'MAX_SESSIONS': 8,  # Slots scanned by the dashboard
+    'PUBLISH_MS': 100,  # Publish interval, from a Tk timer and never from the drag handlers
+    'CAPACITY': 256,  # Minimum words per frame, raised to the session's largest trial
+    'FRAMES': 8,  # Ring length
+    'NAMES_BYTES': 16384,  # Minimum space for the canvas and stack word lists (JSON), raised likewise
+    'STALE_AFTER_S': 5.0  # A session that stopped publishing this long ago is hidden
+}
+
+# ----------------- dashboard.py Settings
+DASHBOARD = {
+    'REFRESH_MS': 200,
+    'SCAN_EVERY': 10,  # Look for new sessions every N refreshes
+    'COLUMNS': 2,
+    'MINIATURE_SIZE': (320, 240),
+    'MINIATURE_PADDING': 12,
+    'COLORS': {
+        'BACKGROUND': '#f4f4f4',
+        'WORD': '#4a6fa5',
+        'HIGHLIGHT': '#e8a33d',
+        'VIEWPORT': '#888888',
+        'STALE': '#b0b0b0'
+    },
+    'FONTS': {
+        'TITLE': ('Arial', 12, 'bold'),
+        'BODY': ('Arial', 9),
+        'WORD': ('Arial', 7)
+    }
+}
+
+# ----------------- web_server.py Settings
+WEB = {
+    'HOST': '127.0.0.1',
+    'PORT': 8080,
+    'STATIC_DIRECTORY': 'web',  # Relative to web_server.py
+    'WORDLIST': 'wordlist.csv',
+    'EXPERIMENTER': 'web',  # Recorded as experimenter in the session logs
+    'JOURNAL_ENABLED': True,  # Clients send their interaction events with each trial
+    'JOURNAL_SAMPLE_MS': 50,  # Drag moves are journaled at most this often per word
+    'MAX_EVENTS_PER_TRIAL': 20000,
+    'SESSION_IDLE_TIMEOUT_S': 3600,  # Idle sessions are logged as interrupted and dropped
+    'CLEANUP_INTERVAL_S': 60,
+    'MAX_REQUEST_BYTES': 4 * 1024 * 1024,
+    'MESSAGES': {
+        'EXISTING_ID': 'The ID {} already exists.'
+    }
+}
+
+# ----------------- config.py Settings
+CONFIG = {
+    'PROFILE_DIRECTORY': 'profiles',  # Profile names are looked up here as <name>.toml or <name>.json
+    'ENV_VAR': 'SEMGUI_PROFILE'  # Profile used when none is given on the command line
+}
+
+# ----------------- history.py Settings
+HISTORY = {
+    'ENABLED': True,
+    'MAX_OPERATIONS': 1000,  # Per trial; the oldest operations are dropped first
+    'MAX_BYTES': 256 * 1024,
+    'UNDO_KEYS': ['<Control-z>'],
+    'REDO_KEYS': ['<Control-y>', '<Control-Z>']
+}
+
+# ----------------- animation.py Settings
+ANIMATION = {
+    'ENABLED': True,  # Off: arrows and wheel move the view immediately, one redraw per event
+    'FRAME_MS': 16,  # At most one view redraw per frame (~60 fps)
+    'EASING': 0.35,  # Fraction of the pending pan/zoom applied per frame
+    'PAN_SNAP_PX': 0.5,  # Pending pan below this is applied at once
+    'ZOOM_SNAP': 0.002  # Same for the log of the pending zoom factor
+}
+
+# ----------------- minimap.py Settings
+MINIMAP = {
+    'ENABLED': True,
+    'SIZE': (180, 110),  # Pixels; the image is rebuilt only when words are added, removed or leave the area
+    'DOT_SIZE': 3,
+    'MARGIN': 0.1,  # Extra space around the words, as a fraction of their extent
+    'THROTTLE_MS': 100,  # Viewport rectangle refresh interval during pan/zoom
+    'COLORS': {
+        'BACKGROUND': '#f4f4f4',
+        'WORD': '#606060',
+        'HIGHLIGHT': '#ff0000',
+        'VIEWPORT': '#0050c8',
+        'BORDER': '#a0a0a0'
+    },
+    'POSITION': {  # Bottom right: the latency overlay uses the top right corner
+        'RELATIVE_X': 1.0,
+        'RELATIVE_Y': 1.0,
+        'ANCHOR': 'se'
+    }
+}
+
+# ----------------- stackword.py Settings
+STACK = {
+    'ROW_HEIGHT': 38,  # Pixels per word row, including the gap
+    'ROW_GAP': 5,
+    'FONT': ('Arial', 10, 'bold'),
+    'COLORS': {
+        'PANEL_BG': 'lightgrey',
+        'BG': 'gray',
+        'FG': 'white'
+    }
+}
+
+# ----------------- textmetrics.py Settings
+TEXT_METRICS = {
+    'ENABLED': True,  # Size each oval to its word; off: every oval has the profile's word size
+    'CACHE_PATH': '.cache/textmetrics.json',
+    'PADDING': 4  # Pixels between the text and its oval
+}
+
+# ----------------- untangle (arrangement.py) Settings
+UNTANGLE = {
+    'ENABLED': False,  # Experimenter option: show the button that spreads overlapping words
+    'ITERATIONS': 200,  # Upper bound; stops as soon as nothing overlaps or nothing moves
+    'GAP': 2  # Logical units left between words pushed apart
+}
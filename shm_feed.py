@@ -0,0 +1,318 @@
+"""
+Shared-memory feed of a running session, for the experimenter dashboard.
+
+MainWindow publishes the word positions, view transform, trial number and the
+remaining stack words into a shared-memory block at a fixed rate; the dashboard
+process attaches to the block and reads it without any file I/O or sockets.
+
+Block layout (all little-endian, see HEADER_DTYPE and frame_dtype):
+
+    header | names (JSON, seqlock) | ring of FRAMES frames (seqlock each)
+
+The writer fills the frame after the newest one and then moves `head`, so a
+reader copying the newest frame is never overwritten unless it is FRAMES
+publish intervals late; every frame and the names region carry a sequence
+number that is odd while being written, which readers use to detect torn reads.
+MainWindow sizes the block for the largest trial of the session. Should a trial
+still not fit, positions past the capacity and names that do not fit are left
+out (the names JSON is never cut), and the frame's flags say so.
+Blocks are named `<PREFIX><slot>`, the writer takes the first free slot.
+"""
+import json
+import os
+import time
+from multiprocessing import resource_tracker, shared_memory
+from typing import List, Optional, Tuple
+
+import numpy as np
+
+from settings import FEED
+
+MAGIC = b'SEMFEED2'
+
+# Frame flags
+WORDS_TRUNCATED = 1  # More words on the canvas than the frame capacity
+NAMES_TRUNCATED = 2  # Some word names did not fit in the names region
+
+HEADER_DTYPE = np.dtype([
+    ('magic', 'S8'),
+    ('capacity', '<u4'),
+    ('frames', '<u4'),
+    ('names_bytes', '<u4'),
+    ('head', '<u4'),
+    ('pid', '<u4'),
+    ('names_seq', '<u4'),
+    ('names_len', '<u4'),
+    ('heartbeat', '<f8'),
+    ('participant_id', 'S64'),
+])
+
+
+def frame_dtype(capacity: int) -> np.dtype:
+    return np.dtype([
+        ('seq', '<u8'),
+        ('names_seq', '<u4'),
+        ('trial', '<u4'),
+        ('max_trials', '<u4'),
+        ('n_words', '<u4'),
+        ('n_stack', '<u4'),
+        ('n_total', '<u4'),
+        ('flags', '<u4'),
+        ('time', '<f8'),
+        ('scale', '<f8'),
+        ('offset_x', '<f8'),
+        ('offset_y', '<f8'),
+        ('view_width', '<f8'),
+        ('view_height', '<f8'),
+        ('x', '<f8', (capacity,)),
+        ('y', '<f8', (capacity,)),
+        ('highlighted', 'u1', (capacity,)),
+    ])
+
+
+def slot_name(slot: int) -> str:
+    return f"{FEED['PREFIX']}{slot}"
+
+
+def feed_sizes(trials: List[List[str]]) -> Tuple[int, int]:
+    """Frame capacity and names bytes that fit every trial, never below the defaults."""
+    largest = max(trials, key=len, default=[])
+    # A trial's words are split between canvas and stack, never longer than all on the canvas
+    names_bytes = len(json.dumps({'canvas': largest, 'stack': []}).encode())
+    return max(FEED['CAPACITY'], len(largest)), max(FEED['NAMES_BYTES'], names_bytes)
+
+
+def _block_size(capacity: int, frames: int, names_bytes: int) -> int:
+    return HEADER_DTYPE.itemsize + names_bytes + frames * frame_dtype(capacity).itemsize
+
+
+class _Block:
+    """Typed numpy views over a shared-memory block."""
+
+    def __init__(self, shm: shared_memory.SharedMemory):
+        self.shm = shm
+        self.header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+        names_offset = HEADER_DTYPE.itemsize
+        self.names = np.ndarray((int(self.header['names_bytes']),), np.uint8, buffer=shm.buf, offset=names_offset)
+        self.frames = np.ndarray(
+            (int(self.header['frames']),), frame_dtype(int(self.header['capacity'])),
+            buffer=shm.buf, offset=names_offset + int(self.header['names_bytes'])
+        )
+
+    def release(self) -> None:
+        # Views must be dropped before the buffer can be closed
+        del self.header, self.names, self.frames
+        self.shm.close()
+
+
+class FeedWriter:
+    """Publishing side, owned by MainWindow."""
+
+    def __init__(self, block: _Block):
+        self._block = block
+        self._names = None
+        self._names_truncated = False
+        self._frame_seq = 0
+        self.name = block.shm.name
+
+    @classmethod
+    def create(cls, participant_id: str, capacity: int = FEED['CAPACITY'], frames: int = FEED['FRAMES'],
+               names_bytes: int = FEED['NAMES_BYTES']) -> 'FeedWriter':
+        """Create the block in the first free slot."""
+        size = _block_size(capacity, frames, names_bytes)
+        for slot in range(FEED['MAX_SESSIONS']):
+            try:
+                shm = shared_memory.SharedMemory(slot_name(slot), create=True, size=size)
+            except FileExistsError:
+                continue
+            header = np.ndarray((), HEADER_DTYPE, buffer=shm.buf)
+            header['capacity'] = capacity
+            header['frames'] = frames
+            header['names_bytes'] = names_bytes
+            header['head'] = 0
+            header['pid'] = os.getpid()
+            header['participant_id'] = str(participant_id).encode()[:64]
+            header['heartbeat'] = time.time()
+            header['magic'] = MAGIC  # Last, readers ignore blocks without it
+            del header
+            return cls(_Block(shm))
+        raise RuntimeError(f"No free feed slot among {FEED['MAX_SESSIONS']}")
+
+    def publish(self, model, trial: int, max_trials: int, stack_words: List[str],
+                view_size: Optional[Tuple[int, int]] = None) -> None:
+        """
+        Write the current state of an ArrangementModel as the newest frame.
+
+        Args:
+            view_size: Actual canvas size in pixels, defaults to the model's
+        """
+        block = self._block
+        names = (list(model.words), list(stack_words))
+        if names != self._names:
+            self._write_names(names)
+
+        capacity = int(block.header['capacity'])
+        n = min(len(model), capacity)
+        flags = (WORDS_TRUNCATED if len(model) > capacity else 0) | (NAMES_TRUNCATED if self._names_truncated else 0)
+        index = (int(block.header['head']) + 1) % block.frames.shape[0]
+        frame = block.frames[index]
+        self._frame_seq += 2
+        frame['seq'] = self._frame_seq - 1  # Odd: being written
+        frame['names_seq'] = block.header['names_seq']
+        frame['trial'] = trial
+        frame['max_trials'] = max_trials
+        frame['n_words'] = n
+        frame['n_stack'] = len(stack_words)
+        frame['n_total'] = len(model)
+        frame['flags'] = flags
+        frame['time'] = time.time()
+        frame['scale'] = model.scale_factor
+        frame['offset_x'] = model.offset_x
+        frame['offset_y'] = model.offset_y
+        frame['view_width'], frame['view_height'] = view_size or (model.width, model.height)
+        frame['x'][:n] = model.xs[:n]
+        frame['y'][:n] = model.ys[:n]
+        frame['highlighted'][:n] = model.highlighted[:n]
+        frame['seq'] = self._frame_seq
+        block.header['head'] = index
+        block.header['heartbeat'] = frame['time']
+
+    def _write_names(self, names) -> None:
+        block = self._block
+        limit = block.names.shape[0]
+        data = json.dumps({'canvas': names[0], 'stack': names[1]}).encode()
+        self._names_truncated = len(data) > limit
+        if self._names_truncated:
+            # Drop stack words first, then the last canvas words: never cut the JSON itself
+            kept_low, kept_high = 0, len(names[0])
+            while kept_low < kept_high:
+                middle = (kept_low + kept_high + 1) // 2
+                if len(json.dumps({'canvas': names[0][:middle], 'stack': []}).encode()) <= limit:
+                    kept_low = middle
+                else:
+                    kept_high = middle - 1
+            data = json.dumps({'canvas': names[0][:kept_low], 'stack': []}).encode()
+        seq = int(block.header['names_seq'])
+        block.header['names_seq'] = seq + 1  # Odd: being written
+        block.names[:len(data)] = np.frombuffer(data, dtype=np.uint8)
+        block.header['names_len'] = len(data)
+        block.header['names_seq'] = seq + 2
+        self._names = names
+
+    def close(self) -> None:
+        """Remove the block; the dashboard drops the session on its next scan."""
+        shm = self._block.shm
+        self._block.header['magic'] = b''
+        self._block.release()
+        shm.unlink()
+
+
+class FeedReader:
+    """Dashboard side, attached to one slot."""
+
+    def __init__(self, block: _Block):
+        self._block = block
+        self._names_seq = None
+        self._names = {'canvas': [], 'stack': []}
+        self.name = block.shm.name
+        self.participant_id = block.header['participant_id'].item().decode()
+        self.pid = int(block.header['pid'])
+
+    @classmethod
+    def attach(cls, slot: int) -> Optional['FeedReader']:
+        """Attach to a slot, or None if nothing is publishing there."""
+        try:
+            shm = shared_memory.SharedMemory(slot_name(slot))
+        except FileNotFoundError:
+            return None
+        if os.name == 'posix':
+            # Attaching registers the block with this process's resource tracker,
+            # which would unlink it under the writer when the dashboard exits
+            resource_tracker.unregister(shm._name, 'shared_memory')
+        if shm.size < HEADER_DTYPE.itemsize or bytes(shm.buf[:len(MAGIC)]) != MAGIC:
+            shm.close()
+            return None
+        return cls(_Block(shm))
+
+    @property
+    def alive(self) -> bool:
+        header = self._block.header
+        return (header['magic'].item() == MAGIC
+                and time.time() - float(header['heartbeat']) < FEED['STALE_AFTER_S'])
+
+    def read(self, retries: int = 5) -> Optional[dict]:
+        """Consistent copy of the newest frame with its word names, or None."""
+        block = self._block
+        for _ in range(retries):
+            frame = block.frames[int(block.header['head'])]
+            seq = int(frame['seq'])
+            if seq == 0 or seq % 2:
+                continue
+            snapshot = frame.copy()
+            if int(frame['seq']) != seq:
+                continue
+            names = self._read_names(int(snapshot['names_seq']))
+            if names is None:
+                continue
+            n = int(snapshot['n_words'])
+            words = names['canvas'][:n]
+            return {
+                'participant_id': self.participant_id,
+                'trial': int(snapshot['trial']),
+                'max_trials': int(snapshot['max_trials']),
+                'time': float(snapshot['time']),
+                'scale': float(snapshot['scale']),
+                'offset_x': float(snapshot['offset_x']),
+                'offset_y': float(snapshot['offset_y']),
+                'view_width': float(snapshot['view_width']),
+                'view_height': float(snapshot['view_height']),
+                'words': words + [''] * (n - len(words)),
+                'stack': names['stack'],
+                'n_total': int(snapshot['n_total']),
+                'n_stack': int(snapshot['n_stack']),
+                'truncated': bool(snapshot['flags']),
+                'x': snapshot['x'][:n],
+                'y': snapshot['y'][:n],
+                'highlighted': snapshot['highlighted'][:n].astype(bool)
+            }
+        return None
+
+    def _read_names(self, wanted_seq: int) -> Optional[dict]:
+        if self._names_seq == wanted_seq:
+            return self._names
+        header = self._block.header
+        seq = int(header['names_seq'])
+        if seq != wanted_seq or seq % 2:
+            # The names changed since the frame was written, the next frame will match
+            return None
+        data = self._block.names[:int(header['names_len'])].tobytes()
+        if int(header['names_seq']) != seq:
+            return None
+        try:
+            names = json.loads(data)
+        except ValueError:
+            return None
+        self._names = names
+        self._names_seq = seq
+        return self._names
+
+    def close(self) -> None:
+        self._block.release()
+
+
+def attach_all(known: Optional[dict] = None) -> dict:
+    """Map slot -> FeedReader for every live session, reusing known readers."""
+    known = dict(known or {})
+    for slot in range(FEED['MAX_SESSIONS']):
+        reader = known.get(slot)
+        if reader is not None and not reader.alive:
+            reader.close()
+            del known[slot]
+            reader = None
+        if reader is None:
+            reader = FeedReader.attach(slot)
+            if reader is not None and reader.alive:
+                known[slot] = reader
+            elif reader is not None:
+                reader.close()
+    return known
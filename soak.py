@@ -0,0 +1,162 @@
+"""
+Per-trial memory soak profiling.
+
+Lab stations stay open for a whole day of participants, so small per-trial
+leaks only show up late, as a slower canvas. With SOAK['ENABLED'] (or
+`python main.py --soak`) the experiment window takes a tracemalloc snapshot and
+counts Tk widgets, canvas items and registered Tcl commands every time it is
+reset for the next trial. Each checkpoint is compared with the previous one and
+the allocation sites that grew most are written to soak.json next to log.json.
+Tcl commands are the ones to watch for Tk leaks: every Python callback bound
+with bind/tag_bind is one, and it is only released with its widget or an
+explicit unbind, not when a canvas item is deleted.
+A resumed session starts a new process with a new baseline, so the reports of
+its earlier runs are kept under `previous_runs` instead of being overwritten.
+"""
+import datetime
+import json
+import logging
+import os
+import tkinter as tk
+import tracemalloc
+from typing import Dict, List, Optional
+
+from settings import SOAK
+
+logger = logging.getLogger(__name__)
+
+# Allocation made by the profiler itself or the import machinery
+IGNORED_FILES = (tracemalloc.__file__, '<frozen importlib._bootstrap>', '<frozen importlib._bootstrap_external>')
+
+
+def count_tk_objects(root: tk.Misc) -> Dict[str, int]:
+    """Widgets, canvas items and Tcl commands currently alive under root."""
+    widgets = 0
+    canvas_items = 0
+    pending = [root]
+    while pending:
+        widget = pending.pop()
+        widgets += 1
+        if isinstance(widget, tk.Canvas):
+            canvas_items += len(widget.find_all())
+        pending.extend(widget.winfo_children())
+    return {
+        'widgets': widgets,
+        'canvas_items': canvas_items,
+        'tcl_commands': len(root.tk.splitlist(root.tk.call('info', 'commands')))
+    }
+
+
+class SoakProfiler:
+    """Snapshots memory and Tk objects at each trial boundary and reports the growth."""
+
+    def __init__(self, root: tk.Misc, participant_id=None, frames: int = SOAK['FRAMES'],
+                 top: int = SOAK['TOP_SITES'], previous_runs: Optional[List[dict]] = None):
+        self.root = root
+        self.participant_id = participant_id
+        # Reports of earlier runs of a resumed session, oldest first
+        self.previous_runs = previous_runs or []
+        self.top = top
+        self.started = datetime.datetime.now().isoformat()
+        if not tracemalloc.is_tracing():
+            tracemalloc.start(frames)
+        self._filters = [tracemalloc.Filter(False, filename) for filename in IGNORED_FILES]
+        self._snapshot = self._take_snapshot()
+        self._counts = count_tk_objects(root)
+        self.baseline = dict(self._counts, traced_bytes=tracemalloc.get_traced_memory()[0])
+        self.checkpoints: List[dict] = []
+
+    def _take_snapshot(self) -> tracemalloc.Snapshot:
+        return tracemalloc.take_snapshot().filter_traces(self._filters)
+
+    def checkpoint(self, trial_number: int) -> dict:
+        """Compare memory and Tk objects with the previous checkpoint."""
+        snapshot = self._take_snapshot()
+        counts = count_tk_objects(self.root)
+        current, peak = tracemalloc.get_traced_memory()
+
+        stats = snapshot.compare_to(self._snapshot, 'traceback')
+        top_sites = [{
+            'size_diff': stat.size_diff,
+            'count_diff': stat.count_diff,
+            'size': stat.size,
+            'traceback': [f"{frame.filename}:{frame.lineno}" for frame in stat.traceback]
+        } for stat in stats[:self.top] if stat.size_diff > 0]
+
+        checkpoint = {
+            'trial_number': trial_number,
+            'time': datetime.datetime.now().isoformat(),
+            'traced_bytes': current,
+            'peak_bytes': peak,
+            'counts': counts,
+            'growth': {key: counts[key] - self._counts[key] for key in counts},
+            'top_sites': top_sites
+        }
+        self.checkpoints.append(checkpoint)
+        self._snapshot = snapshot
+        self._counts = counts
+        tracemalloc.reset_peak()
+        return checkpoint
+
+    def report(self) -> dict:
+        last = self.checkpoints[-1] if self.checkpoints else None
+        return {
+            'participant_id': self.participant_id,
+            'started': self.started,
+            'baseline': self.baseline,
+            'total_growth': None if last is None else {
+                'traced_bytes': last['traced_bytes'] - self.baseline['traced_bytes'],
+                **{key: last['counts'][key] - self.baseline[key] for key in last['counts']}
+            },
+            'checkpoints': self.checkpoints,
+            'previous_runs': self.previous_runs
+        }
+
+    def export(self, path: str) -> None:
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, indent=2)
+
+    def stop(self) -> None:
+        """Stop tracing; the report already written stays valid."""
+        if tracemalloc.is_tracing():
+            tracemalloc.stop()
+
+
+def load_previous_runs(path: str) -> List[dict]:
+    """The runs already in a soak report, oldest first, for a resumed session to keep."""
+    try:
+        with open(path, 'r', encoding='utf-8') as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read the earlier soak report %s, starting a new one: %s", path, e)
+        return []
+    runs = report.pop('previous_runs', [])
+    return runs + [report]
+
+
+def summarize(path: str) -> str:
+    """One line per trial: traced memory and Tk object growth, run by run."""
+    with open(path, 'r', encoding='utf-8') as f:
+        report = json.load(f)
+    lines = [f"{'trial':>5} {'traced MB':>10} {'widgets':>8} {'items':>8} {'commands':>9}"]
+    for run in report.get('previous_runs', []) + [report]:
+        lines.append(f"run started {run['started']}")
+        for checkpoint in run['checkpoints']:
+            growth = checkpoint['growth']
+            lines.append(f"{checkpoint['trial_number']:>5} {checkpoint['traced_bytes'] / 1e6:>10.2f} "
+                         f"{growth['widgets']:>+8} {growth['canvas_items']:>+8} {growth['tcl_commands']:>+9}")
+    return '\n'.join(lines)
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="Summarize a soak-profiling report")
+    parser.add_argument('report', help=f"Path to a participant's {SOAK['OUTPUT_FILENAME']}")
+    args = parser.parse_args()
+    print(summarize(args.report))
@@ -1,25 +1,119 @@
 import tkinter as tk
+from settings import STACK
 
-class StackWord:
+
+class VirtualWordStack(tk.Frame):
     """
-    A class representing a word in the stack (left sidebar) of the GUI. 
+    Scrollable word stack that only creates widgets for the visible rows.
+
+    A filter entry on top narrows the list as the participant types. The rows
+    are a small pool of labels that is relabelled while scrolling, so the
+    sidebar costs the same for 10 words or 500.
     """
-    def __init__(self, container, word, on_select, bg="gray", fg="white"):
-        self.container = container
-        self.word = word
+    def __init__(self, container, on_select, bg=STACK['COLORS']['PANEL_BG']):
+        super().__init__(container, bg=bg)
         self.on_select = on_select
+        self.words = []
+        self.visible = []
+        self.rows = []
+        self.row_height = STACK['ROW_HEIGHT']
+        self._top = 0  # Scroll position in pixels
+
+        self.filter_text = tk.StringVar()
+        self.filter_text.trace_add('write', lambda *args: self._apply_filter())
+        self.filter_entry = tk.Entry(self, textvariable=self.filter_text, font=STACK['FONT'])
+        self.filter_entry.pack(side=tk.TOP, fill=tk.X, pady=(0, STACK['ROW_GAP']))
+        # Without the toplevel tag, typing here does not reach the window's keys:
+        # arrows move the cursor instead of panning, Ctrl+Z does not undo the arrangement
+        self.filter_entry.bindtags((str(self.filter_entry), 'Entry', 'all'))
+
+        self.scrollbar = tk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        self.body = tk.Frame(self, bg=bg)
+        self.body.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
+        self.body.bind("<Configure>", lambda event: self._build_rows())
+        self.body.bind("<MouseWheel>", self._on_mouse_wheel)
+
+    def __len__(self):
+        return len(self.words)
+
+    def set_words(self, words):
+        """Replace the stack content and clear the filter."""
+        self.words = list(words)
+        self._top = 0
+        self.filter_text.set('')  # Also refreshes the rows
+
+    def append(self, word):
+        self.words.append(word)
+        self._apply_filter()
+
+    def remove(self, word):
+        if word in self.words:
+            self.words.remove(word)
+            self._apply_filter()
+
+    def _apply_filter(self):
+        text = self.filter_text.get().strip().lower()
+        self.visible = [w for w in self.words if text in w.lower()] if text else list(self.words)
+        self._scroll_to(self._top)
+
+    def _build_rows(self):
+        """Create just enough labels to cover the visible height."""
+        needed = self.body.winfo_height() // self.row_height + 2
+        while len(self.rows) < needed:
+            row = tk.Label(self.body, bg=STACK['COLORS']['BG'], fg=STACK['COLORS']['FG'],
+                           font=STACK['FONT'], cursor="hand2")
+            index = len(self.rows)
+            row.bind("<ButtonRelease-1>", lambda event, i=index: self._on_click(i))
+            row.bind("<MouseWheel>", self._on_mouse_wheel)
+            self.rows.append(row)
+        self._scroll_to(self._top)
+
+    def _scroll_to(self, top):
+        height = self.body.winfo_height()
+        total = len(self.visible) * self.row_height
+        self._top = max(0, min(top, total - height))
+        first = self._top // self.row_height
+        shift = first * self.row_height - self._top
+        gap = STACK['ROW_GAP']
+        for i, row in enumerate(self.rows):
+            index = first + i
+            if index < len(self.visible):
+                if row.cget('text') != self.visible[index]:
+                    row.config(text=self.visible[index])
+                row.place(x=0, y=shift + i * self.row_height, relwidth=1, height=self.row_height - gap)
+            else:
+                row.place_forget()
+        if total > 0:
+            self.scrollbar.set(self._top / total, min(1.0, (self._top + height) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
 
-        self.frame = tk.Frame(container, bg=bg, padx=5, pady=5, cursor="hand2")
-        self.frame.pack(side=tk.TOP, fill=tk.X, pady=5)
+    def yview(self, *args):
+        """Scrollbar protocol: 'moveto fraction' or 'scroll n units|pages'."""
+        if args[0] == 'moveto':
+            self._scroll_to(int(float(args[1]) * len(self.visible) * self.row_height))
+        elif args[0] == 'scroll':
+            step = self.row_height if args[2] == 'units' else self.body.winfo_height()
+            self._scroll_to(self._top + int(args[1]) * step)
 
-        self.label = tk.Label(self.frame, text=word, bg=bg, fg=fg, font=("Arial", 10, "bold"))
-        self.label.pack(pady=3, fill=tk.X)
+    def _on_mouse_wheel(self, event):
+        # One row per notch; only the sign is portable (Windows sends ±120, macOS ±1)
+        step = -1 if event.delta > 0 else 1
+        self._scroll_to(self._top + step * self.row_height)
 
-        self.frame.bind("<ButtonRelease-1>", self.on_click)
-        self.label.bind("<ButtonRelease-1>", self.on_click)
+    def row_word(self, row_index):
+        """The word currently shown in a pool row, None if the row is empty."""
+        index = self._top // self.row_height + row_index
+        return self.visible[index] if index < len(self.visible) else None
 
-    def on_click(self, event):
-        """Handle click event on the word in the stack: remove the word and 
-        add it to the canvas."""
-        self.on_select(self.word)
-        self.frame.destroy()
+    def _on_click(self, row_index):
+        """Remove the clicked word from the stack and add it to the canvas."""
+        word = self.row_word(row_index)
+        if word is None:
+            return
+        self.words.remove(word)
+        self._apply_filter()
+        # Give the keyboard back to the window, for arrow-key panning
+        self.winfo_toplevel().focus_set()
+        self.on_select(word)
@@ -0,0 +1,63 @@
+"""
+Startup profiling: import and first-paint time of the entry window.
+
+main.py records marks while it starts; with --profile-startup the report is
+printed (and optionally saved as JSON) once the entry window has been drawn.
+bench_startup.py runs this repeatedly to track time-to-interactive.
+"""
+import json
+import sys
+import time
+from typing import Dict, List
+
+from settings import STARTUP_PROFILE
+
+
+class StartupProfile:
+    """Named perf_counter marks relative to the start of the process."""
+
+    def __init__(self, start: float):
+        """
+        Args:
+            start: time.perf_counter() taken as early as possible in main.py
+        """
+        self.start = start
+        self.marks: Dict[str, float] = {}
+
+    def mark(self, name: str) -> None:
+        self.marks[name] = (time.perf_counter() - self.start) * 1000
+
+    def loaded_deferred_modules(self) -> List[str]:
+        """Modules that should load lazily but were already imported."""
+        return [name for name in STARTUP_PROFILE['DEFERRED_MODULES'] if name in sys.modules]
+
+    def report(self) -> dict:
+        return {
+            'marks_ms': self.marks,
+            'time_to_interactive_ms': self.marks.get('first_paint'),
+            'modules_loaded': len(sys.modules),
+            'deferred_modules_loaded': self.loaded_deferred_modules()
+        }
+
+    def print_report(self) -> None:
+        report = self.report()
+        print("Startup profile (ms since process start):")
+        for name, ms in report['marks_ms'].items():
+            print(f"  {name:<20}{ms:>10.1f}")
+        print(f"  modules loaded: {report['modules_loaded']}")
+        if report['deferred_modules_loaded']:
+            print(f"  WARNING eagerly imported: {', '.join(report['deferred_modules_loaded'])}")
+
+    def save(self, filepath: str) -> None:
+        with open(filepath, 'w') as f:
+            json.dump(self.report(), f, indent=2)
+
+
+def on_first_paint(window, callback) -> None:
+    """Call callback() once window is mapped and its pending redraws have run."""
+    def on_map(event):
+        if event.widget is window:
+            window.unbind('<Map>', bind_id)
+            window.after_idle(callback)
+
+    bind_id = window.bind('<Map>', on_map, add='+')
@@ -0,0 +1,226 @@
+"""
+Optional SQLite storage backend for sessions, trials and coordinates.
+
+When STORAGE['BACKEND'] is 'sqlite', TrialManager.save_trial_data and the
+session_manager log functions also write to one database per lab (WAL mode, one
+transaction per trial), which makes cross-participant queries indexed SQL. The
+per-participant log.json and results CSV are still written for compatibility and
+can be regenerated from the database with the export functions.
+
+Usage:
+    python storage.py export P001 [--output data/P001/db_export] [--force]
+    python storage.py query "SELECT word, AVG(x_coord) FROM coordinates GROUP BY word"
+"""
+import argparse
+import csv
+import datetime
+import json
+import os
+import sqlite3
+import threading
+from typing import Iterable, List, Optional
+
+from settings import STORAGE, TRIAL_MANAGER
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS sessions (
+    participant_id    TEXT PRIMARY KEY,
+    experimenter      TEXT,
+    wordlist_file     TEXT,
+    start_time        TEXT,
+    interruption_time TEXT,
+    resume_time       TEXT,
+    end_time          TEXT,
+    interruption_type TEXT,
+    current_trial     INTEGER,
+    interrupted       INTEGER,
+    notes             TEXT,
+    data              TEXT NOT NULL  -- full log.json document
+);
+CREATE TABLE IF NOT EXISTS trials (
+    participant_id TEXT NOT NULL,
+    trial_number   INTEGER NOT NULL,
+    saved_at       TEXT NOT NULL DEFAULT (strftime('%Y-%m-%dT%H:%M:%f', 'now', 'localtime')),
+    n_words        INTEGER NOT NULL,
+    PRIMARY KEY (participant_id, trial_number)
+);
+CREATE TABLE IF NOT EXISTS coordinates (
+    id             INTEGER PRIMARY KEY,
+    participant_id TEXT NOT NULL,
+    trial_number   INTEGER NOT NULL,
+    word           TEXT NOT NULL,
+    x_coord        REAL NOT NULL,
+    y_coord        REAL NOT NULL,
+    highlighted    INTEGER NOT NULL,
+    FOREIGN KEY (participant_id, trial_number)
+        REFERENCES trials (participant_id, trial_number) ON DELETE CASCADE
+);
+CREATE INDEX IF NOT EXISTS idx_coordinates_trial ON coordinates (participant_id, trial_number);
+CREATE INDEX IF NOT EXISTS idx_coordinates_word ON coordinates (word, trial_number);
+"""
+
+SESSION_COLUMNS = ('participant_id', 'experimenter', 'wordlist_file', 'start_time', 'interruption_time',
+                   'resume_time', 'end_time', 'interruption_type', 'current_trial', 'interrupted', 'notes')
+
+
+class SQLiteStore:
+    """Sessions, trials and word coordinates of a whole cohort in one database."""
+
+    def __init__(self, path: str = STORAGE['SQLITE_PATH']):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        # One connection shared by the Tk thread, collector and web worker threads:
+        # a transaction on it must not interleave with another thread's statements
+        self._lock = threading.RLock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.row_factory = sqlite3.Row
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")  # Durable at WAL checkpoints, safe in WAL mode
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+
+    def close(self) -> None:
+        with self._lock:
+            self.conn.close()
+
+    def save_session(self, session_data: dict) -> None:
+        """Insert or update a session from its log.json dictionary."""
+        with self._lock, self.conn:
+            self._upsert_session(session_data)
+
+    def save_trial(self, participant_id: str, trial_number: int, rows: Iterable[dict]) -> None:
+        """Replace one trial's coordinates in a single transaction."""
+        with self._lock, self.conn:
+            self._replace_trial(participant_id, trial_number, rows)
+
+    def save_batch(self, sessions: Iterable[dict] = (), trials: Iterable[tuple] = ()) -> None:
+        """
+        Write many sessions and trials in one transaction.
+
+        Args:
+            sessions: log.json dictionaries
+            trials: (participant_id, trial_number, rows) tuples
+        """
+        with self._lock, self.conn:
+            for session_data in sessions:
+                self._upsert_session(session_data)
+            for participant_id, trial_number, rows in trials:
+                self._replace_trial(participant_id, trial_number, rows)
+
+    def _upsert_session(self, session_data: dict) -> None:
+        values = [session_data.get(col) for col in SESSION_COLUMNS]
+        values[SESSION_COLUMNS.index('interrupted')] = int(bool(session_data.get('interrupted')))
+        placeholders = ', '.join('?' * (len(SESSION_COLUMNS) + 1))
+        updates = ', '.join(f"{col} = excluded.{col}" for col in SESSION_COLUMNS[1:] + ('data',))
+        self.conn.execute(
+            f"INSERT INTO sessions ({', '.join(SESSION_COLUMNS)}, data) VALUES ({placeholders}) "
+            f"ON CONFLICT (participant_id) DO UPDATE SET {updates}",
+            values + [json.dumps(session_data)]
+        )
+
+    def _replace_trial(self, participant_id: str, trial_number: int, rows: Iterable[dict]) -> None:
+        rows = list(rows)
+        # Saving a trial again (e.g. after recovery) replaces it, coordinates cascade
+        self.conn.execute("DELETE FROM trials WHERE participant_id = ? AND trial_number = ?",
+                          (participant_id, trial_number))
+        self.conn.execute("INSERT INTO trials (participant_id, trial_number, n_words) VALUES (?, ?, ?)",
+                          (participant_id, trial_number, len(rows)))
+        self.conn.executemany(
+            "INSERT INTO coordinates (participant_id, trial_number, word, x_coord, y_coord, highlighted) "
+            "VALUES (?, ?, ?, ?, ?, ?)",
+            [(participant_id, row['trial_number'], row['word'], row['x_coord'], row['y_coord'],
+              int(bool(row['highlighted']))) for row in rows]
+        )
+
+    def query(self, sql: str, params: tuple = ()) -> List[sqlite3.Row]:
+        with self._lock:
+            return self.conn.execute(sql, params).fetchall()
+
+    def trial_results(self, participant_id: str) -> List[dict]:
+        """Rows in the same format TrialManager writes to CSV."""
+        return [
+            {
+                'trial_number': row['trial_number'],
+                'word': row['word'],
+                'x_coord': row['x_coord'],
+                'y_coord': row['y_coord'],
+                'highlighted': bool(row['highlighted'])
+            }
+            for row in self.query(
+                "SELECT trial_number, word, x_coord, y_coord, highlighted FROM coordinates "
+                "WHERE participant_id = ? ORDER BY trial_number, id", (participant_id,)
+            )
+        ]
+
+    def session_data(self, participant_id: str) -> Optional[dict]:
+        rows = self.query("SELECT data FROM sessions WHERE participant_id = ?", (participant_id,))
+        return json.loads(rows[0]['data']) if rows else None
+
+    def export_csv(self, participant_id: str, filepath: str) -> str:
+        """Write a participant's results as a CSV identical in layout to TrialManager's."""
+        with open(filepath, 'w', newline='') as csvfile:
+            writer = csv.DictWriter(csvfile, fieldnames=TRIAL_MANAGER['CSV_FIELDS'])
+            writer.writeheader()
+            writer.writerows(self.trial_results(participant_id))
+        return filepath
+
+    def export_session_json(self, participant_id: str, filepath: str) -> Optional[str]:
+        """Write a participant's session log in the log.json format."""
+        data = self.session_data(participant_id)
+        if data is None:
+            return None
+        with open(filepath, 'w') as f:
+            json.dump(data, f, indent=2)
+        return filepath
+
+
+_store: Optional[SQLiteStore] = None
+_store_lock = threading.Lock()
+
+
+def get_store() -> Optional[SQLiteStore]:
+    """The process-wide store when the SQLite backend is enabled, else None."""
+    global _store
+    if STORAGE['BACKEND'] != 'sqlite':
+        return None
+    if _store is None:
+        with _store_lock:
+            if _store is None:
+                _store = SQLiteStore(STORAGE['SQLITE_PATH'])
+    return _store
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Query or export the SQLite results database")
+    parser.add_argument('--database', default=STORAGE['SQLITE_PATH'])
+    commands = parser.add_subparsers(dest='command', required=True)
+    export_cmd = commands.add_parser('export', help="Write results CSV and log.json for a participant")
+    export_cmd.add_argument('participant_id')
+    export_cmd.add_argument('--output', default=None,
+                            help=f"Output folder (default: data/<participant>/{STORAGE['EXPORT_DIRECTORY']})")
+    export_cmd.add_argument('--force', action='store_true', help="Overwrite an existing log.json in the output folder")
+    query_cmd = commands.add_parser('query', help="Run a read-only SQL query")
+    query_cmd.add_argument('sql')
+    args = parser.parse_args()
+
+    store = SQLiteStore(args.database)
+    if args.command == 'export':
+        # Not the participant folder itself: analyses pick the newest results CSV there,
+        # and session recovery reads its log.json
+        output = args.output or os.path.join(TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'], args.participant_id,
+                                             STORAGE['EXPORT_DIRECTORY'])
+        log_path = os.path.join(output, 'log.json')
+        if os.path.exists(log_path) and not args.force:
+            parser.error(f"{log_path} exists, use --force to overwrite it")
+        os.makedirs(output, exist_ok=True)
+        timestamp = datetime.datetime.now().strftime(TRIAL_MANAGER['TIMESTAMP_FORMAT'])
+        print(store.export_csv(args.participant_id, os.path.join(
+            output, TRIAL_MANAGER['PATHS']['RESULTS_FILENAME_TEMPLATE'].format(timestamp=timestamp))))
+        print(store.export_session_json(args.participant_id, log_path))
+    else:
+        store.query("PRAGMA query_only=ON")
+        for row in store.query(args.sql):
+            print('\t'.join(str(value) for value in tuple(row)))
+    store.close()
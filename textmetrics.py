@@ -0,0 +1,86 @@
+"""
+Cached text measurement for word ovals.
+
+Measuring text needs a Tk font and a round trip to Tk, and the result only
+depends on the font, the text and the display, so every (font, text) is
+measured once and kept: in memory for the session and in a JSON file (keyed by
+font, Tk scaling and windowing system) for the next sessions on this machine.
+oval_size turns the text extent into the smallest oval that contains it; the
+rule itself (oval_around) needs no Tk, so render.py draws the same ovals.
+"""
+import json
+import math
+import os
+import tkinter as tk
+import tkinter.font as tkfont
+from typing import Dict, Tuple
+
+from settings import TEXT_METRICS
+
+
+def oval_around(text_width: float, linespace: float, min_width: int, min_height: int) -> Tuple[int, int]:
+    """The smallest oval, at least min_width x min_height, around a text extent and its padding."""
+    padding = TEXT_METRICS['PADDING']
+    # An ellipse through the corners of a w x h box has axes sqrt(2) * (w, h)
+    width = math.ceil((text_width + 2 * padding) * math.sqrt(2))
+    height = math.ceil((linespace + 2 * padding) * math.sqrt(2))
+    return max(width, min_width), max(height, min_height)
+
+
+class TextMetrics:
+    """Text widths of one font, measured once per text."""
+
+    def __init__(self, widget: tk.Misc, font: tuple, path: str = TEXT_METRICS['CACHE_PATH']):
+        self.font = tkfont.Font(widget, font=font)
+        self.linespace = self.font.metrics('linespace')
+        self.path = path
+        self.key = json.dumps([list(font), float(widget.tk.call('tk', 'scaling')),
+                               widget.tk.call('tk', 'windowingsystem')])
+        self._widths: Dict[str, int] = self._load().get(self.key, {})
+        self._dirty = False
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, 'r', encoding='utf-8') as f:
+                return json.load(f)
+        except (FileNotFoundError, ValueError, OSError):
+            return {}
+
+    def width(self, text: str) -> int:
+        """Pixel width of text in this font."""
+        width = self._widths.get(text)
+        if width is None:
+            width = self._widths[text] = self.font.measure(text)
+            self._dirty = True
+        return width
+
+    def oval_size(self, text: str, min_width: int, min_height: int) -> Tuple[int, int]:
+        """The smallest oval, at least min_width x min_height, around the text and its padding."""
+        return oval_around(self.width(text), self.linespace, min_width, min_height)
+
+    def save(self) -> None:
+        """Write new measurements to the cache file."""
+        if not self._dirty:
+            return
+        cache = self._load()
+        cache[self.key] = self._widths
+        directory = os.path.dirname(self.path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, 'w', encoding='utf-8') as f:
+            json.dump(cache, f, ensure_ascii=False)
+        # Atomic rename so a concurrent session never reads a partial file
+        os.replace(tmp_path, self.path)
+        self._dirty = False
+
+
+_metrics: Dict[tuple, TextMetrics] = {}
+
+
+def get_metrics(widget: tk.Misc, font: tuple) -> TextMetrics:
+    """The shared TextMetrics of a font, so trials reuse each other's measurements."""
+    metrics = _metrics.get(font)
+    if metrics is None:
+        metrics = _metrics[font] = TextMetrics(widget, font)
+    return metrics
@@ -0,0 +1,162 @@
+"""
+Monotonic timing of participant behaviour and event-loop jitter.
+
+SessionTimer stamps trial start/end, stack clicks and the first touch of every
+word with time.perf_counter_ns, which unlike datetime.now() never jumps with
+clock adjustments. EventLoopLagMonitor measures how late Tk fires scheduled
+`after` callbacks, which bounds how much event delivery delays those stamps.
+Both end up in a per-session timing report used to exclude jittery sessions.
+Monotonic clocks restart with the process, so when a session is resumed the
+runs before it are kept whole under `previous_runs`, each with its own anchor.
+"""
+import datetime
+import json
+import logging
+import os
+import time
+from typing import Dict, List, Optional
+
+from instrumentation import LatencyHistogram
+from settings import TIMING
+
+logger = logging.getLogger(__name__)
+
+
+class EventLoopLagMonitor:
+    """Schedules periodic `after` callbacks and records how late they fire."""
+
+    def __init__(self, widget, interval_ms: int = TIMING['LAG_PROBE_INTERVAL_MS']):
+        self.widget = widget
+        self.interval_ms = interval_ms
+        self.session = LatencyHistogram()
+        self.trial = LatencyHistogram()
+        self._expected_ns: Optional[int] = None
+        self._after_id = None
+
+    def start(self) -> None:
+        if self._after_id is None:
+            self._schedule()
+
+    def stop(self) -> None:
+        if self._after_id is not None:
+            self.widget.after_cancel(self._after_id)
+            self._after_id = None
+
+    def _schedule(self) -> None:
+        self._expected_ns = time.perf_counter_ns() + self.interval_ms * 1_000_000
+        self._after_id = self.widget.after(self.interval_ms, self._on_fire)
+
+    def _on_fire(self) -> None:
+        lag_ms = max(0, time.perf_counter_ns() - self._expected_ns) / 1e6
+        self.session.record(lag_ms)
+        self.trial.record(lag_ms)
+        self._schedule()
+
+    def take_trial(self) -> LatencyHistogram:
+        """Return the lag histogram of the trial just finished and start a new one."""
+        trial, self.trial = self.trial, LatencyHistogram()
+        return trial
+
+
+class SessionTimer:
+    """Monotonic timestamps of one session, reported relative to the session start."""
+
+    def __init__(self, participant_id=None, previous_runs: Optional[List[dict]] = None):
+        self.participant_id = participant_id
+        # Reports of earlier runs of a resumed session, oldest first
+        self.previous_runs = previous_runs or []
+        # Anchor pair so monotonic times can be mapped back to wall-clock time
+        self.anchor_wall = datetime.datetime.now().isoformat()
+        self.anchor_ns = time.perf_counter_ns()
+        self.trials: Dict[str, dict] = {}
+        self._current: Optional[dict] = None
+
+    def _ms(self, ns: int) -> float:
+        return (ns - self.anchor_ns) / 1e6
+
+    def trial_started(self, trial_number: int) -> None:
+        self._current = {
+            'trial_number': trial_number,
+            'start_ms': self._ms(time.perf_counter_ns()),
+            'end_ms': None,
+            'duration_ms': None,
+            'stack_clicks': [],
+            'words': {}
+        }
+        self.trials[str(trial_number)] = self._current
+
+    def stack_clicked(self, word: str) -> None:
+        """A word was taken from the stack, which is also when it enters the canvas."""
+        if self._current is None:
+            return
+        now = self._ms(time.perf_counter_ns())
+        self._current['stack_clicks'].append({'word': word, 't_ms': now})
+        self._current['words'].setdefault(word, {
+            'entered_ms': now, 'first_touch_ms': None, 'time_to_first_touch_ms': None
+        })
+
+    def word_touched(self, word: str) -> None:
+        """Record the first press on a word after it entered the canvas."""
+        if self._current is None:
+            return
+        entry = self._current['words'].get(word)
+        if entry is None or entry['first_touch_ms'] is not None:
+            return
+        now = self._ms(time.perf_counter_ns())
+        entry['first_touch_ms'] = now
+        entry['time_to_first_touch_ms'] = now - entry['entered_ms']
+
+    def trial_ended(self, lag: Optional[LatencyHistogram] = None, end_ns: Optional[int] = None) -> None:
+        """Close the current trial, at end_ns (perf_counter_ns) if given, else now."""
+        if self._current is None:
+            return
+        self._current['end_ms'] = self._ms(end_ns if end_ns is not None else time.perf_counter_ns())
+        self._current['duration_ms'] = self._current['end_ms'] - self._current['start_ms']
+        if lag is not None:
+            self._current['event_loop_lag'] = lag.summary()
+        self._current = None
+
+
+def timing_quality(lag: LatencyHistogram) -> dict:
+    """Judge whether the event loop was responsive enough for timing measures."""
+    p99 = lag.percentile(99)
+    return {
+        'lag_samples': lag.count,
+        'lag_p50_ms': lag.percentile(50),
+        'lag_p99_ms': p99,
+        'lag_max_ms': lag.max,
+        'max_p99_lag_ms': TIMING['MAX_P99_LAG_MS'],
+        'max_lag_ms': TIMING['MAX_LAG_MS'],
+        'acceptable': p99 <= TIMING['MAX_P99_LAG_MS'] and lag.max <= TIMING['MAX_LAG_MS']
+    }
+
+
+def load_previous_runs(filepath: str) -> List[dict]:
+    """The runs already in a timing report, oldest first, for a resumed session to keep."""
+    try:
+        with open(filepath) as f:
+            report = json.load(f)
+    except FileNotFoundError:
+        return []
+    except (OSError, ValueError) as e:
+        logger.warning("Cannot read the earlier timing report %s, starting a new one: %s", filepath, e)
+        return []
+    runs = report.pop('previous_runs', [])
+    return runs + [report]
+
+
+def write_timing_report(filepath: str, timer: SessionTimer, monitor: EventLoopLagMonitor) -> None:
+    """Write the session's timestamps and timing-quality report as JSON."""
+    data = {
+        'participant_id': timer.participant_id,
+        'clock': 'time.perf_counter_ns',
+        'anchor_wall_time': timer.anchor_wall,
+        'lag_probe_interval_ms': monitor.interval_ms,
+        'quality': timing_quality(monitor.session),
+        'trials': timer.trials,
+        'previous_runs': timer.previous_runs
+    }
+    tmp_path = f"{filepath}.tmp"
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, filepath)
@@ -1,16 +1,130 @@
 import csv
-from typing import List
+import json
+from typing import Dict, List, NamedTuple, Optional
 from datetime import datetime
 import os
-from settings import TRIAL_MANAGER, EXPERIMENT
+import numpy as np
+from settings import TRIAL_MANAGER, EXPERIMENT, COLUMNAR
+from storage import get_store
+
+class PlacedWord(NamedTuple):
+    """A word's final placement, for front-ends without DraggableWord objects."""
+    word: str
+    logical_x: float
+    logical_y: float
+    is_highlighted: bool = False
+
+
+class TrialBuffer:
+    """
+    Columnar store of every placement of a session.
+
+    Coordinates and flags live in typed arrays that grow by doubling, and words
+    are interned to integer ids, so a row costs 23 bytes instead of a dict.
+    Rows are only materialized as dicts on request.
+    """
+
+    def __init__(self, capacity: int = TRIAL_MANAGER['BUFFER']['INITIAL_CAPACITY']):
+        self.size = 0
+        self.trial_number = np.empty(capacity, dtype=np.int16)
+        self.word_id = np.empty(capacity, dtype=np.int32)
+        self.x = np.empty(capacity, dtype=np.float64)
+        self.y = np.empty(capacity, dtype=np.float64)
+        self.highlighted = np.empty(capacity, dtype=bool)
+        self.vocabulary: List[str] = []
+        self._ids: Dict[str, int] = {}
+
+    def __len__(self) -> int:
+        return self.size
+
+    def intern(self, word: str) -> int:
+        word_id = self._ids.get(word)
+        if word_id is None:
+            word_id = self._ids[word] = len(self.vocabulary)
+            self.vocabulary.append(word)
+        return word_id
+
+    def _reserve(self, n: int) -> None:
+        needed = self.size + n
+        capacity = len(self.x)
+        if needed <= capacity:
+            return
+        while capacity < needed:
+            capacity = max(capacity * 2, 1)
+        for name in ('trial_number', 'word_id', 'x', 'y', 'highlighted'):
+            old = getattr(self, name)
+            new = np.empty(capacity, dtype=old.dtype)
+            new[:self.size] = old[:self.size]
+            setattr(self, name, new)
+
+    def append(self, trial_number: int, words: List[str], xs: np.ndarray, ys: np.ndarray,
+               highlighted: np.ndarray) -> slice:
+        """Append one trial's columns and return the slice they occupy."""
+        n = len(words)
+        self._reserve(n)
+        rows = slice(self.size, self.size + n)
+        self.trial_number[rows] = trial_number
+        self.word_id[rows] = [self.intern(w) for w in words]
+        self.x[rows] = xs
+        self.y[rows] = ys
+        self.highlighted[rows] = highlighted
+        self.size += n
+        return rows
+
+    def truncate(self, size: int) -> None:
+        """Drop every row from size on; interned words are kept."""
+        self.size = min(self.size, size)
+
+    def columns(self, rows: Optional[slice] = None) -> Dict[str, np.ndarray]:
+        """Typed columns in the layout of columnar.to_columns, with a compact vocabulary."""
+        rows = rows or slice(0, self.size)
+        used, codes = np.unique(self.word_id[rows], return_inverse=True)
+        return {
+            'trial_number': self.trial_number[rows].copy(),
+            'x': self.x[rows].copy(),
+            'y': self.y[rows].copy(),
+            'highlighted': self.highlighted[rows].copy(),
+            'word_code': codes.astype(np.int32),
+            'word_vocabulary': np.array([self.vocabulary[i] for i in used], dtype=str)
+        }
+
+    def _tuples(self, rows: slice):
+        vocabulary = self.vocabulary
+        return zip(self.trial_number[rows].tolist(),
+                   [vocabulary[i] for i in self.word_id[rows].tolist()],
+                   self.x[rows].tolist(),
+                   self.y[rows].tolist(),
+                   self.highlighted[rows].tolist())
+
+    def rows(self, rows: Optional[slice] = None) -> List[dict]:
+        """Materialize rows as the result dicts used by the CSV, storage and collector."""
+        fields = TRIAL_MANAGER['CSV_FIELDS']
+        return [dict(zip(fields, values)) for values in self._tuples(rows or slice(0, self.size))]
+
+    def write_csv(self, filename: str) -> None:
+        """Write all rows to a results CSV straight from the columns."""
+        with open(filename, 'w', newline='') as csvfile:
+            writer = csv.writer(csvfile)
+            writer.writerow(TRIAL_MANAGER['CSV_FIELDS'])
+            writer.writerows(self._tuples(slice(0, self.size)))
+
 
 class TrialManager:
     def __init__(self, max_trials=None, participant_id=None):
         self.current_trial = 1
         self.max_trials = max_trials if max_trials is not None else TRIAL_MANAGER['MAX_TRIALS']
-        self.all_trial_results = []
+        self.results = TrialBuffer()
+        self._last_trial_rows = slice(0, 0)
         self.participant_id = participant_id 
 
+    @property
+    def all_trial_results(self) -> List[dict]:
+        return self.results.rows()
+
+    @property
+    def last_trial_results(self) -> List[dict]:
+        return self.results.rows(self._last_trial_rows)
+
     def get_trial_number(self):
         return self.current_trial
         
@@ -25,15 +139,15 @@ class TrialManager:
         return True, TRIAL_MANAGER['MESSAGES']['TRIAL_PROGRESS'].format(prev_trial=prev_trial, next_trial=self.current_trial)
 
 
-    def _convert_coordinates(self, x: float, y: float) -> tuple[float, float]:
-        """Convert coordinates from canvas to output coordinate system.
+    def _convert_coordinates(self, xs: np.ndarray, ys: np.ndarray) -> tuple[np.ndarray, np.ndarray]:
+        """Convert coordinate arrays from canvas to output coordinate system.
         
         Canvas uses top-left origin with Y increasing downward.
         Output uses bottom-left origin with Y increasing upward.
         """
         if TRIAL_MANAGER['COORDINATES']['INVERT_Y']:
-            return x, -y
-        return x, y
+            return xs, -ys
+        return xs, ys
 
     def save_trial_data(self, words) -> None:
         """Store trial data and save to CSV if experiment is complete."""
@@ -44,19 +158,35 @@ class TrialManager:
             raise ValueError(TRIAL_MANAGER['MESSAGES']['ERRORS']['NO_WORDS'])
         
         # Store current trial data without strict validation
-        coordinates = []
-        for word in words:
-            x_coord, y_coord = self._convert_coordinates(word.logical_x, word.logical_y)
-            word_data = {
-                'trial_number': self.current_trial,
-                'word': word.word,
-                'x_coord': x_coord,
-                'y_coord': y_coord,
-                'highlighted': word.is_highlighted
-            }
-            coordinates.append(word_data)
-        
-        self.all_trial_results.extend(coordinates)
+        n = len(words)
+        xs = np.fromiter((w.logical_x for w in words), dtype=np.float64, count=n)
+        ys = np.fromiter((w.logical_y for w in words), dtype=np.float64, count=n)
+        highlighted = np.fromiter((w.is_highlighted for w in words), dtype=bool, count=n)
+        xs, ys = self._convert_coordinates(xs, ys)
+        previous_size, previous_rows = self.results.size, self._last_trial_rows
+        self._last_trial_rows = self.results.append(
+            self.current_trial, [w.word for w in words], xs, ys, highlighted)
+        try:
+            return self._write_trial()
+        except Exception:
+            # Take the rows back out, so saving the trial again does not store them twice
+            self.results.truncate(previous_size)
+            self._last_trial_rows = previous_rows
+            raise
+
+    def _write_trial(self) -> Optional[str]:
+        """Write the last trial to the database and columnar file, and the CSV after the last trial."""
+        # Commit the trial to the database right away when the SQLite backend is on
+        store = get_store()
+        if store is not None:
+            store.save_trial(str(self.participant_id), self.current_trial, self.last_trial_results)
+
+        # Typed binary copy of the trial for fast cohort analysis
+        if COLUMNAR['ENABLED']:
+            from columnar import write_columns
+            participant_dir = os.path.join(TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'], str(self.participant_id))
+            write_columns(self.results.columns(self._last_trial_rows), os.path.join(
+                participant_dir, COLUMNAR['TRIAL_FILENAME_TEMPLATE'].format(trial=self.current_trial)))
         
         # Save to CSV if this was the last trial
         if self.current_trial == self.max_trials:
@@ -69,11 +199,53 @@ class TrialManager:
                 TRIAL_MANAGER['PATHS']['RESULTS_FILENAME_TEMPLATE'].format(timestamp=timestamp)
             )
             
-            fieldnames = TRIAL_MANAGER['CSV_FIELDS']
-            
-            with open(filename, 'w', newline='') as csvfile:
-                writer = csv.DictWriter(csvfile, fieldnames=fieldnames)
-                writer.writeheader()
-                writer.writerows(self.all_trial_results)
-            
-            return filename
\ No newline at end of file
+            self.results.write_csv(filename)
+            return filename
+        return None
+
+    def save_trial_events(self, events: List) -> str:
+        """Write the interaction journal of the current trial next to the results."""
+        if not self.participant_id:
+            raise ValueError(TRIAL_MANAGER['MESSAGES']['ERRORS']['NO_PARTICIPANT'])
+        participant_dir = os.path.join(TRIAL_MANAGER['PATHS']['DATA_DIRECTORY'], str(self.participant_id))
+        os.makedirs(participant_dir, exist_ok=True)
+        filename = os.path.join(
+            participant_dir,
+            TRIAL_MANAGER['PATHS']['EVENTS_FILENAME_TEMPLATE'].format(trial=self.current_trial)
+        )
+        with open(filename, 'w') as f:
+            json.dump({'trial_number': self.current_trial, 'events': events}, f)
+        return filename
+
+def load_trial_results(filepath: str) -> List[dict]:
+    """Read a results CSV written by TrialManager back into typed rows."""
+    results = []
+    with open(filepath, 'r', newline='') as csvfile:
+        for row in csv.DictReader(csvfile):
+            results.append({
+                'trial_number': int(row['trial_number']),
+                'word': row['word'],
+                'x_coord': float(row['x_coord']),
+                'y_coord': float(row['y_coord']),
+                'highlighted': row['highlighted'] == 'True'
+            })
+    return results
+
+
+def find_results_files(data_dir: str = TRIAL_MANAGER['PATHS']['DATA_DIRECTORY']) -> dict:
+    """Map every participant folder in data_dir to its most recent results CSV."""
+    prefix, suffix = TRIAL_MANAGER['PATHS']['RESULTS_FILENAME_TEMPLATE'].split('{timestamp}')
+    latest = {}
+    if not os.path.isdir(data_dir):
+        return latest
+    for entry in sorted(os.scandir(data_dir), key=lambda e: e.name):
+        if not entry.is_dir():
+            continue
+        candidates = sorted(
+            name for name in os.listdir(entry.path)
+            if name.startswith(prefix) and name.endswith(suffix)
+        )
+        if candidates:
+            # Timestamps sort lexically, so the last file is the newest
+            latest[entry.name] = os.path.join(entry.path, candidates[-1])
+    return latest
@@ -0,0 +1,326 @@
+// Browser version of the semGUI arrangement task.
+//
+// Mirrors WordSpace / ArrangementModel: words have logical coordinates and the
+// view maps them to the canvas with device = offset + logical * scale. All
+// interaction is local; only the final positions of a trial (and the optional
+// event journal) are sent to web_server.py when the participant ends it.
+'use strict';
+
+const state = {
+  token: null,
+  config: null,
+  trial: null,
+  words: [],          // {word, x, y, highlighted} in logical coordinates
+  stack: [],
+  scale: 1,
+  offsetX: 0,
+  offsetY: 0,
+  highlightMode: false,
+  drag: null,         // {word, grabX, grabY}
+  mouseX: null,
+  mouseY: null,
+  journal: [],
+  trialStart: 0,
+  lastSample: 0,
+  dirty: true,
+};
+
+const canvas = document.getElementById('wordspace');
+const ctx = canvas.getContext('2d');
+const $ = (id) => document.getElementById(id);
+
+// ------------------------------------------------------------------ server
+
+async function post(url, body) {
+  for (let attempt = 0; ; attempt++) {
+    let response;
+    try {
+      response = await fetch(url, {
+        method: 'POST',
+        headers: {'Content-Type': 'application/json'},
+        body: JSON.stringify(body),
+      });
+    } catch (networkError) {
+      // Retries are safe: the server answers a repeated trial with the same response
+      if (attempt >= 4) throw networkError;
+      await new Promise((resolve) => setTimeout(resolve, 500 * 2 ** attempt));
+      continue;
+    }
+    if (!response.ok) throw new Error(await response.text());
+    return response.json();
+  }
+}
+
+async function startSession() {
+  $('start-error').textContent = '';
+  try {
+    const participantId = $('participant-id').value.trim();
+    const reply = await post('/api/session', participantId ? {participant_id: participantId} : {});
+    state.token = reply.token;
+    state.config = reply.config;
+    applyText();
+    $('start').classList.add('hidden');
+    resize();
+    startTrial(reply.trial);
+  } catch (error) {
+    $('start-error').textContent = error.message;
+  }
+}
+
+async function endTrial() {
+  if (state.stack.length) {
+    showMessage(state.config.text.MESSAGES.INSUFFICIENT_WORDS);
+    return;
+  }
+  $('end-trial').disabled = true;
+  try {
+    const reply = await post(`/api/session/${state.token}/trial`, {
+      trial_number: state.trial.trial_number,
+      words: state.words.map((w) => ({word: w.word, x: w.x, y: w.y, highlighted: w.highlighted})),
+      events: state.config.journal.enabled ? state.journal : [],
+    });
+    if (reply.done) {
+      showMessage(`${state.config.text.MESSAGES.EXPERIMENT_COMPLETED}: ${reply.message}`, () => {
+        document.body.innerHTML = `<h1 style="text-align:center">${state.config.text.MESSAGES.EXPERIMENT_COMPLETED}</h1>`;
+      });
+    } else {
+      showMessage(reply.message, () => startTrial(reply.trial));
+    }
+  } catch (error) {
+    showMessage(error.message);
+  } finally {
+    $('end-trial').disabled = false;
+  }
+}
+
+// ------------------------------------------------------------------- trial
+
+function startTrial(trial) {
+  state.trial = trial;
+  state.words = [];
+  state.stack = trial.words.slice();
+  state.journal = [];
+  state.trialStart = performance.now();
+  resetPov();
+  $('trial-label').textContent = `Trial ${trial.trial_number} of ${trial.max_trials}`;
+  renderStack();
+}
+
+function renderStack() {
+  const container = $('stack');
+  container.replaceChildren(...state.stack.map((word) => {
+    const element = document.createElement('div');
+    element.className = 'stack-word';
+    element.textContent = word;
+    element.addEventListener('click', () => addWordFromStack(word));
+    return element;
+  }));
+}
+
+function addWordFromStack(word) {
+  state.stack.splice(state.stack.indexOf(word), 1);
+  renderStack();
+  // Centre of the current viewport plus jitter, as in MainWindow.create_word_at_center
+  const [jitterX, jitterY] = state.config.jitter;
+  const x = (canvas.clientWidth / 2 - state.offsetX) / state.scale + (Math.random() - 0.5) * jitterX;
+  const y = (canvas.clientHeight / 2 - state.offsetY) / state.scale + (Math.random() - 0.5) * jitterY;
+  state.words.push({word, x, y, highlighted: false});
+  record('add', word, x, y);
+  state.dirty = true;
+}
+
+function record(type, word, x, y) {
+  if (!state.config.journal.enabled) return;
+  state.journal.push([Math.round(performance.now() - state.trialStart), type, word, x, y]);
+}
+
+// -------------------------------------------------------------------- view
+
+function toDevice(x, y) {
+  return [state.offsetX + x * state.scale, state.offsetY + y * state.scale];
+}
+
+function wordAt(deviceX, deviceY) {
+  const {width, height} = state.config.word;
+  // Topmost first, like canvas item stacking
+  for (let i = state.words.length - 1; i >= 0; i--) {
+    const [cx, cy] = toDevice(state.words[i].x, state.words[i].y);
+    const dx = (deviceX - cx) / (width / 2);
+    const dy = (deviceY - cy) / (height / 2);
+    if (dx * dx + dy * dy <= 1) return i;
+  }
+  return -1;
+}
+
+function zoomAbout(pivotX, pivotY, factor) {
+  const zoom = state.config.zoom;
+  const logicalX = (pivotX - state.offsetX) / state.scale;
+  const logicalY = (pivotY - state.offsetY) / state.scale;
+  const scale = Math.max(zoom.min_scale, Math.min(zoom.max_scale, state.scale * factor));
+  if (scale === state.scale) return;
+  state.scale = scale;
+  state.offsetX = pivotX - logicalX * scale;
+  state.offsetY = pivotY - logicalY * scale;
+  record('zoom', null, state.offsetX, state.offsetY);
+  updateZoomLabel();
+  state.dirty = true;
+}
+
+function pan(dx, dy) {
+  state.offsetX += dx;
+  state.offsetY += dy;
+  record('pan', null, state.offsetX, state.offsetY);
+  state.dirty = true;
+}
+
+function resetPov() {
+  state.scale = 1;
+  if (!state.words.length) {
+    state.offsetX = canvas.clientWidth / 2;
+    state.offsetY = canvas.clientHeight / 2;
+  } else {
+    const xs = state.words.map((w) => w.x);
+    const ys = state.words.map((w) => w.y);
+    state.offsetX = canvas.clientWidth / 2 - (Math.min(...xs) + Math.max(...xs)) / 2;
+    state.offsetY = canvas.clientHeight / 2 - (Math.min(...ys) + Math.max(...ys)) / 2;
+  }
+  updateZoomLabel();
+  state.dirty = true;
+}
+
+function updateZoomLabel() {
+  const zoom = state.config.zoom;
+  const percentage = Math.floor((state.scale - zoom.min_scale) / (zoom.max_scale - zoom.min_scale) * zoom.max_percentage);
+  $('zoom-label').textContent = `Zoom: ${percentage}%`;
+}
+
+function draw() {
+  if (state.dirty && state.config) {
+    state.dirty = false;
+    const ratio = window.devicePixelRatio || 1;
+    const word = state.config.word;
+    ctx.setTransform(ratio, 0, 0, ratio, 0, 0);
+    ctx.fillStyle = state.config.canvas.background;
+    ctx.fillRect(0, 0, canvas.clientWidth, canvas.clientHeight);
+    ctx.font = word.font;
+    ctx.textAlign = 'center';
+    ctx.textBaseline = 'middle';
+    for (const w of state.words) {
+      const [cx, cy] = toDevice(w.x, w.y);
+      ctx.beginPath();
+      ctx.ellipse(cx, cy, word.width / 2, word.height / 2, 0, 0, 2 * Math.PI);
+      ctx.fillStyle = word.colors.FILL;
+      ctx.fill();
+      ctx.lineWidth = w.highlighted ? word.highlight_width : word.outline_width;
+      ctx.strokeStyle = w.highlighted ? word.colors.HIGHLIGHT : word.colors.OUTLINE;
+      ctx.stroke();
+      ctx.fillStyle = word.colors.TEXT;
+      ctx.fillText(w.word, cx, cy);
+    }
+  }
+  requestAnimationFrame(draw);
+}
+
+function resize() {
+  const ratio = window.devicePixelRatio || 1;
+  canvas.width = canvas.clientWidth * ratio;
+  canvas.height = canvas.clientHeight * ratio;
+  state.dirty = true;
+}
+
+// ------------------------------------------------------------------ events
+
+canvas.addEventListener('pointerdown', (event) => {
+  const index = wordAt(event.offsetX, event.offsetY);
+  if (index < 0) return;
+  const w = state.words[index];
+  record('press', w.word, w.x, w.y);
+  if (state.highlightMode) {
+    w.highlighted = !w.highlighted;
+    record('highlight', w.word, w.x, w.y);
+    state.dirty = true;
+    return;
+  }
+  // Raise the word, as the Tk canvas keeps the dragged item on top
+  state.words.push(state.words.splice(index, 1)[0]);
+  const [cx, cy] = toDevice(w.x, w.y);
+  state.drag = {word: w, grabX: event.offsetX - cx, grabY: event.offsetY - cy};
+  canvas.setPointerCapture(event.pointerId);
+});
+
+canvas.addEventListener('pointermove', (event) => {
+  state.mouseX = event.offsetX;
+  state.mouseY = event.offsetY;
+  if (!state.drag) return;
+  const {word: w, grabX, grabY} = state.drag;
+  const {width, height} = state.config.word;
+  // Keep the word's box inside the canvas, as ArrangementModel.drag_to does
+  const cx = Math.max(width / 2, Math.min(event.offsetX - grabX, canvas.clientWidth - width / 2));
+  const cy = Math.max(height / 2, Math.min(event.offsetY - grabY, canvas.clientHeight - height / 2));
+  w.x = (cx - state.offsetX) / state.scale;
+  w.y = (cy - state.offsetY) / state.scale;
+  const now = performance.now();
+  if (now - state.lastSample >= state.config.journal.sample_ms) {
+    state.lastSample = now;
+    record('drag', w.word, w.x, w.y);
+  }
+  state.dirty = true;
+});
+
+canvas.addEventListener('pointerup', () => {
+  if (!state.drag) return;
+  const w = state.drag.word;
+  record('release', w.word, w.x, w.y);
+  state.drag = null;
+});
+
+canvas.addEventListener('wheel', (event) => {
+  event.preventDefault();
+  if (!state.config) return;
+  const factor = state.config.zoom.factor;
+  zoomAbout(event.offsetX, event.offsetY, event.deltaY < 0 ? factor : 1 / factor);
+}, {passive: false});
+
+window.addEventListener('keydown', (event) => {
+  if (!state.config || !state.trial) return;
+  const distance = state.config.pan_distance;
+  const moves = {ArrowLeft: [distance, 0], ArrowRight: [-distance, 0], ArrowUp: [0, distance], ArrowDown: [0, -distance]};
+  if (moves[event.key]) {
+    event.preventDefault();
+    pan(...moves[event.key]);
+  }
+});
+
+function toggleHighlightMode() {
+  state.highlightMode = !state.highlightMode;
+  const button = $('highlight');
+  button.textContent = state.config.text.BUTTONS.HIGHLIGHT.replace('{}', state.highlightMode ? 'ON' : 'OFF');
+  button.style.background = state.highlightMode ? state.config.colors.highlight_on : state.config.colors.highlight_off;
+  canvas.classList.toggle('highlight-mode', state.highlightMode);
+}
+
+function applyText() {
+  const text = state.config.text;
+  document.title = text.WINDOW_TITLE;
+  $('end-trial').textContent = text.BUTTONS.END_TRIAL;
+  $('recenter').textContent = text.BUTTONS.RECENTER;
+  $('panel-title').textContent = text.PANEL_TITLE;
+  state.highlightMode = true;
+  toggleHighlightMode();
+}
+
+function showMessage(text, onClose) {
+  $('message-text').textContent = text;
+  $('message').classList.remove('hidden');
+  $('message-ok').onclick = () => {
+    $('message').classList.add('hidden');
+    if (onClose) onClose();
+  };
+}
+
+$('start-button').addEventListener('click', startSession);
+$('end-trial').addEventListener('click', endTrial);
+$('recenter').addEventListener('click', () => { resetPov(); record('recenter', null, state.offsetX, state.offsetY); });
+$('highlight').addEventListener('click', toggleHighlightMode);
+window.addEventListener('resize', resize);
+requestAnimationFrame(draw);
@@ -0,0 +1,145 @@
+"""
+Load test for the browser front-end.
+
+Starts web_server.py in a temporary working directory (so data/ is not
+touched) and runs many simulated participants against it concurrently. Each one
+loads the page, creates a session and submits every trial with random final
+positions and a synthetic event journal after a think time. Reports request
+latencies, the server's CPU time per session and how many concurrent sessions
+one core could sustain at a given real session length.
+
+Usage:
+    python web_loadtest.py [--participants 300] [--think-ms 200] [--session-minutes 20]
+"""
+import argparse
+import asyncio
+import os
+import random
+import shutil
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+
+import aiohttp
+
+from bot_participant import percentiles
+from settings import WEB
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def synthetic_journal(words, n_events: int) -> list:
+    events = []
+    t = 0
+    for i in range(n_events):
+        t += random.randint(5, 60)
+        events.append([t, 'drag', random.choice(words), random.uniform(-600, 600), random.uniform(-350, 350)])
+    return events
+
+
+async def run_participant(http: aiohttp.ClientSession, base: str, think_ms: float, events_per_trial: int,
+                          latencies: list) -> int:
+    """Play one full session and return the number of trials submitted."""
+    async def timed(method, url, **kwargs):
+        start = time.perf_counter()
+        async with http.request(method, url, **kwargs) as response:
+            response.raise_for_status()
+            body = await (response.json() if 'json' in response.content_type else response.read())
+        latencies.append((time.perf_counter() - start) * 1000)
+        return body
+
+    await timed('GET', f"{base}/")
+    await timed('GET', f"{base}/static/app.js")
+    session = await timed('POST', f"{base}/api/session", json={})
+    trial = session['trial']
+    trials = 0
+    while True:
+        await asyncio.sleep(random.uniform(0.5, 1.5) * think_ms / 1000)
+        words = [{'word': w, 'x': random.uniform(-600, 600), 'y': random.uniform(-350, 350),
+                  'highlighted': random.random() < 0.2} for w in trial['words']]
+        reply = await timed('POST', f"{base}/api/session/{session['token']}/trial", json={
+            'trial_number': trial['trial_number'],
+            'words': words,
+            'events': synthetic_journal(trial['words'], events_per_trial)
+        })
+        trials += 1
+        if reply['done']:
+            return trials
+        trial = reply['trial']
+
+
+async def run(args, base: str) -> dict:
+    latencies = []
+    connector = aiohttp.TCPConnector(limit=args.participants)
+    async with aiohttp.ClientSession(connector=connector) as http:
+        for _ in range(100):
+            try:
+                async with http.get(f"{base}/api/stats") as response:
+                    before = await response.json()
+                break
+            except aiohttp.ClientConnectionError:
+                await asyncio.sleep(0.1)
+        else:
+            raise RuntimeError("web_server.py did not start")
+
+        start = time.perf_counter()
+        results = await asyncio.gather(
+            *(run_participant(http, base, args.think_ms, args.events, latencies) for _ in range(args.participants)),
+            return_exceptions=True
+        )
+        elapsed = time.perf_counter() - start
+        async with http.get(f"{base}/api/stats") as response:
+            after = await response.json()
+
+    errors = [r for r in results if isinstance(r, Exception)]
+    return {
+        'elapsed': elapsed,
+        'completed': after.get('sessions_completed', 0) - before.get('sessions_completed', 0),
+        'trials': sum(r for r in results if isinstance(r, int)),
+        'errors': errors,
+        'cpu_seconds': after['cpu_seconds'] - before['cpu_seconds'],
+        'latencies': latencies
+    }
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stress web_server.py with simulated participants")
+    parser.add_argument('--participants', type=int, default=300)
+    parser.add_argument('--think-ms', type=float, default=200, help="Mean pause before each trial submission")
+    parser.add_argument('--events', type=int, default=200, help="Journal events per trial")
+    parser.add_argument('--session-minutes', type=float, default=20, help="Real session length for the estimate")
+    parser.add_argument('--wordlist', default=os.path.join(HERE, WEB['WORDLIST']))
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='web_loadtest_')
+    port = free_port()
+    server = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, 'web_server.py'), '--port', str(port), '--wordlist', args.wordlist],
+        cwd=workdir, stdout=subprocess.DEVNULL
+    )
+    try:
+        result = asyncio.run(run(args, f"http://127.0.0.1:{port}"))
+    finally:
+        server.terminate()
+        server.wait()
+        shutil.rmtree(workdir, ignore_errors=True)
+
+    stats = percentiles(result['latencies'], (50, 95, 99))
+    cpu_per_session = result['cpu_seconds'] / max(result['completed'], 1)
+    print(f"{result['completed']}/{args.participants} sessions completed ({result['trials']} trials) "
+          f"in {result['elapsed']:.1f} s, {len(result['errors'])} errors")
+    print("Request latency ms: " + ', '.join(f"{name} {value:.1f}" for name, value in stats.items()))
+    print(f"Server CPU: {result['cpu_seconds']:.2f} s total, {cpu_per_session * 1000:.1f} ms per session")
+    print(f"Sessions per core at {args.session_minutes:g} min per session: "
+          f"~{args.session_minutes * 60 / cpu_per_session:.0f} concurrent")
+    for error in result['errors'][:5]:
+        print(f"  {type(error).__name__}: {error}")
+    raise SystemExit(1 if result['errors'] else 0)
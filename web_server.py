@@ -0,0 +1,282 @@
+"""
+Browser front-end for the arrangement task.
+
+Serves the single-page client in web/ and a small JSON API backed by the same
+wordlist reader, TrialManager and session log functions as the desktop app, so
+online sessions produce identical data folders. The client keeps all dragging,
+zooming and panning local and only sends each trial's final positions, plus the
+optional interaction journal; the server therefore does a few milliseconds of
+work per trial and one process handles hundreds of concurrent participants.
+
+API:
+    POST /api/session                 {"participant_id"?, "notes"?} -> session token, config, first trial
+    POST /api/session/{token}/trial   {"trial_number", "words": [...], "events"?} -> next trial or done
+    GET  /api/stats                   counters and server CPU time, used by web_loadtest.py
+
+Usage:
+    python web_server.py [--host 0.0.0.0] [--port 8080] [--wordlist wordlist.csv]
+"""
+import argparse
+import asyncio
+import logging
+import math
+import os
+import random
+import secrets
+import time
+from collections import Counter
+from typing import Dict, List, Optional
+
+from aiohttp import web
+
+from config import ConfigError, get_profile, load_profile, use_profile
+from session_manager import create_participant_folder, check_wordlist, create_session_log, read_wordlist, update_session_log
+from settings import DRAGGABLE_WORD, GUI, MESSAGES, PATHS, TEXT, VISUAL, WEB, WORDSPACE
+from trial_manager import PlacedWord, TrialManager
+from validators import validate_participant_id
+
+logger = logging.getLogger(__name__)
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+
+class WebSession:
+    """Server-side state of one browser participant."""
+
+    def __init__(self, participant_id: str, session_data: dict, words_list: List[List[str]], max_trials: int):
+        self.participant_id = participant_id
+        self.session_data = session_data
+        self.words_list = words_list
+        self.trial_manager = TrialManager(max_trials=max_trials, participant_id=participant_id)
+        self.lock = asyncio.Lock()
+        self.last_seen = time.monotonic()
+        self.finished = False
+        # Answer to the last saved trial, repeated if the client retries it
+        self.last_response: Optional[dict] = None
+
+    def current_words(self) -> List[str]:
+        return self.words_list[self.trial_manager.get_trial_number() - 1]
+
+    def trial_payload(self) -> dict:
+        return {
+            'trial_number': self.trial_manager.get_trial_number(),
+            'max_trials': self.trial_manager.max_trials,
+            'words': self.current_words()
+        }
+
+
+def client_config() -> dict:
+    """The settings the browser client needs to behave like the desktop WordSpace."""
+    profile = get_profile()
+    return {
+        'canvas': {
+            'width': profile.canvas.width,
+            'height': profile.canvas.height,
+            'background': WORDSPACE['CANVAS']['BACKGROUND_COLOR']
+        },
+        'zoom': {
+            'min_scale': profile.zoom.min_scale,
+            'max_scale': profile.zoom.max_scale,
+            'factor': profile.zoom.factor,
+            'max_percentage': profile.zoom.max_percentage
+        },
+        'word': {
+            'width': profile.word.width,
+            'height': profile.word.height,
+            'colors': DRAGGABLE_WORD['COLORS'],
+            'font': f"{DRAGGABLE_WORD['FONT']['SIZE']}px {DRAGGABLE_WORD['FONT']['FAMILY']}",
+            'outline_width': DRAGGABLE_WORD['OUTLINE']['DEFAULT_WIDTH'],
+            'highlight_width': DRAGGABLE_WORD['OUTLINE']['HIGHLIGHT_WIDTH']
+        },
+        'colors': {
+            'highlight_on': VISUAL['COLORS']['HIGHLIGHT_ON'],
+            'highlight_off': VISUAL['COLORS']['HIGHLIGHT_OFF']
+        },
+        'jitter': [profile.experiment.jitter_x, profile.experiment.jitter_y],
+        'pan_distance': GUI['ARROW_PAN_DISTANCE'],
+        'journal': {'enabled': WEB['JOURNAL_ENABLED'], 'sample_ms': WEB['JOURNAL_SAMPLE_MS']},
+        'text': TEXT
+    }
+
+
+def parse_words(payload: list, expected: List[str]) -> List[PlacedWord]:
+    """Validate a submitted trial against the words it should contain."""
+    if not isinstance(payload, list):
+        raise ValueError("words must be a list")
+    placed = []
+    for item in payload:
+        x, y = float(item['x']), float(item['y'])
+        if not (math.isfinite(x) and math.isfinite(y)):
+            raise ValueError(f"Invalid position for {item['word']!r}")
+        placed.append(PlacedWord(str(item['word']), x, y, bool(item.get('highlighted', False))))
+    if Counter(w.word for w in placed) != Counter(expected):
+        raise ValueError(TEXT['MESSAGES']['INSUFFICIENT_WORDS'])
+    return placed
+
+
+class ArrangementServer:
+    """aiohttp application holding the live sessions."""
+
+    def __init__(self, wordlist: str):
+        self.words_list = read_wordlist(wordlist)
+        self.max_trials = get_profile().experiment.total_trials
+        try:
+            check_wordlist(self.words_list)
+        except ValueError as e:
+            raise ValueError(f"{wordlist}: {e}") from e
+        self.wordlist = wordlist
+        self.sessions: Dict[str, WebSession] = {}
+        self.config = client_config()
+        self.stats = Counter()
+        self._id_lock = asyncio.Lock()
+        self._started = time.monotonic()
+
+    def make_app(self) -> web.Application:
+        app = web.Application(client_max_size=WEB['MAX_REQUEST_BYTES'])
+        static_dir = os.path.join(HERE, WEB['STATIC_DIRECTORY'])
+        app.router.add_get('/', lambda request: web.FileResponse(os.path.join(static_dir, 'index.html')))
+        app.router.add_post('/api/session', self.create_session)
+        app.router.add_post('/api/session/{token}/trial', self.submit_trial)
+        app.router.add_get('/api/stats', self.get_stats)
+        app.router.add_static('/static/', static_dir)
+        app.on_startup.append(self._start_cleanup)
+        app.on_cleanup.append(self._stop_cleanup)
+        return app
+
+    # ---------------------------------------------------------------- handlers
+
+    async def create_session(self, request: web.Request) -> web.Response:
+        body = await self._json(request)
+        notes = str(body.get('notes', ''))
+        async with self._id_lock:
+            participant_id = str(body.get('participant_id') or self._new_participant_id())
+            if not validate_participant_id(participant_id):
+                raise web.HTTPBadRequest(text=MESSAGES['VALIDATION']['INVALID_ID'])
+            if os.path.exists(os.path.join(PATHS['DATA_DIRECTORY'], participant_id)):
+                raise web.HTTPConflict(text=WEB['MESSAGES']['EXISTING_ID'].format(participant_id))
+            # Creating the folder under the lock reserves the ID
+            await asyncio.to_thread(create_participant_folder, participant_id)
+
+        session_data = await asyncio.to_thread(
+            create_session_log, participant_id, WEB['EXPERIMENTER'], self.wordlist, notes)
+        session = WebSession(participant_id, session_data, self.words_list, self.max_trials)
+        token = secrets.token_urlsafe(16)
+        self.sessions[token] = session
+        self.stats['sessions_started'] += 1
+        return web.json_response({
+            'token': token,
+            'participant_id': participant_id,
+            'config': self.config,
+            'trial': session.trial_payload()
+        })
+
+    async def submit_trial(self, request: web.Request) -> web.Response:
+        session = self.sessions.get(request.match_info['token'])
+        if session is None:
+            raise web.HTTPNotFound(text="Unknown or expired session")
+        body = await self._json(request)
+
+        async with session.lock:
+            session.last_seen = time.monotonic()
+            trial_number = session.trial_manager.get_trial_number()
+            if session.last_response is not None and body.get('trial_number') == session.last_response['saved']:
+                # The client retried a trial whose response it did not receive
+                return web.json_response(session.last_response)
+            if session.finished or body.get('trial_number') != trial_number:
+                raise web.HTTPConflict(text=f"Expected trial {trial_number}")
+            try:
+                words = parse_words(body.get('words'), session.current_words())
+            except (KeyError, TypeError, ValueError) as e:
+                raise web.HTTPBadRequest(text=str(e))
+            events = body.get('events') or []
+            if not isinstance(events, list) or len(events) > WEB['MAX_EVENTS_PER_TRIAL']:
+                raise web.HTTPRequestEntityTooLarge(max_size=WEB['MAX_EVENTS_PER_TRIAL'], actual_size=len(events))
+
+            await asyncio.to_thread(self._save_trial, session, words, events)
+            self.stats['trials_saved'] += 1
+            self.stats['events_saved'] += len(events)
+
+            continue_experiment, message = session.trial_manager.advance_trial()
+            if continue_experiment:
+                response = {'saved': trial_number, 'done': False, 'message': message, 'trial': session.trial_payload()}
+            else:
+                session.finished = True
+                self.stats['sessions_completed'] += 1
+                response = {'saved': trial_number, 'done': True, 'message': message}
+            session.last_response = response
+            return web.json_response(response)
+
+    async def get_stats(self, request: web.Request) -> web.Response:
+        return web.json_response({
+            **self.stats,
+            'active_sessions': sum(not s.finished for s in self.sessions.values()),
+            'cpu_seconds': time.process_time(),
+            'uptime_seconds': time.monotonic() - self._started
+        })
+
+    # ----------------------------------------------------------------- helpers
+
+    @staticmethod
+    def _save_trial(session: WebSession, words: List[PlacedWord], events: list) -> None:
+        """Blocking part of a trial submission, run in a worker thread."""
+        session.trial_manager.save_trial_data(words)
+        if events:
+            session.trial_manager.save_trial_events(events)
+        update_session_log(session.session_data, completed_trial=session.trial_manager.current_trial)
+
+    @staticmethod
+    async def _json(request: web.Request) -> dict:
+        try:
+            body = await request.json()
+        except ValueError:
+            raise web.HTTPBadRequest(text="Request body must be JSON")
+        if not isinstance(body, dict):
+            raise web.HTTPBadRequest(text="Request body must be a JSON object")
+        return body
+
+    @staticmethod
+    def _new_participant_id() -> str:
+        while True:
+            participant_id = f"P{random.randrange(10**8, 10**9)}"
+            if not os.path.exists(os.path.join(PATHS['DATA_DIRECTORY'], participant_id)):
+                return participant_id
+
+    # ------------------------------------------------------------ idle cleanup
+
+    async def _start_cleanup(self, app: web.Application) -> None:
+        self._cleanup_task = asyncio.create_task(self._cleanup_loop())
+
+    async def _stop_cleanup(self, app: web.Application) -> None:
+        self._cleanup_task.cancel()
+
+    async def _cleanup_loop(self) -> None:
+        while True:
+            await asyncio.sleep(WEB['CLEANUP_INTERVAL_S'])
+            cutoff = time.monotonic() - WEB['SESSION_IDLE_TIMEOUT_S']
+            for token, session in list(self.sessions.items()):
+                if session.last_seen >= cutoff or session.lock.locked():
+                    continue
+                del self.sessions[token]
+                if not session.finished:
+                    # Same record as an interrupted desktop session, so it can be resumed there
+                    self.stats['sessions_abandoned'] += 1
+                    await asyncio.to_thread(update_session_log, session.session_data, interrupted=True)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve the arrangement task to browsers")
+    parser.add_argument('--host', default=WEB['HOST'], help="Use 0.0.0.0 to accept remote participants")
+    parser.add_argument('--port', type=int, default=WEB['PORT'])
+    parser.add_argument('--wordlist', default=os.path.join(HERE, WEB['WORDLIST']))
+    parser.add_argument('--config', default=None, help="Configuration profile name or file")
+    args = parser.parse_args()
+
+    if args.config:
+        try:
+            use_profile(load_profile(args.config))
+        except ConfigError as e:
+            parser.error(str(e))
+
+    logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(name)s - %(levelname)s - %(message)s')
+    server = ArrangementServer(args.wordlist)
+    web.run_app(server.make_app(), host=args.host, port=args.port, access_log=None)
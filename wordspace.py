@@ -1,8 +1,19 @@
+import logging
+import time
 import tkinter as tk
-from typing import TYPE_CHECKING, List, Optional, Dict, Tuple
+from typing import TYPE_CHECKING, Callable, List, Optional, Dict, Set, Tuple
 
-from draggable import DraggableWord
-from settings import WORDSPACE
+import numpy as np
+
+from arrangement import ArrangementModel
+from draggable import DraggableWord, SHIFT_MASK
+from history import Add, Highlight, History, Move, Operation
+import instrumentation
+from instrumentation import instrumented
+from config import get_profile
+from settings import WORDSPACE, INSTRUMENTATION, ANIMATION, MINIMAP, TEXT_METRICS
+
+logger = logging.getLogger(__name__)
 
 
 class WordSpace(tk.Frame):
@@ -13,26 +24,49 @@ class WordSpace(tk.Frame):
     - Pivot-based zooming
     - Canvas panning
     - Zoom/POV reset
+    - Rubber-band and shift-click selection with group dragging
+    - Undo/redo of moves, highlights and added words
+    - Minimap overview with click-to-navigate
+    - Untangling overlapping words
+
+    The geometry lives in an ArrangementModel; this class renders it on a canvas.
     """
     
     def __init__(
         self, 
         parent: 'tk.Tk', 
         words: Optional[List[str]] = None, 
-        width: int = WORDSPACE['CANVAS']['DEFAULT_WIDTH'], 
-        height: int = WORDSPACE['CANVAS']['DEFAULT_HEIGHT']
+        width: Optional[int] = None, 
+        height: Optional[int] = None
     ):
         """
         Initialize the WordSpace with optional words and custom dimensions 
         Args:
             parent (tk.Tk): Parent Tkinter window
             words (Optional[List[str]], optional): Initial list of words. Defaults to None.
-            width (int, optional): Canvas width. Defaults to 1200.
-            height (int, optional): Canvas height. Defaults to 800.
+            width (int, optional): Canvas width. Defaults to the profile's canvas width.
+            height (int, optional): Canvas height. Defaults to the profile's canvas height.
         """
 
         super().__init__(parent)
 
+        # Configuration is bound once here, not looked up per event
+        profile = get_profile()
+        width = width or profile.canvas.width
+        height = height or profile.canvas.height
+        self.zoom_in_factor = profile.zoom.factor
+        self.zoom_out_factor = 1 / profile.zoom.factor
+        self.max_zoom_percentage = profile.zoom.max_percentage
+        self.zoom_display_format = WORDSPACE['ZOOM']['DISPLAY_FORMAT']
+        self.placement = profile.placement
+        self.word_width = profile.word.width
+        self.word_height = profile.word.height
+        self.text_metrics = None
+        if TEXT_METRICS['ENABLED']:
+            from textmetrics import get_metrics
+            self.text_metrics = get_metrics(self, DraggableWord.TEXT_FONT)
+        self.safety_margin = profile.canvas.safety_margin
+
         # Attributes
         self.main_window = self.winfo_toplevel()
         self.parent = parent
@@ -41,11 +75,9 @@ class WordSpace(tk.Frame):
         self.pack()
 
         # Zoom and offset management
-        self.min_scale = WORDSPACE['ZOOM']['MIN_SCALE']  
-        self.max_scale = WORDSPACE['ZOOM']['MAX_SCALE']
-        self.scale_factor = self.min_scale  
-        self.offset_x = width / 2  
-        self.offset_y = height / 2  
+        self.min_scale = profile.zoom.min_scale
+        self.max_scale = profile.zoom.max_scale
+        self.model = ArrangementModel(width, height, self.min_scale, self.max_scale)
 
         # Mouse tracking for zoom
         self.last_mouse_x: Optional[int] = None
@@ -58,6 +90,34 @@ class WordSpace(tk.Frame):
         self.draggables: List[DraggableWord] = []
         self.original_word_positions: Dict[str, Tuple[float, float]] = {}
 
+        # Callbacks for word interactions, keyed by event name ('press', ...)
+        self._word_listeners: Dict[str, List[Callable[[DraggableWord], None]]] = {}
+
+        # Selection; selected words carry a canvas tag so a group moves with one canvas.move
+        self.selected: Set[DraggableWord] = set()
+        self._band_id: Optional[int] = None
+        self._band_start: Optional[Tuple[int, int]] = None
+        self._band_additive = False
+        self._group_indices: Optional[np.ndarray] = None
+        self._group_anchor: Tuple[float, float] = (0.0, 0.0)
+        self._group_moved: List[float] = [0.0, 0.0]
+
+        # Arrow and wheel navigation, eased and redrawn at most once per frame
+        self.animator = None
+        if ANIMATION['ENABLED']:
+            from animation import ViewAnimator
+            self.animator = ViewAnimator(self)
+
+        # Undo/redo of the current trial
+        self.history = History()
+
+        # Interaction journal of the current trial, [ms, event, word, x, y] rows as in the browser version
+        self.journal: List[list] = []
+        self._journal_start = time.perf_counter()
+
+        # Overview of all words, created after the canvas
+        self.minimap = None
+
         # Create canvas
         self.canvas = tk.Canvas(self, width=width, height=height, bg=WORDSPACE['CANVAS']['BACKGROUND_COLOR'])
         
@@ -70,12 +130,48 @@ class WordSpace(tk.Frame):
         # Zoom label
         self._create_zoom_label()
 
+        if MINIMAP['ENABLED']:
+            self._create_minimap()
+
+        # Optional live latency overlay
+        if INSTRUMENTATION['OVERLAY']['ENABLED']:
+            self._create_latency_overlay()
+
         self.canvas.pack()
 
+    # The view transform is owned by the model
+    @property
+    def scale_factor(self) -> float:
+        return self.model.scale_factor
+
+    @scale_factor.setter
+    def scale_factor(self, value: float) -> None:
+        self.model.scale_factor = value
+
+    @property
+    def offset_x(self) -> float:
+        return self.model.offset_x
+
+    @offset_x.setter
+    def offset_x(self, value: float) -> None:
+        self.model.offset_x = value
+
+    @property
+    def offset_y(self) -> float:
+        return self.model.offset_y
+
+    @offset_y.setter
+    def offset_y(self, value: float) -> None:
+        self.model.offset_y = value
+
     def _setup_event_bindings(self) -> None:
         """Set up mouse event bindings for zoom and motion tracking."""
         self.canvas.bind("<MouseWheel>", self.on_mouse_wheel)
         self.canvas.bind("<Motion>", self.on_mouse_move)
+        # Canvas bindings run after the word items' own bindings
+        self.canvas.bind("<ButtonPress-1>", self.on_canvas_press)
+        self.canvas.bind("<B1-Motion>", self.on_canvas_drag)
+        self.canvas.bind("<ButtonRelease-1>", self.on_canvas_release)
 
     def _create_zoom_label(self) -> None:
         """Create and position the zoom percentage label."""
@@ -91,32 +187,320 @@ class WordSpace(tk.Frame):
             anchor=WORDSPACE['LABELS']['ZOOM_LABEL']['ANCHOR']
         )
 
+    def _create_minimap(self) -> None:
+        """Create the overview in a corner of the word space."""
+        from minimap import Minimap
+        self.minimap = Minimap(self)
+        self.minimap.place(
+            relx=MINIMAP['POSITION']['RELATIVE_X'],
+            rely=MINIMAP['POSITION']['RELATIVE_Y'],
+            anchor=MINIMAP['POSITION']['ANCHOR']
+        )
+        self.minimap.invalidate()
+
+    def _create_latency_overlay(self) -> None:
+        """Create the label showing live handler latency percentiles."""
+        overlay = INSTRUMENTATION['OVERLAY']
+        self.latency_label = tk.Label(self, text="", bg=overlay['BACKGROUND'], fg=overlay['FOREGROUND'])
+        self.latency_label.place(relx=overlay['RELATIVE_X'], rely=overlay['RELATIVE_Y'], anchor=overlay['ANCHOR'])
+        self._refresh_latency_overlay()
+
+    def _refresh_latency_overlay(self) -> None:
+        """Periodically copy the current p50/p99 into the overlay."""
+        recorder = instrumentation.active()
+        if recorder is not None:
+            self.latency_label.config(text=recorder.overlay_text())
+        self.after(INSTRUMENTATION['OVERLAY']['REFRESH_MS'], self._refresh_latency_overlay)
+
     def on_mouse_move(self, event: tk.Event) -> None:
         """Update the last known mouse position."""
         self.last_mouse_x = event.x
         self.last_mouse_y = event.y
 
+    def on_canvas_press(self, event: tk.Event) -> None:
+        """Start a rubber band when the press is on the background."""
+        if self.highlight_mode or DraggableWord.TAG in self.canvas.gettags('current'):
+            return
+        self._band_start = (event.x, event.y)
+        self._band_additive = bool(event.state & SHIFT_MASK)
+        self._band_id = self.canvas.create_rectangle(
+            event.x, event.y, event.x, event.y,
+            outline=WORDSPACE['SELECTION']['BAND_OUTLINE'],
+            dash=WORDSPACE['SELECTION']['BAND_DASH']
+        )
+
+    def on_canvas_drag(self, event: tk.Event) -> None:
+        """Track the mouse while a button is held and stretch the rubber band."""
+        self.on_mouse_move(event)
+        if self._band_id is not None:
+            x0, y0 = self._band_start
+            self.canvas.coords(self._band_id, x0, y0, event.x, event.y)
+
+    def on_canvas_release(self, event: tk.Event) -> None:
+        """Select the words under the rubber band, or clear the selection on a background click."""
+        if self._band_id is None:
+            return
+        self.canvas.delete(self._band_id)
+        self._band_id = None
+        x0, y0 = self._band_start
+        if not self._band_additive:
+            self.clear_selection()
+        min_size = WORDSPACE['SELECTION']['MIN_BAND_SIZE']
+        if abs(event.x - x0) >= min_size or abs(event.y - y0) >= min_size:
+            indices = self.model.indices_in_rect(x0, y0, event.x, event.y)
+            self.select([self.draggables[i] for i in indices.tolist()])
+
     def on_mouse_wheel(self, event: tk.Event) -> None:
         """Handle mouse wheel zoom events."""
-        factor = WORDSPACE['ZOOM']['ZOOM_FACTOR'] if event.delta > 0 else 1/WORDSPACE['ZOOM']['ZOOM_FACTOR']
-        self.pivot_zoom(factor)
+        factor = self.zoom_in_factor if event.delta > 0 else self.zoom_out_factor
+        if self.animator is not None:
+            self.animator.zoom(factor, event.x, event.y)
+        else:
+            self.pivot_zoom(factor)
+
+    def request_pan(self, dx: float, dy: float) -> None:
+        """Pan for keyboard navigation, animated when enabled."""
+        if self.animator is not None:
+            self.animator.pan(dx, dy)
+        else:
+            self.pan_offset(dx, dy)
 
     def add_words(self, words: List[str]) -> None:
         """Add words to the word space."""
-        for i, word in enumerate(words):
-            logical_x = WORDSPACE['WORD_PLACEMENT']['INITIAL_X_OFFSET'] + i * WORDSPACE['WORD_PLACEMENT']['INITIAL_X_SPACING']
-            logical_y = WORDSPACE['WORD_PLACEMENT']['INITIAL_Y_POSITION']
+        placement = self.placement
+        logical_x = placement.x_offset
+        previous_width = None
+        for word in words:
+            width, _ = self.word_size(word)
+            if previous_width is not None:
+                # Spread wide ovals further apart so they do not overlap
+                logical_x += max(placement.x_spacing, (previous_width + width) / 2)
+            previous_width = width
+            logical_y = placement.y_position
             
             # Store original position
             self.original_word_positions[word] = (logical_x, logical_y)
             
             self.create_word(logical_x, logical_y, word)
 
-    def create_word(self, logical_x: float, logical_y: float, word: str) -> None:
+    def word_size(self, word: str) -> Tuple[int, int]:
+        """Oval size of a word: large enough for its text, at least the profile's word size."""
+        if self.text_metrics is None:
+            return self.word_width, self.word_height
+        return self.text_metrics.oval_size(word, self.word_width, self.word_height)
+
+    def create_word(self, logical_x: float, logical_y: float, word: str) -> DraggableWord:
         """Create a DraggableWord at specified logical coordinates."""
-        dw = DraggableWord(self, logical_x, logical_y, word)
+        width, height = self.word_size(word)
+        dw = DraggableWord(self, logical_x, logical_y, word, width, height)
         self.draggables.append(dw)
+        if self.minimap is not None:
+            self.minimap.invalidate()
+        return dw
+
+    def words_changed(self, indices) -> None:
+        """Tell the overview that these words moved or changed highlight."""
+        if self.minimap is not None:
+            self.minimap.update_words(indices)
+
+    def center_on(self, logical_x: float, logical_y: float) -> None:
+        """Pan so that a logical point is in the middle of the canvas."""
+        dx = self.canvas.winfo_width() / 2 - (self.offset_x + logical_x * self.scale_factor)
+        dy = self.canvas.winfo_height() / 2 - (self.offset_y + logical_y * self.scale_factor)
+        if self.animator is not None:
+            # Pan still pending is already on its way
+            pending_x, pending_y = self.animator.pending_pan
+            dx -= pending_x
+            dy -= pending_y
+        self.request_pan(dx, dy)
+
+    def add_word_listener(self, event: str, callback: Callable[[DraggableWord], None]) -> None:
+        """Call callback(word) whenever a word reports the given event."""
+        self._word_listeners.setdefault(event, []).append(callback)
+
+    def notify_word_event(self, event: str, dw: DraggableWord) -> None:
+        """Forward a word interaction to the registered listeners."""
+        for callback in self._word_listeners.get(event, ()):
+            callback(dw)
+
+    def select(self, words: List[DraggableWord]) -> None:
+        """Add words to the selection."""
+        tag = WORDSPACE['SELECTION']['TAG']
+        oval_tag = WORDSPACE['SELECTION']['OVAL_TAG']
+        for dw in words:
+            if dw in self.selected:
+                continue
+            self.selected.add(dw)
+            self.canvas.addtag_withtag(tag, dw.oval_id)
+            self.canvas.addtag_withtag(tag, dw.text_id)
+            self.canvas.addtag_withtag(oval_tag, dw.oval_id)
+            self.record('select', dw)
+        self.canvas.itemconfig(oval_tag, fill=WORDSPACE['SELECTION']['FILL'])
+
+    def deselect(self, words: List[DraggableWord]) -> None:
+        """Remove words from the selection."""
+        tag = WORDSPACE['SELECTION']['TAG']
+        for dw in words:
+            if dw not in self.selected:
+                continue
+            self.selected.discard(dw)
+            self.canvas.itemconfig(dw.oval_id, fill=DraggableWord.OVAL_FILL_COLOR)
+            self.canvas.dtag(dw.oval_id, tag)
+            self.canvas.dtag(dw.text_id, tag)
+            self.canvas.dtag(dw.oval_id, WORDSPACE['SELECTION']['OVAL_TAG'])
+            self.record('deselect', dw)
+
+    def toggle_selection(self, dw: DraggableWord) -> None:
+        if dw in self.selected:
+            self.deselect([dw])
+        else:
+            self.select([dw])
+
+    def clear_selection(self) -> None:
+        """Deselect every word."""
+        if not self.selected:
+            return
+        oval_tag = WORDSPACE['SELECTION']['OVAL_TAG']
+        self.canvas.itemconfig(oval_tag, fill=DraggableWord.OVAL_FILL_COLOR)
+        self.canvas.dtag(WORDSPACE['SELECTION']['TAG'])
+        self.canvas.dtag(oval_tag)
+        for dw in self.selected:
+            self.record('deselect', dw)
+        self.selected.clear()
+
+    @property
+    def group_dragging(self) -> bool:
+        return self._group_indices is not None
+
+    def start_group_drag(self, event: tk.Event) -> None:
+        """Begin moving the whole selection with the mouse."""
+        self._group_indices = np.fromiter((dw.index for dw in self.selected), dtype=np.intp, count=len(self.selected))
+        self._group_anchor = (event.x, event.y)
+        self._group_moved = [0.0, 0.0]
+
+    def drag_group(self, event: tk.Event) -> None:
+        """Move the selection to follow the mouse: one model update and one canvas.move."""
+        moved = self._group_moved
+        dx, dy = self.model.drag_group(
+            self._group_indices,
+            event.x - self._group_anchor[0] - moved[0],
+            event.y - self._group_anchor[1] - moved[1]
+        )
+        if dx or dy:
+            self.canvas.move(WORDSPACE['SELECTION']['TAG'], dx, dy)
+            moved[0] += dx
+            moved[1] += dy
+
+    def end_group_drag(self) -> None:
+        """Record where the group ended up."""
+        if self._group_moved != [0.0, 0.0]:
+            for dw in self.selected:
+                self.record('group_move', dw)
+            self.history.push(Move(self._group_indices,
+                                   self._group_moved[0] / self.scale_factor,
+                                   self._group_moved[1] / self.scale_factor))
+            self.words_changed(self._group_indices)
+        self._group_indices = None
+
+    def record_add(self, dw: DraggableWord) -> None:
+        """Make placing a word (from the stack) undoable."""
+        self.history.push(Add(dw.index, dw.word, dw.logical_x, dw.logical_y))
+
+    @instrumented('untangle')
+    def untangle(self) -> int:
+        """Push overlapping words apart as one undoable move; returns how many words moved."""
+        start_x, start_y = self.model.xs.copy(), self.model.ys.copy()
+        moved = self.model.untangle()
+        remaining = len(self.model.overlapping_pairs()[0])
+        logger.info("Untangle used: %d of %d words moved, %d overlapping pairs left",
+                    len(moved), len(self.model), remaining)
+        if remaining:
+            logger.warning("Untangle left %d overlapping pairs; words are kept on the canvas, "
+                           "which may not have room for all of them", remaining)
+        if not moved.size:
+            return 0
+        self.history.push(Move(moved,
+                               self.model.xs[moved] - start_x[moved],
+                               self.model.ys[moved] - start_y[moved]))
+        self.update_all_positions()
+        self.words_changed(moved)
+        for index in moved.tolist():
+            self.record('untangle', self.draggables[index])
+        return len(moved)
+
+    def undo(self) -> bool:
+        """Revert the last operation; False if there is nothing to undo."""
+        op = self.history.undo()
+        if op is None:
+            return False
+        self._apply(op, reverse=True)
+        return True
+
+    def redo(self) -> bool:
+        """Apply the last undone operation again; False if there is nothing to redo."""
+        op = self.history.redo()
+        if op is None:
+            return False
+        self._apply(op, reverse=False)
+        return True
+
+    def _apply(self, op: Operation, reverse: bool) -> None:
+        """Apply or revert an operation, touching only the words it changed."""
+        if isinstance(op, Move):
+            sign = -1 if reverse else 1
+            self.model.translate(op.indices, sign * op.dx, sign * op.dy)
+            for index in op.indices.tolist():
+                self.draggables[index].update_canvas_position()
+            self.words_changed(op.indices)
+        elif isinstance(op, Highlight):
+            self.draggables[op.index].toggle_highlight()
+            self.words_changed([op.index])
+        elif isinstance(op, Add):
+            if reverse:
+                dw = self.draggables[op.index]
+                self.notify_word_event('undo_add', dw)
+                self.remove_word(dw)
+            else:
+                dw = self.create_word(op.logical_x, op.logical_y, op.word)
+                self.notify_word_event('redo_add', dw)
+
+    def record(self, event: str, dw: DraggableWord) -> None:
+        """Append an event with the word's logical position to the journal."""
+        elapsed_ms = round((time.perf_counter() - self._journal_start) * 1000)
+        self.journal.append([elapsed_ms, event, dw.word, dw.logical_x, dw.logical_y])
+
+    def take_journal(self) -> List[list]:
+        """Return the journal of the trial and start a new one."""
+        journal, self.journal = self.journal, []
+        self._journal_start = time.perf_counter()
+        return journal
+
+    def remove_word(self, dw: DraggableWord) -> None:
+        """Remove a single word from the canvas and the model."""
+        self.deselect([dw])
+        dw.remove_from_canvas()
+        self.model.remove_word(dw.index)
+        self.draggables.remove(dw)
+        for later in self.draggables[dw.index:]:
+            later.index -= 1
+        if self.minimap is not None:
+            self.minimap.invalidate()
+
+    def clear_words(self) -> None:
+        """Remove every word from the canvas and the model."""
+        self.selected.clear()
+        self._group_indices = None
+        self.history.clear()
+        if self.text_metrics is not None:
+            self.text_metrics.save()
+        for dw in self.draggables:
+            dw.remove_from_canvas()
+        self.draggables.clear()
+        self.model.clear()
+        if self.minimap is not None:
+            self.minimap.invalidate()
 
+    @instrumented('pivot_zoom')
     def pivot_zoom(self, factor: float) -> None:
         """
         Perform a pivot zoom.
@@ -129,51 +513,25 @@ class WordSpace(tk.Frame):
 
         pivot_x, pivot_y = self.last_mouse_x, self.last_mouse_y
 
-        # Logical coordinate conversion
-        logical_px = (pivot_x - self.offset_x) / self.scale_factor
-        logical_py = (pivot_y - self.offset_y) / self.scale_factor
+        # Only redraw if scale actually changed
+        if self.model.zoom_about(pivot_x, pivot_y, factor):
+            logger.debug("Zoom to %.3f about (%d, %d)", self.scale_factor, pivot_x, pivot_y)
+            self.update_zoom_label()
+            self.update_all_positions()
 
-        # Compute new scale with robust boundary management
-        new_scale = max(
-            self.min_scale, 
-            min(self.max_scale, self.scale_factor * factor)
+    def update_zoom_label(self) -> None:
+        """Show the normalized zoom percentage (0-500%)."""
+        self.zoom_label.config(
+            text=self.zoom_display_format.format(self.model.zoom_percentage(self.max_zoom_percentage))
         )
 
-        # Only proceed if scale actually changed
-        if new_scale != self.scale_factor:
-            self.scale_factor = new_scale
-            
-            # Calculate normalized zoom percentage (0-500%)
-            scale_range = self.max_scale - self.min_scale
-            normalized_scale = (self.scale_factor - self.min_scale) / scale_range
-            display_percentage = int(normalized_scale * WORDSPACE['ZOOM']['MAX_ZOOM_PERCENTAGE'])
-            
-            # Update zoom label
-            self.zoom_label.config(
-                text=WORDSPACE['ZOOM']['DISPLAY_FORMAT'].format(display_percentage)
-            )
-
-            # Advanced pivot alignment
-            new_device_x = (logical_px * self.scale_factor) + self.offset_x
-            new_device_y = (logical_py * self.scale_factor) + self.offset_y
-
-            self.offset_x += (pivot_x - new_device_x)
-            self.offset_y += (pivot_y - new_device_y)
-            
-            self.update_all_positions()
-
     def reset_pov(self) -> None:
         """reset POV to show a panoramic of the network."""
-        if not self.draggables:
-            self._reset_to_default()
-            return
+        if self.animator is not None:
+            self.animator.cancel()
+        self.model.reset_pov()
+        self.zoom_label.config(text=f"Zoom: {int(self.scale_factor * 100)}%")
 
-        # Compute bounding box
-        logical_bounds = self._compute_logical_bounds()
-        
-        # Intelligent scaling
-        self._apply_optimal_scale(logical_bounds)
-        
         # Update positions
         self.update_all_positions()
 
@@ -190,94 +548,32 @@ class WordSpace(tk.Frame):
             for word in self.draggables:
                 word.restore_highlight_state()
                 
-    def _reset_to_default(self) -> None:
-        """Reset to default zoom when no words are present"""
-        self.scale_factor = 1.0
-        self.zoom_label.config(text=f"Zoom: {int(self.scale_factor * 100)}%")
-        
-        # Reset to center of canvas
-        canvas_width = int(self.canvas.cget("width"))
-        canvas_height = int(self.canvas.cget("height"))
-        self.offset_x = canvas_width / 2
-        self.offset_y = canvas_height / 2
-
     def _compute_logical_bounds(self) -> Dict[str, float]:
         """Compute logical bounds of draggable words"""
-        logical_xs = [dw.logical_x for dw in self.draggables]
-        logical_ys = [dw.logical_y for dw in self.draggables]
-        
-        return {
-            'min_x': min(logical_xs),
-            'max_x': max(logical_xs),
-            'min_y': min(logical_ys),
-            'max_y': max(logical_ys)
-        }
-
-    def _apply_optimal_scale(self, bounds: Dict[str, float]) -> None:
-        """Apply optimal scaling based on word distribution."""
-        center_x = (bounds['min_x'] + bounds['max_x']) / 2
-        center_y = (bounds['min_y'] + bounds['max_y']) / 2
-        
-        # Reset core parameters
-        self.scale_factor = 1.0 
-        self.zoom_label.config(text=f"Zoom: {int(self.scale_factor * 100)}%")
-        
-        # Canvas dimensions
-        canvas_width = int(self.canvas.cget("width"))
-        canvas_height = int(self.canvas.cget("height"))
-        
-        # Compute optimal offset
-        self.offset_x = canvas_width/2 - (center_x * self.scale_factor)
-        self.offset_y = canvas_height/2 - (center_y * self.scale_factor)
+        return self.model.logical_bounds()
 
     def update_all_positions(self) -> None:
         """
         Update canvas positions for all draggable words.
         Provides a central method for synchronizing word positions.
         """
-        for dw in self.draggables:
-            dw.update_canvas_position()
+        centers_x, centers_y = self.model.device_centers()
+        for dw, center_x, center_y in zip(self.draggables, centers_x.tolist(), centers_y.tolist()):
+            dw.update_canvas_position(center_x, center_y)
+        if self.minimap is not None:
+            self.minimap.view_changed()
 
     def get_draggable_words(self) -> List[DraggableWord]:
         """Retrieve all draggable words."""
         return self.draggables
 
+    @instrumented('pan_offset')
     def pan_offset(self, dx: float, dy: float) -> None:
         """Shift offset to allow keyboard navigation."""
-        self.offset_x += dx
-        self.offset_y += dy 
+        self.model.pan(dx, dy)
 
         self.update_all_positions()
 
     def clamp_offset(self) -> None:
         """Constrain offset to keep words within visible canvas region."""
-        if not self.draggables:
-            return  # No words, nothing to clamp
-        
-        # Compute logical bounds from words
-        logical_xs = [dw.logical_x for dw in self.draggables]
-        logical_ys = [dw.logical_y for dw in self.draggables]
-        
-        # Margin computation
-        margin_x = self.draggables[0].width / (2 * self.scale_factor) + WORDSPACE['CANVAS']['MARGINS']['SAFETY_MARGIN']
-        margin_y = self.draggables[0].height / (2 * self.scale_factor) + WORDSPACE['CANVAS']['MARGINS']['SAFETY_MARGIN']
-        
-        # Compute allowed logical bounds
-        allowed_logical_min_x = min(logical_xs) - margin_x
-        allowed_logical_max_x = max(logical_xs) + margin_x
-        allowed_logical_min_y = min(logical_ys) - margin_y
-        allowed_logical_max_y = max(logical_ys) + margin_y
-        
-        # Canvas dimensions
-        canvas_width = int(self.canvas.cget("width"))
-        canvas_height = int(self.canvas.cget("height"))
-        
-        # Compute offset boundaries
-        min_offset_x = canvas_width - (allowed_logical_max_x * self.scale_factor)
-        max_offset_x = - (allowed_logical_min_x * self.scale_factor)
-        min_offset_y = canvas_height - (allowed_logical_max_y * self.scale_factor)
-        max_offset_y = - (allowed_logical_min_y * self.scale_factor)
-        
-        # Apply clamping
-        self.offset_x = min(max(self.offset_x, min_offset_x), max_offset_x)
-        self.offset_y = min(max(self.offset_y, min_offset_y), max_offset_y)
+        self.model.clamp_offset(self.safety_margin)